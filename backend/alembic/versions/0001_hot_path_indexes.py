@@ -0,0 +1,66 @@
+"""Composite indexes for hot practice and attempt queries
+
+Revision ID: 0001_hot_path_indexes
+Revises:
+Create Date: 2026-10-17
+
+Idempotent: databases built by create_all() after these indexes were
+declared on the models already have them, and tables that don't exist
+yet are skipped (create_all will create them with their indexes).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_hot_path_indexes"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_topics_plan_id", "topics", ["plan_id"]),
+    ("ix_sessions_topic_scheduled", "sessions", ["topic_id", "scheduled_date"]),
+    ("ix_questions_topic_difficulty_type", "questions", ["topic_id", "difficulty", "question_type"]),
+    ("ix_questions_topic_difficulty_random", "questions", ["topic_id", "difficulty", "random_key"]),
+    ("ix_mcq_options_question_id", "mcq_options", ["question_id"]),
+    ("ix_written_answers_question_id", "written_answers", ["question_id"]),
+    ("ix_question_attempts_user_attempted", "question_attempts", ["user_id", "attempted_at"]),
+    ("ix_question_attempts_question_user", "question_attempts", ["question_id", "user_id"]),
+    ("ix_spaced_repetition_user_next_review", "spaced_repetition_schedule", ["user_id", "next_review_date"]),
+    ("ix_dsa_practice_sessions_user_profile_attempted", "dsa_practice_sessions", ["user_id", "profile_id", "attempted_at"]),
+]
+
+
+def _existing(inspector, table: str):
+    if not inspector.has_table(table):
+        return None
+    return {
+        "indexes": {ix["name"] for ix in inspector.get_indexes(table)},
+        "columns": {col["name"] for col in inspector.get_columns(table)},
+    }
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    for name, table, columns in INDEXES:
+        existing = _existing(inspector, table)
+        if existing is None or name in existing["indexes"]:
+            continue
+        if not set(columns) <= existing["columns"]:
+            # e.g. questions.random_key on a database that hasn't started the app yet
+            print(f"  skipping {name}: {table} is missing {set(columns) - existing['columns']}")
+            continue
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    for name, table, _ in reversed(INDEXES):
+        existing = _existing(inspector, table)
+        if existing is not None and name in existing["indexes"]:
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,68 @@
+"""Content-addressed document store for uploaded PDFs
+
+Revision ID: 0002_document_store
+Revises: 0001_hot_path_indexes
+Create Date: 2026-10-17
+
+Adds uploaded_files.content_hash and the stored_documents table. Idempotent
+like 0001: create_all() and upgrade_schema() on app start may already have
+created either of them.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_document_store"
+down_revision: Union[str, None] = "0001_hot_path_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    if inspector.has_table("uploaded_files"):
+        columns = {col["name"] for col in inspector.get_columns("uploaded_files")}
+        if "content_hash" not in columns:
+            op.add_column("uploaded_files", sa.Column("content_hash", sa.String(64), nullable=True))
+        indexes = {ix["name"] for ix in inspector.get_indexes("uploaded_files")}
+        if "ix_uploaded_files_content_hash" not in indexes:
+            op.create_index("ix_uploaded_files_content_hash", "uploaded_files", ["content_hash"])
+
+    if not inspector.has_table("stored_documents"):
+        op.create_table(
+            "stored_documents",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("content_hash", sa.String(64), nullable=False),
+            sa.Column("filename", sa.String()),
+            sa.Column("size_bytes", sa.Integer()),
+            sa.Column("pdf_path", sa.String()),
+            sa.Column("json_path", sa.String()),
+            sa.Column("text_length", sa.Integer()),
+            sa.Column("preview", sa.Text()),
+            sa.Column("topics", sa.JSON(), nullable=True),
+            sa.Column("ref_count", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime()),
+            sa.Column("last_used_at", sa.DateTime()),
+        )
+        op.create_index("ix_stored_documents_id", "stored_documents", ["id"])
+        op.create_index("ix_stored_documents_content_hash", "stored_documents", ["content_hash"], unique=True)
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    if inspector.has_table("stored_documents"):
+        op.drop_table("stored_documents")
+
+    if inspector.has_table("uploaded_files"):
+        indexes = {ix["name"] for ix in inspector.get_indexes("uploaded_files")}
+        if "ix_uploaded_files_content_hash" in indexes:
+            op.drop_index("ix_uploaded_files_content_hash", table_name="uploaded_files")
+        columns = {col["name"] for col in inspector.get_columns("uploaded_files")}
+        if "content_hash" in columns:
+            with op.batch_alter_table("uploaded_files") as batch:
+                batch.drop_column("content_hash")
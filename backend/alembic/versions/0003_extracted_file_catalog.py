@@ -0,0 +1,62 @@
+"""Catalog table for extracted text files
+
+Revision ID: 0003_extracted_file_catalog
+Revises: 0002_document_store
+Create Date: 2026-10-17
+
+Adds the extracted_files table (listing becomes an indexed query instead of
+a directory scan) and an uploaded_files (plan_id, content_hash) index for the
+plan filter. Idempotent like 0001/0002. Rows for existing files are filled
+in by the startup backfill or POST /api/upload/extracted-files/rebuild.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_extracted_file_catalog"
+down_revision: Union[str, None] = "0002_document_store"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table("extracted_files"):
+        op.create_table(
+            "extracted_files",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("filename", sa.String(), nullable=False, unique=True),
+            sa.Column("filepath", sa.String()),
+            sa.Column("original_filename", sa.String()),
+            sa.Column("file_type", sa.String()),
+            sa.Column("text_length", sa.Integer()),
+            sa.Column("page_count", sa.Integer(), nullable=True),
+            sa.Column("size_bytes", sa.Integer()),
+            sa.Column("content_hash", sa.String(64), nullable=True),
+            sa.Column("extracted_at", sa.DateTime(), nullable=True),
+            sa.Column("created_at", sa.DateTime()),
+        )
+        op.create_index("ix_extracted_files_id", "extracted_files", ["id"])
+        op.create_index("ix_extracted_files_content_hash", "extracted_files", ["content_hash"])
+        op.create_index("ix_extracted_files_type_id", "extracted_files", ["file_type", "id"])
+
+    if inspector.has_table("uploaded_files"):
+        indexes = {ix["name"] for ix in inspector.get_indexes("uploaded_files")}
+        if "ix_uploaded_files_plan_hash" not in indexes:
+            op.create_index("ix_uploaded_files_plan_hash", "uploaded_files", ["plan_id", "content_hash"])
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    if inspector.has_table("uploaded_files"):
+        indexes = {ix["name"] for ix in inspector.get_indexes("uploaded_files")}
+        if "ix_uploaded_files_plan_hash" in indexes:
+            op.drop_index("ix_uploaded_files_plan_hash", table_name="uploaded_files")
+
+    if inspector.has_table("extracted_files"):
+        op.drop_table("extracted_files")
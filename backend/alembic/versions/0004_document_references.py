@@ -0,0 +1,47 @@
+"""Derive stored-document references from uploaded_files
+
+Revision ID: 0004_document_references
+Revises: 0003_extracted_file_catalog
+Create Date: 2026-10-17
+
+stored_documents.ref_count is dropped: a document is referenced by the
+uploaded_files rows carrying its content_hash, and plan-less uploads keep it
+for DOCUMENT_GC_GRACE_HOURS after last_used_at. Idempotent like 0001-0003.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_document_references"
+down_revision: Union[str, None] = "0003_extracted_file_catalog"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _columns(inspector, table: str) -> set:
+    return {col["name"] for col in inspector.get_columns(table)} if inspector.has_table(table) else set()
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    if "ref_count" in _columns(inspector, "stored_documents"):
+        with op.batch_alter_table("stored_documents") as batch:
+            batch.drop_column("ref_count")
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    if inspector.has_table("stored_documents") and "ref_count" not in _columns(inspector, "stored_documents"):
+        with op.batch_alter_table("stored_documents") as batch:
+            batch.add_column(sa.Column("ref_count", sa.Integer(), nullable=False, server_default="0"))
+    if inspector.has_table("stored_documents") and inspector.has_table("uploaded_files"):
+        # Rebuild the counts 0002 kept from the rows that reference each document
+        op.execute(
+            "UPDATE stored_documents SET ref_count = ("
+            "SELECT COUNT(*) FROM uploaded_files WHERE uploaded_files.content_hash = stored_documents.content_hash)"
+        )
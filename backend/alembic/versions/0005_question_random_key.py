@@ -0,0 +1,47 @@
+"""questions.random_key for indexed random sampling
+
+Revision ID: 0005_question_random_key
+Revises: 0004_document_references
+Create Date: 2026-10-17
+
+Adds questions.random_key to databases created before it existed, fills it
+once for the rows already there (new rows get one from the model default),
+and creates the (topic_id, difficulty, random_key) index that 0001 skips
+while the column is missing. This used to run as ALTERs in upgrade_schema()
+on every app start. Idempotent like 0001-0004.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_question_random_key"
+down_revision: Union[str, None] = "0004_document_references"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX = "ix_questions_topic_difficulty_random"
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("questions"):
+        return  # create_all builds it with the column and index
+
+    columns = {col["name"] for col in inspector.get_columns("questions")}
+    if "random_key" not in columns:
+        op.add_column("questions", sa.Column("random_key", sa.Float(), nullable=True))
+        random_expr = "random()" if bind.dialect.name == "postgresql" \
+            else "(abs(random()) % 1000000000) / 1000000000.0"
+        op.execute(f"UPDATE questions SET random_key = {random_expr} WHERE random_key IS NULL")
+
+    if INDEX not in {ix["name"] for ix in inspector.get_indexes("questions")}:
+        op.create_index(INDEX, "questions", ["topic_id", "difficulty", "random_key"])
+
+
+def downgrade() -> None:
+    # random_key predates this revision on databases built by create_all; keep it
+    pass
@@ -1,7 +1,10 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from .settings import settings
+from .db_profiles import engine_options, async_database_url, apply_sqlite_pragmas, PoolMetrics
 import logging
 import os
 
@@ -25,10 +28,10 @@ def get_database_url():
             test_engine = create_engine(database_url, pool_pre_ping=True)
             # Test connection
             with test_engine.connect() as conn:
-                conn.execute("SELECT 1")
+                conn.execute(text("SELECT 1"))
             logger.info("✓ PostgreSQL connection successful")
             test_engine.dispose()
-            return database_url, {}
+            return database_url
         except Exception as e:
             logger.warning(f"PostgreSQL connection failed: {e}")
             logger.info("Falling back to SQLite database...")
@@ -36,11 +39,11 @@ def get_database_url():
             sqlite_path = os.path.join(os.getcwd(), "exam_prep_db.db")
             fallback_url = f"sqlite:///{sqlite_path}"
             logger.info(f"Using SQLite database at: {sqlite_path}")
-            return fallback_url, {"check_same_thread": False}
+            return fallback_url
     
     elif is_sqlite:
         logger.info(f"Using SQLite database: {database_url}")
-        return database_url, {"check_same_thread": False}
+        return database_url
     
     else:
         logger.warning(f"Unknown database type in URL: {database_url}")
@@ -48,21 +51,37 @@ def get_database_url():
         sqlite_path = os.path.join(os.getcwd(), "exam_prep_db.db")
         fallback_url = f"sqlite:///{sqlite_path}"
         logger.info(f"Using SQLite database at: {sqlite_path}")
-        return fallback_url, {"check_same_thread": False}
+        return fallback_url
 
-# Get appropriate database URL and connection arguments
-database_url, connect_args = get_database_url()
+# Get appropriate database URL (connect args come from engine_options)
+database_url = get_database_url()
 
-# Create engine with appropriate configuration
-engine = create_engine(database_url, connect_args=connect_args)
+# Create engine with the profile for this database (pooling / PRAGMAs)
+engine = create_engine(database_url, **engine_options(database_url))
+if engine.dialect.name == "sqlite":
+    apply_sqlite_pragmas(engine)
+pool_metrics = PoolMetrics(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine on the same database for async route handlers
+# (expire_on_commit=False: attributes stay readable after commit without a lazy load)
+async_engine_options = engine_options(database_url)
+if database_url.startswith("sqlite") and ":memory:" not in database_url:
+    # aiosqlite defaults to NullPool (a new connection + PRAGMAs per request)
+    async_engine_options["poolclass"] = AsyncAdaptedQueuePool
+async_engine = create_async_engine(async_database_url(database_url), **async_engine_options)
+if async_engine.dialect.name == "sqlite":
+    apply_sqlite_pragmas(async_engine.sync_engine)
+async_pool_metrics = PoolMetrics(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 def init_database():
     """
     Initialize database tables.
     Should be called from main.py on startup, not from route modules.
+    Existing tables are upgraded by Alembic (alembic upgrade head), not here.
     """
     try:
         logger.info("Initializing database tables...")
@@ -80,3 +99,12 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    """
+    Async database session dependency for FastAPI
+    - Queries don't block the event loop
+    - Sync services run through `await db.run_sync(service_method, ...)`
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
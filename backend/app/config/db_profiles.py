@@ -0,0 +1,137 @@
+from typing import Dict
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from .settings import settings
+import threading
+import time
+
+
+def engine_options(database_url: str) -> Dict:
+    """
+    create_engine keyword arguments for the database in use
+    - PostgreSQL: pool sizing, pre-ping and recycle from settings
+    - SQLite: busy timeout at the driver level (PRAGMAs are applied per connection)
+    """
+    if database_url.startswith("postgresql"):
+        return {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+            "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        }
+
+    if database_url.startswith("sqlite"):
+        return {
+            "connect_args": {
+                "check_same_thread": False,
+                "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+            }
+        }
+
+    return {}
+
+
+def async_database_url(database_url: str) -> str:
+    """Same database through its asyncio driver (aiosqlite / asyncpg)"""
+    scheme, _, rest = database_url.partition("://")
+    if scheme.startswith("sqlite"):
+        return f"sqlite+aiosqlite://{rest}"
+    if scheme.startswith("postgresql"):
+        return f"postgresql+asyncpg://{rest}"
+    return database_url
+
+
+def apply_sqlite_pragmas(engine: Engine):
+    """
+    Tune every new SQLite connection
+    - WAL: readers don't block the writer, so two gunicorn workers can share the file
+    - synchronous=NORMAL: safe with WAL, avoids an fsync per commit
+    - busy_timeout: wait for the write lock instead of failing with "database is locked"
+    - mmap_size / cache_size: fewer read syscalls and page cache misses
+    """
+    pragmas = [
+        f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}",
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}",
+        f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}",
+        f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}",
+    ]
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+class PoolMetrics:
+    """
+    Connection pool counters collected from pool events
+    - checkouts/checkins/connects since start, current and peak checked-out
+    - how long connections are held between checkout and checkin
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self._lock = threading.Lock()
+
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.total_hold_seconds = 0.0
+        self.max_hold_seconds = 0.0
+
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        started = connection_record.info.pop("checked_out_at", None)
+        with self._lock:
+            self.checkins += 1
+            self.checked_out = max(0, self.checked_out - 1)
+            if started is not None:
+                held = time.perf_counter() - started
+                self.total_hold_seconds += held
+                self.max_hold_seconds = max(self.max_hold_seconds, held)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self) -> Dict:
+        pool = self.engine.pool
+        with self._lock:
+            completed = self.checkins
+            return {
+                "pool_class": type(pool).__name__,
+                "pool_size": pool.size() if hasattr(pool, "size") else None,
+                "idle": pool.checkedin() if hasattr(pool, "checkedin") else None,
+                "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+                "checked_out": self.checked_out,
+                "peak_checked_out": self.peak_checked_out,
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "invalidations": self.invalidations,
+                "avg_hold_ms": round(self.total_hold_seconds / completed * 1000, 2) if completed else 0,
+                "max_hold_ms": round(self.max_hold_seconds * 1000, 2),
+            }
@@ -7,6 +7,20 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     
+    # Connection pool (PostgreSQL)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    
+    # Per-connection PRAGMAs (SQLite)
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 268435456
+    SQLITE_CACHE_SIZE: int = -64000
+    
     # Deployment configuration
     PORT: int = 10000
     CORS_ORIGINS: str = "http://localhost:3000"
@@ -20,6 +34,36 @@ class Settings(BaseSettings):
     CHATBOT_MAX_HISTORY: int | None = None
     CHATBOT_CONTEXT_LENGTH: int | None = None
     
+    # Background jobs (SQLite file shared by all workers on the host)
+    JOB_QUEUE_DB_PATH: str = "uploads/jobs.db"
+    JOB_QUEUE_WORKERS: int = 2
+    
+    # Pre-generated question pool per (topic, difficulty)
+    QUESTION_POOL_WARMUP: bool = True
+    QUESTION_POOL_TARGET: int = 15
+    QUESTION_POOL_LOW_WATER: int = 5
+    QUESTION_POOL_DIFFICULTIES: str = "easy,medium,hard"
+    
+    # Written answers graded in parallel per bulk submit
+    BULK_GRADING_CONCURRENCY: int = 4
+    
+    # PDF ingestion: pages are extracted in a process pool, PDF_PAGES_PER_TASK at a time
+    PDF_EXTRACT_WORKERS: int = 2
+    PDF_PAGES_PER_TASK: int = 16
+    
+    # Content-addressed upload store: unreferenced documents are deleted after this long
+    DOCUMENT_GC_GRACE_HOURS: float = 24
+    
+    # Topic extraction: text split into chunks of about TOPIC_CHUNK_TOKENS, extracted concurrently
+    TOPIC_CHUNK_TOKENS: int = 2000
+    TOPIC_EXTRACTION_CONCURRENCY: int = 4
+    TOPIC_EXTRACTION_MAX_TOPICS: int = 30
+    TOPIC_CHUNK_CACHE_TTL: int = 30 * 24 * 3600
+    # Gemini calls per minute per worker (0 = unlimited); extraction fails if more
+    # than this fraction of chunks still fail after retries
+    TOPIC_EXTRACTION_RPM: int = 30
+    TOPIC_EXTRACTION_MAX_FAILED_FRACTION: float = 0.2
+    
     model_config = ConfigDict(
         env_file=".env",
         extra="ignore"
@@ -1,8 +1,10 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from app.config.database import init_database
+from app.config.database import init_database, async_engine
 from app.config.settings import settings
+from app.services.job_queue import job_queue
+from app.services.pdf_service import PDFService
 from app.routes import upload, study_plan, lessons, test_gemini, practice  # Add practice
 from app.models import models
 from app.routes import upload, study_plan, lessons, test_gemini, practice, srs
@@ -44,6 +46,37 @@ async def startup_event():
         logger.info("✓ Application started successfully with database initialized")
     else:
         logger.warning("⚠ Application started but database initialization had issues")
+    
+    # One-time backfill of per-user topic stats for existing attempt history
+    from app.config.database import SessionLocal
+    from app.services.progress_service import ProgressService
+    db = SessionLocal()
+    try:
+        ProgressService().backfill_if_empty(db)
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"⚠ user_topic_stats backfill failed: {e}")
+    finally:
+        db.close()
+    
+    # One-time catalog of extracted text files written before extracted_files existed
+    db = SessionLocal()
+    try:
+        upload.document_store.catalog.backfill_if_empty(db)
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"⚠ extracted_files catalog backfill failed: {e}")
+    finally:
+        db.close()
+    
+    await job_queue.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background job consumers, PDF extraction workers and async DB connections"""
+    await job_queue.stop()
+    PDFService.shutdown()
+    await async_engine.dispose()
 
 # Exception handler
 @app.exception_handler(Exception)
@@ -128,7 +161,7 @@ async def health_check_alt():
 @app.get("/debug/db-status")
 async def check_database():
     """Check database connection and tables"""
-    from app.config.database import SessionLocal, engine
+    from app.config.database import SessionLocal, engine, pool_metrics, async_pool_metrics
     from sqlalchemy import inspect
     
     try:
@@ -152,7 +185,9 @@ async def check_database():
             "database_url": db_url.split('@')[-1] if '@' in db_url else db_url,  # Hide credentials
             "tables": tables,
             "user_count": user_count,
-            "plan_count": plan_count
+            "plan_count": plan_count,
+            "pool": pool_metrics.snapshot(),
+            "async_pool": async_pool_metrics.snapshot()
         }
     except Exception as e:
         return {
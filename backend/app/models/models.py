@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Text, Date, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Text, Date, JSON, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
+import random
 from app.config.database import Base
 
 class User(Base):
@@ -28,9 +29,13 @@ class StudyPlan(Base):
     
     user = relationship("User", back_populates="study_plans")
     topics = relationship("Topic", back_populates="study_plan", cascade="all, delete-orphan")
+    uploaded_files = relationship("UploadedFile", cascade="all, delete-orphan")  # release their stored documents
 
 class Topic(Base):
     __tablename__ = "topics"
+    __table_args__ = (
+        Index("ix_topics_plan_id", "plan_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     plan_id = Column(Integer, ForeignKey("study_plans.id"))
@@ -46,6 +51,9 @@ class Topic(Base):
 
 class Session(Base):
     __tablename__ = "sessions"
+    __table_args__ = (
+        Index("ix_sessions_topic_scheduled", "topic_id", "scheduled_date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     topic_id = Column(Integer, ForeignKey("topics.id"))
@@ -59,6 +67,11 @@ class Session(Base):
 # NEW: Questions table
 class Question(Base):
     __tablename__ = "questions"
+    __table_args__ = (
+        Index("ix_questions_topic_difficulty_type", "topic_id", "difficulty", "question_type"),
+        # Seeded random sampling walks this index from a pivot key
+        Index("ix_questions_topic_difficulty_random", "topic_id", "difficulty", "random_key"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     topic_id = Column(Integer, ForeignKey("topics.id"))
@@ -69,15 +82,28 @@ class Question(Base):
     time_limit = Column(Integer)  # seconds
     source = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    random_key = Column(Float, default=random.random)  # uniform [0, 1), fixed per question
     
     topic = relationship("Topic", back_populates="questions")
     mcq_options = relationship("MCQOption", back_populates="question", cascade="all, delete-orphan")
     written_answer = relationship("WrittenAnswer", back_populates="question", uselist=False, cascade="all, delete-orphan")
     attempts = relationship("QuestionAttempt", back_populates="question", cascade="all, delete-orphan")
 
+# Cross-worker lock row for single-flight question generation
+class GenerationLock(Base):
+    __tablename__ = "generation_locks"
+    
+    key = Column(String, primary_key=True)  # e.g. "mcq:12:medium"
+    owner = Column(String)  # host:pid of the worker generating
+    acquired_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime)
+
 # NEW: MCQ Options
 class MCQOption(Base):
     __tablename__ = "mcq_options"
+    __table_args__ = (
+        Index("ix_mcq_options_question_id", "question_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     question_id = Column(Integer, ForeignKey("questions.id"))
@@ -91,6 +117,9 @@ class MCQOption(Base):
 # NEW: Written Answers
 class WrittenAnswer(Base):
     __tablename__ = "written_answers"
+    __table_args__ = (
+        Index("ix_written_answers_question_id", "question_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     question_id = Column(Integer, ForeignKey("questions.id"))
@@ -104,6 +133,10 @@ class WrittenAnswer(Base):
 # NEW: Question Attempts
 class QuestionAttempt(Base):
     __tablename__ = "question_attempts"
+    __table_args__ = (
+        Index("ix_question_attempts_user_attempted", "user_id", "attempted_at"),
+        Index("ix_question_attempts_question_user", "question_id", "user_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -117,9 +150,42 @@ class QuestionAttempt(Base):
     
     question = relationship("Question", back_populates="attempts")
 
+# Running per-user practice totals for a topic (updated on every submit)
+class UserTopicStats(Base):
+    __tablename__ = "user_topic_stats"
+    __table_args__ = (
+        UniqueConstraint("user_id", "topic_id", name="uq_user_topic_stats_user_topic"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    topic_id = Column(Integer, ForeignKey("topics.id"), nullable=False)
+    
+    attempts = Column(Integer, default=0, nullable=False)
+    score_sum = Column(Float, default=0.0, nullable=False)
+    scored = Column(Integer, default=0, nullable=False)  # attempts with a score
+    mcq_attempts = Column(Integer, default=0, nullable=False)
+    mcq_correct = Column(Integer, default=0, nullable=False)
+    
+    # Per-difficulty buckets
+    easy_attempts = Column(Integer, default=0, nullable=False)
+    easy_score_sum = Column(Float, default=0.0, nullable=False)
+    easy_scored = Column(Integer, default=0, nullable=False)
+    medium_attempts = Column(Integer, default=0, nullable=False)
+    medium_score_sum = Column(Float, default=0.0, nullable=False)
+    medium_scored = Column(Integer, default=0, nullable=False)
+    hard_attempts = Column(Integer, default=0, nullable=False)
+    hard_score_sum = Column(Float, default=0.0, nullable=False)
+    hard_scored = Column(Integer, default=0, nullable=False)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 # NEW: Spaced Repetition Schedule
 class SpacedRepetitionSchedule(Base):
     __tablename__ = "spaced_repetition_schedule"
+    __table_args__ = (
+        Index("ix_spaced_repetition_user_next_review", "user_id", "next_review_date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -129,6 +195,8 @@ class SpacedRepetitionSchedule(Base):
     ease_factor = Column(Float, default=2.5)
     review_count = Column(Integer, default=0)
     last_reviewed = Column(DateTime, nullable=True)
+    
+    topic = relationship("Topic")
 
 # NEW: Weakness Patterns
 class WeaknessPattern(Base):
@@ -144,10 +212,55 @@ class WeaknessPattern(Base):
 
 class UploadedFile(Base):
     __tablename__ = "uploaded_files"
+    __table_args__ = (
+        Index("ix_uploaded_files_plan_hash", "plan_id", "content_hash"),  # a plan's extracted files
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     plan_id = Column(Integer, ForeignKey("study_plans.id"))
     filename = Column(String)
     file_type = Column(String)
     extracted_text = Column(Text)
+    content_hash = Column(String(64), index=True, nullable=True)  # StoredDocument holding the PDF and text (a reference to it)
     uploaded_at = Column(DateTime, default=datetime.utcnow)
+
+class StoredDocument(Base):
+    """
+    Content-addressed PDF and extracted text (SHA-256 of the PDF bytes),
+    shared by every upload of the same file
+    """
+    __tablename__ = "stored_documents"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(64), unique=True, index=True, nullable=False)
+    filename = Column(String)  # name it was first uploaded under
+    size_bytes = Column(Integer)
+    pdf_path = Column(String)
+    json_path = Column(String)  # extracted text: TextArchive (.sbt), or JSON for older documents
+    text_length = Column(Integer, default=0)
+    preview = Column(Text)  # first 1000 characters
+    topics = Column(JSON, nullable=True)  # topics extracted from this document alone
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow)
+
+class ExtractedFile(Base):
+    """
+    Catalog of uploads/extracted_texts, written with each file so listing is
+    an indexed query instead of a directory scan
+    """
+    __tablename__ = "extracted_files"
+    __table_args__ = (
+        Index("ix_extracted_files_type_id", "file_type", "id"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    filename = Column(String, unique=True, nullable=False)  # name in uploads/extracted_texts
+    filepath = Column(String)
+    original_filename = Column(String)
+    file_type = Column(String)
+    text_length = Column(Integer, default=0)
+    page_count = Column(Integer, nullable=True)  # None for legacy JSON files
+    size_bytes = Column(Integer)
+    content_hash = Column(String(64), index=True, nullable=True)  # StoredDocument, plans via UploadedFile
+    extracted_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String, Float, Date, DateTime, JSON, ForeignKey,Text
+from sqlalchemy import Boolean, Column, Integer, String, Float, Date, DateTime, JSON, ForeignKey,Text, Index
 from sqlalchemy.orm import relationship
 from app.config.database import Base
 from datetime import datetime
@@ -73,6 +73,9 @@ class PlacementPlan(Base):
 class DSAPracticeSession(Base):
     """Track DSA practice sessions"""
     __tablename__ = "dsa_practice_sessions"
+    __table_args__ = (
+        Index("ix_dsa_practice_sessions_user_profile_attempted", "user_id", "profile_id", "attempted_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("placement_users.id"))
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.config.database import get_db
 from app.models.models import StudyPlan, UploadedFile, Topic
@@ -13,6 +14,17 @@ llm_service = LLMService()
 # In-memory conversation storage (use Redis in production)
 conversation_histories: Dict[str, List[Dict]] = {}
 
+# Response cache TTLs (seconds) for prompts that repeat across students.
+# /query is not cached - it carries per-user history and study context.
+CACHE_TTLS = {
+    "quick-help": 24 * 3600,
+    "explain-code": 7 * 24 * 3600,
+    "solve-doubt": 6 * 3600,
+}
+
+# Sent in SSE error events; the exception itself is only logged server-side
+STREAM_ERROR_MESSAGE = "I'm having trouble processing that. Could you rephrase or try again?"
+
 # ============================================================================
 # PYDANTIC MODELS
 # ============================================================================
@@ -31,82 +43,69 @@ class QuickHelpRequest(BaseModel):
 # MAIN CHATBOT ENDPOINTS
 # ============================================================================
 
-@router.post("/query")
-async def chat_query(
-    query_data: ChatQuery,
-    db: Session = Depends(get_db)
-):
+def _build_chat_prompt(query_data: ChatQuery, db: Session) -> tuple:
     """
-    Universal chatbot query handler
-    Works globally across all pages (exam prep, placement, peer learning)
+    Build the full tutor prompt for a chat query
+    Returns (full_prompt, conversation_key, study_context)
     """
-    try:
-        print(f"\n{'='*60}")
-        print(f"💬 Chatbot Query")
-        print(f"   User: {query_data.user_id}")
-        print(f"   Plan ID: {query_data.plan_id}")
-        print(f"   Context: {query_data.context}")
-        print(f"   Question: {query_data.query}")
-        print(f"{'='*60}")
-        
-        # Build context based on plan_id and page context
-        system_context = ""
-        study_context = ""
+    # Build context based on plan_id and page context
+    system_context = ""
+    study_context = ""
+    
+    # If plan_id provided, get study-specific context
+    if query_data.plan_id:
+        study_plan = db.query(StudyPlan).filter(
+            StudyPlan.id == query_data.plan_id
+        ).first()
         
-        # If plan_id provided, get study-specific context
-        if query_data.plan_id:
-            study_plan = db.query(StudyPlan).filter(
-                StudyPlan.id == query_data.plan_id
-            ).first()
+        if study_plan:
+            # Get uploaded files for context
+            uploaded_files = db.query(UploadedFile).filter(
+                UploadedFile.plan_id == query_data.plan_id
+            ).all()
+            
+            if uploaded_files:
+                study_context += "\n**Available Study Materials:**\n"
+                for file in uploaded_files[:3]:
+                    if file.extracted_text:
+                        study_context += f"\n--- {file.filename} ---\n"
+                        study_context += file.extracted_text[:1500]
+            
+            # Get topics
+            topics = db.query(Topic).filter(
+                Topic.plan_id == query_data.plan_id
+            ).all()
             
-            if study_plan:
-                # Get uploaded files for context
-                uploaded_files = db.query(UploadedFile).filter(
-                    UploadedFile.plan_id == query_data.plan_id
-                ).all()
-                
-                if uploaded_files:
-                    study_context += "\n**Available Study Materials:**\n"
-                    for file in uploaded_files[:3]:
-                        if file.extracted_text:
-                            study_context += f"\n--- {file.filename} ---\n"
-                            study_context += file.extracted_text[:1500]
-                
-                # Get topics
-                topics = db.query(Topic).filter(
-                    Topic.plan_id == query_data.plan_id
-                ).all()
-                
-                if topics:
-                    topics_list = ", ".join([t.name for t in topics])
-                    study_context += f"\n\n**Topics in study plan:** {topics_list}"
-                
-                system_context = f"""You are helping a student prepare for their {study_plan.exam_type} exam in {study_plan.subject}.
+            if topics:
+                topics_list = ", ".join([t.name for t in topics])
+                study_context += f"\n\n**Topics in study plan:** {topics_list}"
+            
+            system_context = f"""You are helping a student prepare for their {study_plan.exam_type} exam in {study_plan.subject}.
 Target grade: {study_plan.target_grade}
 Exam date: {study_plan.exam_date}"""
-        
-        # Add page context
-        if query_data.context:
-            if "placement" in query_data.context.lower():
-                system_context += "\n\nUser is currently on placement preparation page. Focus on interview prep, DSA, system design, and behavioral questions."
-            elif "exam" in query_data.context.lower():
-                system_context += "\n\nUser is currently on exam preparation page. Focus on concepts, theory, and exam strategies."
-            elif "peer" in query_data.context.lower():
-                system_context += "\n\nUser is on peer learning page. Help with collaborative study, group activities, and peer discussion topics."
-        
-        # Get conversation history
-        conversation_key = f"{query_data.user_id}_{query_data.plan_id or 'global'}"
-        history = conversation_histories.get(conversation_key, [])
-        
-        # Build conversation history text
-        history_text = ""
-        if history:
-            history_text = "\n**Recent conversation:**\n"
-            for msg in history[-4:]:  # Last 4 messages
-                history_text += f"Student: {msg['question']}\nYou: {msg['answer'][:100]}...\n"
-        
-        # Build complete system prompt
-        system_prompt = f"""You are an expert AI study tutor and mentor. You help students with:
+    
+    # Add page context
+    if query_data.context:
+        if "placement" in query_data.context.lower():
+            system_context += "\n\nUser is currently on placement preparation page. Focus on interview prep, DSA, system design, and behavioral questions."
+        elif "exam" in query_data.context.lower():
+            system_context += "\n\nUser is currently on exam preparation page. Focus on concepts, theory, and exam strategies."
+        elif "peer" in query_data.context.lower():
+            system_context += "\n\nUser is on peer learning page. Help with collaborative study, group activities, and peer discussion topics."
+    
+    # Get conversation history
+    conversation_key = f"{query_data.user_id}_{query_data.plan_id or 'global'}"
+    history = conversation_histories.get(conversation_key, [])
+    
+    # Build conversation history text
+    history_text = ""
+    if history:
+        history_text = "\n**Recent conversation:**\n"
+        for msg in history[-4:]:  # Last 4 messages
+            history_text += f"Student: {msg['question']}\nYou: {msg['answer'][:100]}...\n"
+    
+    # Build complete system prompt
+    system_prompt = f"""You are an expert AI study tutor and mentor. You help students with:
 - Exam preparation (concepts, examples, practice)
 - Placement/interview preparation (DSA, system design, behavioral)
 - Peer learning and collaboration
@@ -126,10 +125,63 @@ Exam date: {study_plan.exam_date}"""
 
 {history_text}"""
 
-        full_prompt = f"{system_prompt}\n\n**Student Question:** {query_data.query}\n\n**Your Answer:**"
+    full_prompt = f"{system_prompt}\n\n**Student Question:** {query_data.query}\n\n**Your Answer:**"
+    
+    return full_prompt, conversation_key, study_context
+
+def _save_to_history(conversation_key: str, question: str, answer: str, provider: str) -> int:
+    """Append a Q&A pair to the conversation and return the new length"""
+    if conversation_key not in conversation_histories:
+        conversation_histories[conversation_key] = []
+    
+    conversation_histories[conversation_key].append({
+        "question": question,
+        "answer": answer,
+        "provider": provider
+    })
+    
+    # Limit history to last 20 messages
+    if len(conversation_histories[conversation_key]) > 20:
+        conversation_histories[conversation_key] = conversation_histories[conversation_key][-20:]
+    
+    return len(conversation_histories[conversation_key])
+
+def _sse_event(data: Dict) -> str:
+    """Format a Server-Sent Events message"""
+    return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def _sse_response(events) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # don't let proxies buffer the stream
+        }
+    )
+
+@router.post("/query")
+async def chat_query(
+    query_data: ChatQuery,
+    db: Session = Depends(get_db)
+):
+    """
+    Universal chatbot query handler
+    Works globally across all pages (exam prep, placement, peer learning)
+    """
+    try:
+        print(f"\n{'='*60}")
+        print(f"💬 Chatbot Query")
+        print(f"   User: {query_data.user_id}")
+        print(f"   Plan ID: {query_data.plan_id}")
+        print(f"   Context: {query_data.context}")
+        print(f"   Question: {query_data.query}")
+        print(f"{'='*60}")
+        
+        full_prompt, conversation_key, study_context = _build_chat_prompt(query_data, db)
         
         # Call LLM (prefer Groq for speed in chatbot)
-        result = llm_service.generate_content(
+        result = await llm_service.agenerate_content(
             prompt=full_prompt,
             temperature=0.7,
             max_tokens=500,
@@ -145,18 +197,7 @@ Exam date: {study_plan.exam_date}"""
         answer = result['text'].strip()
         
         # Store in conversation history
-        if conversation_key not in conversation_histories:
-            conversation_histories[conversation_key] = []
-        
-        conversation_histories[conversation_key].append({
-            "question": query_data.query,
-            "answer": answer,
-            "provider": result['provider']
-        })
-        
-        # Limit history to last 20 messages
-        if len(conversation_histories[conversation_key]) > 20:
-            conversation_histories[conversation_key] = conversation_histories[conversation_key][-20:]
+        conversation_length = _save_to_history(conversation_key, query_data.query, answer, result['provider'])
         
         print(f"✓ Response generated ({len(answer)} chars)")
         print(f"   Provider: {result['provider']}")
@@ -165,7 +206,7 @@ Exam date: {study_plan.exam_date}"""
             "response": answer,
             "provider": result['provider'],
             "has_context": bool(study_context),
-            "conversation_length": len(conversation_histories.get(conversation_key, []))
+            "conversation_length": conversation_length
         }
         
     except Exception as e:
@@ -177,6 +218,53 @@ Exam date: {study_plan.exam_date}"""
             "error": True
         }
 
+@router.post("/query/stream")
+async def chat_query_stream(
+    query_data: ChatQuery,
+    db: Session = Depends(get_db)
+):
+    """
+    Streaming variant of /query (Server-Sent Events)
+    - {"type": "token", "text": ...} as tokens arrive
+    - {"type": "done", "provider": ..., "conversation_length": ...} at the end
+    - {"type": "error", "message": ...} if generation fails
+    The final answer is saved to conversation history like /query
+    """
+    print(f"\n💬 Chatbot Query (stream) - User: {query_data.user_id}, Plan ID: {query_data.plan_id}")
+    
+    full_prompt, conversation_key, study_context = _build_chat_prompt(query_data, db)
+    
+    async def events():
+        parts = []
+        provider = None
+        try:
+            async for chunk in llm_service.astream_content(
+                prompt=full_prompt,
+                temperature=0.7,
+                max_tokens=500,
+                preferred_provider='groq'
+            ):
+                provider = chunk['provider']
+                parts.append(chunk['text'])
+                yield _sse_event({"type": "token", "text": chunk['text']})
+        except Exception as e:
+            print(f"❌ Stream error: {e}")
+            yield _sse_event({"type": "error", "message": STREAM_ERROR_MESSAGE})
+            return
+        
+        answer = "".join(parts).strip()
+        conversation_length = _save_to_history(conversation_key, query_data.query, answer, provider)
+        print(f"✓ Streamed response ({len(answer)} chars) via {provider}")
+        
+        yield _sse_event({
+            "type": "done",
+            "provider": provider,
+            "has_context": bool(study_context),
+            "conversation_length": conversation_length
+        })
+    
+    return _sse_response(events())
+
 # ============================================================================
 # LEGACY ENDPOINT (for backward compatibility)
 # ============================================================================
@@ -225,11 +313,12 @@ async def get_quick_help(request: QuickHelpRequest):
     
     question = prompts.get(request.help_type, f"Tell me about {request.topic}")
     
-    result = llm_service.generate_content(
+    result = await llm_service.agenerate_content(
         prompt=question,
         temperature=0.7,
         max_tokens=400,
-        preferred_provider='groq'
+        preferred_provider='groq',
+        cache_ttl=CACHE_TTLS["quick-help"]
     )
     
     if not result['success']:
@@ -239,7 +328,8 @@ async def get_quick_help(request: QuickHelpRequest):
         "topic": request.topic,
         "help_type": request.help_type,
         "answer": result['text'],
-        "provider": result['provider']
+        "provider": result['provider'],
+        "cached": result.get('cached', False)
     }
 
 @router.post("/explain-code")
@@ -251,6 +341,10 @@ async def explain_code(
     
     prompt = f"""Explain this {language} code in simple terms:
 
+```{language}
+{code}
+```
+
 Break it down:
 1. What does it do? (1-2 sentences)
 2. How does it work? (step by step)
@@ -259,11 +353,12 @@ Break it down:
 
 Keep it under 200 words."""
 
-    result = llm_service.generate_content(
+    result = await llm_service.agenerate_content(
         prompt=prompt,
         temperature=0.5,
         max_tokens=500,
-        preferred_provider='groq'
+        preferred_provider='groq',
+        cache_ttl=CACHE_TTLS["explain-code"]
     )
     
     if not result['success']:
@@ -273,20 +368,12 @@ Keep it under 200 words."""
         "code": code,
         "language": language,
         "explanation": result['text'],
-        "provider": result['provider']
+        "provider": result['provider'],
+        "cached": result.get('cached', False)
     }
 
-@router.post("/solve-doubt")
-async def solve_doubt(
-    doubt: str,
-    topic: str,
-    difficulty: str = "medium"
-):
-    """
-    Solve a specific doubt with detailed explanation
-    """
-    
-    prompt = f"""A student has a doubt about {topic} (difficulty: {difficulty}).
+def _solve_doubt_prompt(doubt: str, topic: str, difficulty: str) -> str:
+    return f"""A student has a doubt about {topic} (difficulty: {difficulty}).
 
 Doubt: {doubt}
 
@@ -298,11 +385,24 @@ Provide a clear, detailed answer that:
 
 Keep it friendly and encouraging."""
 
-    result = llm_service.generate_content(
+@router.post("/solve-doubt")
+async def solve_doubt(
+    doubt: str,
+    topic: str,
+    difficulty: str = "medium"
+):
+    """
+    Solve a specific doubt with detailed explanation
+    """
+    
+    prompt = _solve_doubt_prompt(doubt, topic, difficulty)
+
+    result = await llm_service.agenerate_content(
         prompt=prompt,
         temperature=0.7,
         max_tokens=600,
-        preferred_provider='groq'
+        preferred_provider='groq',
+        cache_ttl=CACHE_TTLS["solve-doubt"]
     )
     
     if not result['success']:
@@ -312,9 +412,42 @@ Keep it friendly and encouraging."""
         "doubt": doubt,
         "topic": topic,
         "solution": result['text'],
-        "provider": result['provider']
+        "provider": result['provider'],
+        "cached": result.get('cached', False)
     }
 
+@router.post("/solve-doubt/stream")
+async def solve_doubt_stream(
+    doubt: str,
+    topic: str,
+    difficulty: str = "medium"
+):
+    """Streaming variant of /solve-doubt (same SSE events as /query/stream)"""
+    
+    prompt = _solve_doubt_prompt(doubt, topic, difficulty)
+    
+    async def events():
+        provider = None
+        try:
+            async for chunk in llm_service.astream_content(
+                prompt=prompt,
+                temperature=0.7,
+                max_tokens=600,
+                preferred_provider='groq'
+            ):
+                provider = chunk['provider']
+                yield _sse_event({"type": "token", "text": chunk['text']})
+        except Exception as e:
+            print(f"❌ Solve-doubt stream error: {e}")
+            import traceback
+            traceback.print_exc()
+            yield _sse_event({"type": "error", "message": STREAM_ERROR_MESSAGE})
+            return
+        
+        yield _sse_event({"type": "done", "provider": provider})
+    
+    return _sse_response(events())
+
 # ============================================================================
 # CONVERSATION MANAGEMENT
 # ============================================================================
@@ -369,6 +502,8 @@ async def get_available_providers():
         "available": llm_service.get_available_providers(),
         "default": llm_service.default_provider,
         "order": llm_service.provider_order,
+        "effective_order": llm_service.get_effective_order(),
+        "health": llm_service.get_provider_health(),
         "active_conversations": len(conversation_histories)
     }
 
@@ -382,17 +517,21 @@ async def get_chatbot_stats():
         "total_conversations": total_conversations,
         "total_messages": total_messages,
         "avg_messages_per_conversation": total_messages / total_conversations if total_conversations > 0 else 0,
-        "active_users": len(set(k.split('_')[0] for k in conversation_histories.keys()))
+        "active_users": len(set(k.split('_')[0] for k in conversation_histories.keys())),
+        "llm_cache": llm_service.cache.stats()
     }
 
 @router.get("/health")
 async def chatbot_health():
     """Check chatbot health"""
     providers = llm_service.get_available_providers()
+    healthy_providers = llm_service.get_effective_order()
     
     return {
-        "status": "healthy" if providers else "degraded",
+        "status": "healthy" if healthy_providers else "degraded",
         "providers_available": len(providers),
+        "providers_healthy": len(healthy_providers),
         "providers": providers,
+        "provider_health": llm_service.get_provider_health(),
         "conversations_active": len(conversation_histories)
     }
\ No newline at end of file
@@ -4,12 +4,16 @@ from sqlalchemy import func, and_
 from app.config.database import get_db
 from app.models.models import Topic, Question, MCQOption, QuestionAttempt, StudyPlan
 from app.services.ai_service import AIService
+from app.services.question_repository import QuestionRepository
+from app.services.progress_service import ProgressService
 from datetime import date, timedelta
 from typing import List, Dict
 import traceback
 
 router = APIRouter(prefix="/api/exam-day", tags=["exam-day"])
 ai_service = AIService()
+question_repository = QuestionRepository()
+progress_service = ProgressService()
 
 @router.get("/quick-revision/{plan_id}")
 async def get_quick_revision_sheets(
@@ -25,8 +29,12 @@ async def get_quick_revision_sheets(
         if not study_plan:
             raise HTTPException(status_code=404, detail="Study plan not found")
         
-        # Get all topics
+        # Get all topics, with the plan owner's mastery
         topics = db.query(Topic).filter(Topic.plan_id == plan_id).all()
+        mastery_by_topic = {
+            p["topic_id"]: p["mastery_level"]
+            for p in progress_service.get_topics_progress(db, study_plan.user_id, topics)
+        }
         
         revision_sheets = []
         
@@ -40,7 +48,7 @@ async def get_quick_revision_sheets(
             sheet = {
                 "topic_id": topic.id,
                 "topic_name": topic.name,
-                "mastery_level": topic.mastery_level,
+                "mastery_level": mastery_by_topic.get(topic.id, 0),
                 "key_formulas": await _generate_key_formulas(topic),
                 "important_definitions": await _generate_definitions(topic),
                 "must_know_facts": await _generate_facts(topic),
@@ -81,23 +89,16 @@ async def get_rapid_fire_quiz(
             raise HTTPException(status_code=404, detail="Topic not found")
         
         # Get questions ordered by difficulty (easy first for confidence)
-        questions = db.query(Question).filter(
-            Question.topic_id == topic_id,
-            Question.question_type == "mcq"
-        ).order_by(Question.difficulty).limit(count).all()
+        questions = question_repository.get_mcqs(db, topic_id, count)
         
         quiz_questions = []
         for q in questions:
-            options = db.query(MCQOption).filter(
-                MCQOption.question_id == q.id
-            ).all()
-            
             quiz_questions.append({
                 "id": q.id,
                 "question": q.question_text,
                 "options": [
                     {"label": opt.option_label, "text": opt.option_text}
-                    for opt in sorted(options, key=lambda x: x.option_label)
+                    for opt in question_repository.sorted_options(q)
                 ],
                 "difficulty": q.difficulty
             })
@@ -166,11 +167,12 @@ async def get_confidence_booster(
             QuestionAttempt.user_id == user_id
         ).scalar() or 0
         
-        # Get mastery levels
+        # Get this user's mastery levels
         topics = db.query(Topic).filter(Topic.plan_id == plan_id).all()
-        avg_mastery = sum(t.mastery_level for t in topics) / len(topics) if topics else 0
+        masteries = [p["mastery_level"] for p in progress_service.get_topics_progress(db, user_id, topics)]
+        avg_mastery = sum(masteries) / len(masteries) if masteries else 0
         
-        mastered_topics = sum(1 for t in topics if t.mastery_level >= 80)
+        mastered_topics = sum(1 for m in masteries if m >= 80)
         
         # Predict score
         predicted_score = min(95, avg_mastery + 10)  # Optimistic prediction
@@ -177,7 +177,7 @@ async def get_company_questions(
     Uses curated data or AI fallback
     """
     try:
-        questions = company_questions_service.get_company_questions(company_name, role)
+        questions = await company_questions_service.get_company_questions(company_name, role)
         return questions
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -213,7 +213,7 @@ async def generate_roadmap(
             raise HTTPException(status_code=404, detail="Profile not found")
         
         # Get company questions
-        company_questions = company_questions_service.get_company_questions(
+        company_questions = await company_questions_service.get_company_questions(
             profile.company_name,
             profile.role
         )
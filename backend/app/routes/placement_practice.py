@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from app.config.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config.database import get_async_db
 from app.services.practice_tracker import PracticeTracker
 from pydantic import BaseModel
 from typing import Optional
@@ -22,12 +22,13 @@ async def record_practice(
     attempt: PracticeAttempt,
     user_id: int = 1,
     profile_id: int = 1,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Record a DSA practice attempt"""
     
     try:
-        result = practice_tracker.record_attempt(
+        # PracticeTracker takes the session last, so bind it explicitly
+        result = await db.run_sync(lambda session: practice_tracker.record_attempt(
             user_id=user_id,
             profile_id=profile_id,
             topic=attempt.topic,
@@ -37,8 +38,8 @@ async def record_practice(
             time_spent_minutes=attempt.time_spent_minutes,
             code=attempt.code,
             notes=attempt.notes,
-            db=db
-        )
+            db=session
+        ))
         
         return result
         
@@ -49,11 +50,13 @@ async def record_practice(
 async def get_analytics(
     profile_id: int,
     user_id: int = 1,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get topic-wise analytics"""
     
-    analytics = practice_tracker.get_topic_analytics(user_id, profile_id, db)
+    analytics = await db.run_sync(
+        lambda session: practice_tracker.get_topic_analytics(user_id, profile_id, session)
+    )
     
     return {
         "topics": analytics,
@@ -64,11 +67,13 @@ async def get_analytics(
 async def get_daily_progress(
     profile_id: int,
     user_id: int = 1,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get today's practice progress"""
     
-    progress = practice_tracker.get_daily_problems(user_id, profile_id, 1, db)
+    progress = await db.run_sync(
+        lambda session: practice_tracker.get_daily_problems(user_id, profile_id, 1, session)
+    )
     
     return progress
 
@@ -77,11 +82,13 @@ async def get_practice_history(
     profile_id: int,
     days: int = 7,
     user_id: int = 1,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get practice history"""
     
-    history = practice_tracker.get_practice_history(user_id, profile_id, days, db)
+    history = await db.run_sync(
+        lambda session: practice_tracker.get_practice_history(user_id, profile_id, days, session)
+    )
     
     return {
         "history": history,
@@ -1,8 +1,16 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, desc
-from app.config.database import get_db
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy import func, desc, select, delete
+from app.config.database import get_async_db
+from app.config.settings import settings
 from app.services.question_service import QuestionService
+from app.services.job_queue import job_queue
+from app.services.question_pool import question_pool
+from app.services.question_repository import QuestionRepository
+from app.services.progress_service import ProgressService
+from app.services.single_flight import generation_flight
 from app.schemas.schemas import (
     PracticeSessionRequest,
     MCQQuestionResponse,
@@ -14,12 +22,17 @@ from app.models.models import (
     Topic, Question, MCQOption, WrittenAnswer, QuestionAttempt,
     SpacedRepetitionSchedule, WeaknessPattern, User
 )
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import date, datetime, timedelta
+import asyncio
+import json
+import secrets
 import traceback
 
 router = APIRouter(prefix="/api/practice", tags=["practice"])
 question_service = QuestionService()
+question_repository = QuestionRepository()
+progress_service = ProgressService()
 
 # ============================================================================
 # QUESTION GENERATION ENDPOINTS
@@ -28,7 +41,7 @@ question_service = QuestionService()
 @router.post("/generate-questions")
 async def generate_practice_questions(
     request: PracticeSessionRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Generate practice questions for a topic
@@ -37,7 +50,7 @@ async def generate_practice_questions(
     """
     
     try:
-        topic = db.query(Topic).filter(Topic.id == request.topic_id).first()
+        topic = await db.get(Topic, request.topic_id)
         if not topic:
             raise HTTPException(status_code=404, detail="Topic not found")
         
@@ -48,10 +61,10 @@ async def generate_practice_questions(
         print(f"{'='*60}")
         
         # Check if questions already exist
-        existing_count = db.query(func.count(Question.id)).filter(
+        existing_count = await db.scalar(select(func.count(Question.id)).where(
             Question.topic_id == request.topic_id,
             Question.difficulty == request.difficulty
-        ).scalar()
+        ))
         
         if existing_count >= request.question_count:
             print(f"✓ Using existing {existing_count} questions")
@@ -64,19 +77,12 @@ async def generate_practice_questions(
                 "cached": True
             }
         
-        # Generate new questions
-        mcqs = await question_service.generate_mcqs(
+        # Generate new questions (MCQ and written run concurrently)
+        mcqs, written = await question_service.generate_question_set(
             topic=topic,
             difficulty=request.difficulty,
-            count=10,
-            db=db
-        )
-        
-        written = await question_service.generate_written_questions(
-            topic=topic,
-            difficulty=request.difficulty,
-            count=5,
-            db=db
+            mcq_count=10,
+            written_count=5
         )
         
         print(f"✓ Generated {len(mcqs)} MCQs + {len(written)} written questions")
@@ -101,7 +107,7 @@ async def generate_practice_questions(
 async def regenerate_questions(
     topic_id: int,
     difficulty: str = "medium",
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete existing questions and generate fresh ones
@@ -109,21 +115,22 @@ async def regenerate_questions(
     
     try:
         # Delete existing questions
-        deleted = db.query(Question).filter(
+        deleted = (await db.execute(delete(Question).where(
             Question.topic_id == topic_id,
             Question.difficulty == difficulty
-        ).delete()
-        db.commit()
+        ))).rowcount
+        # Attempts on the deleted questions no longer count towards progress
+        await db.run_sync(progress_service.rebuild, topic_id=topic_id)
+        await db.commit()
         
         print(f"🗑️ Deleted {deleted} existing questions")
         
         # Generate new ones
-        topic = db.query(Topic).filter(Topic.id == topic_id).first()
+        topic = await db.get(Topic, topic_id)
         if not topic:
             raise HTTPException(status_code=404, detail="Topic not found")
         
-        mcqs = await question_service.generate_mcqs(topic, difficulty, 10, db)
-        written = await question_service.generate_written_questions(topic, difficulty, 5, db)
+        mcqs, written = await question_service.generate_question_set(topic, difficulty, 10, 5)
         
         return {
             "message": "Questions regenerated successfully",
@@ -132,9 +139,102 @@ async def regenerate_questions(
         }
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
+# ============================================================================
+# BACKGROUND GENERATION JOBS
+# ============================================================================
+
+def _public_job(job: Dict) -> Dict:
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "progress": job["progress"],
+        "message": job["message"],
+        "result": job["result"],
+        "error": job["error"],
+        "topic_id": job["payload"].get("topic_id"),
+        "difficulty": job["payload"].get("difficulty")
+    }
+
+
+@router.post("/generate-questions/jobs", status_code=202)
+async def enqueue_generate_questions(
+    request: PracticeSessionRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Queue question generation and return immediately
+    - Poll GET /jobs/{job_id} or subscribe to /jobs/{job_id}/events
+    - A job already queued/running for the same topic and difficulty is reused
+    """
+    
+    topic = await db.get(Topic, request.topic_id)
+    if not topic:
+        raise HTTPException(status_code=404, detail="Topic not found")
+    
+    job, created = await question_pool.enqueue_generation(
+        request.topic_id,
+        request.difficulty,
+        request.question_count
+    )
+    
+    print(f"📥 {'Queued' if created else 'Joined existing'} generation job {job['id']} for {topic.name}")
+    
+    return {
+        **_public_job(job),
+        "deduplicated": not created
+    }
+
+
+@router.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """Current status, progress and (when finished) result of a job"""
+    
+    job = await asyncio.to_thread(job_queue.get, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _public_job(job)
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_status(job_id: str, interval: float = Query(1.0, ge=0.25, le=10)):
+    """
+    Server-Sent Events feed of job progress
+    - Emits a "progress" message whenever status/progress changes
+    - Ends with a "done" message once the job completes or fails
+    """
+    
+    job = await asyncio.to_thread(job_queue.get, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def events():
+        last = None
+        while True:
+            current = await asyncio.to_thread(job_queue.get, job_id)
+            if not current:
+                yield f"data: {json.dumps({'type': 'error', 'message': 'Job not found'})}\n\n"
+                return
+            
+            public = _public_job(current)
+            snapshot = (public["status"], public["progress"], public["message"])
+            if snapshot != last:
+                last = snapshot
+                event = "done" if public["status"] in ("completed", "failed") else "progress"
+                yield f"data: {json.dumps({'type': event, **public})}\n\n"
+                if event == "done":
+                    return
+            
+            await asyncio.sleep(interval)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # ============================================================================
 # QUESTION RETRIEVAL ENDPOINTS
 # ============================================================================
@@ -145,73 +245,52 @@ async def get_practice_questions(
     difficulty: str = Query("medium", regex="^(easy|medium|hard)$"),
     question_type: str = Query("mcq", regex="^(mcq|written|all)$"),
     limit: int = Query(10, ge=1, le=50),
-    offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, max_length=64, description="next_cursor of the previous page"),
+    session_seed: Optional[str] = Query(None, max_length=64, description="Reuse across pages for a stable order"),
+    offset: Optional[int] = Query(None, ge=0, description="Deprecated: use cursor"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get practice questions for a topic
-    - Supports pagination
+    - Keyset pagination: pass the returned next_cursor (and session_seed) for the next page
+    - offset still works (same order for the same session_seed) but can't be combined with cursor
     - Filter by type and difficulty
-    - Randomized order for each session
+    - Order: every session walks the same fixed random order of the pool; the
+      session_seed only picks where in it the session starts and which way it
+      goes. Pass the returned session_seed with later pages to keep it stable
     """
     
     try:
-        query = db.query(Question).filter(
-            Question.topic_id == topic_id,
-            Question.difficulty == difficulty
-        )
+        if cursor and offset is not None:
+            raise HTTPException(status_code=400, detail="Pass either cursor or offset, not both")
+        if not session_seed:
+            session_seed = secrets.token_hex(8)
         
-        if question_type != "all":
-            query = query.filter(Question.question_type == question_type)
-        
-        # Randomize order
-        query = query.order_by(func.random())
-        
-        # Pagination
-        total = query.count()
-        questions = query.offset(offset).limit(limit).all()
-        
-        result = []
-        for q in questions:
-            if q.question_type == "mcq":
-                options = db.query(MCQOption).filter(
-                    MCQOption.question_id == q.id
-                ).all()
-                
-                result.append({
-                    "id": q.id,
-                    "type": "mcq",
-                    "question_text": q.question_text,
-                    "marks": q.marks,
-                    "time_limit": q.time_limit,
-                    "difficulty": q.difficulty,
-                    "options": [
-                        {
-                            "label": opt.option_label,
-                            "text": opt.option_text
-                        }
-                        for opt in sorted(options, key=lambda x: x.option_label)
-                    ]
-                })
-            else:
-                result.append({
-                    "id": q.id,
-                    "type": "written",
-                    "question_text": q.question_text,
-                    "marks": q.marks,
-                    "time_limit": q.time_limit,
-                    "difficulty": q.difficulty,
-                    "expected_length": q.written_answer.expected_length if q.written_answer else "200-300 words"
-                })
+        # Rotated page with options/model answers eager-loaded
+        try:
+            questions, total, next_cursor = await db.run_sync(
+                question_repository.get_page, topic_id, difficulty, question_type, limit, cursor, session_seed, offset
+            )
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        
+        # Keep the pre-generated pool topped up (background job, doesn't block this read)
+        await question_pool.maybe_top_up(db, topic_id, difficulty)
+        
+        result = [question_repository.to_practice_dict(q) for q in questions]
         
         return {
             "questions": result,
             "total": total,
             "limit": limit,
             "offset": offset,
-            "has_more": (offset + limit) < total
+            "has_more": next_cursor is not None,
+            "next_cursor": next_cursor,
+            "session_seed": session_seed
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         error_trace = traceback.format_exc()
         print(f"❌ Error fetching questions:")
@@ -222,14 +301,14 @@ async def get_practice_questions(
 async def get_question_details(
     question_id: int,
     include_answer: bool = False,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get detailed information about a specific question
     - Optionally include correct answer (for review mode)
     """
     
-    question = db.query(Question).filter(Question.id == question_id).first()
+    question = await db.run_sync(question_repository.get_with_details, question_id)
     if not question:
         raise HTTPException(status_code=404, detail="Question not found")
     
@@ -245,10 +324,6 @@ async def get_question_details(
     }
     
     if question.question_type == "mcq":
-        options = db.query(MCQOption).filter(
-            MCQOption.question_id == question_id
-        ).all()
-        
         result["options"] = [
             {
                 "label": opt.option_label,
@@ -256,7 +331,7 @@ async def get_question_details(
                 "is_correct": opt.is_correct if include_answer else None,
                 "explanation": opt.explanation if include_answer else None
             }
-            for opt in sorted(options, key=lambda x: x.option_label)
+            for opt in question_repository.sorted_options(question)
         ]
     else:
         if include_answer and question.written_answer:
@@ -270,11 +345,37 @@ async def get_question_details(
 # ANSWER SUBMISSION & EVALUATION
 # ============================================================================
 
+def _mcq_result(question_attempt: QuestionAttempt, question: Question, correct_option: MCQOption) -> Dict:
+    return {
+        "attempt_id": question_attempt.id,
+        "correct": question_attempt.is_correct,
+        "score": question_attempt.score,
+        "max_score": question.marks,
+        "correct_answer": correct_option.option_label,
+        "explanation": correct_option.explanation,
+        "time_taken": question_attempt.time_taken
+    }
+
+def _written_result(question_attempt: QuestionAttempt, question: Question, evaluation: Dict) -> Dict:
+    return {
+        "attempt_id": question_attempt.id,
+        "score": evaluation.get("score"),
+        "max_score": question.marks,
+        "percentage": round((evaluation.get("score", 0) / question.marks) * 100, 1),
+        "feedback": evaluation.get("feedback"),
+        "strengths": evaluation.get("strengths", []),
+        "improvements": evaluation.get("improvements", []),
+        "keyword_coverage": evaluation.get("keyword_coverage", 0),
+        "keyword_total": evaluation.get("keyword_total", 0),
+        "model_answer": question.written_answer.model_answer,
+        "time_taken": question_attempt.time_taken
+    }
+
 @router.post("/submit-answer")
 async def submit_answer(
     attempt: QuestionAttemptCreate,
     user_id: int = Query(..., description="User ID"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Submit answer and get instant evaluation
@@ -283,7 +384,8 @@ async def submit_answer(
     """
     
     try:
-        question = db.query(Question).filter(Question.id == attempt.question_id).first()
+        # Options and model answer come with the question (no lazy loads on an async session)
+        question = await db.run_sync(question_repository.get_with_details, attempt.question_id)
         if not question:
             raise HTTPException(status_code=404, detail="Question not found")
         
@@ -305,30 +407,23 @@ async def submit_answer(
         
         if question.question_type == "mcq":
             # MCQ Evaluation
-            correct_option = db.query(MCQOption).filter(
-                MCQOption.question_id == question.id,
-                MCQOption.is_correct == True
-            ).first()
+            correct_option = question_repository.correct_option(question)
             
             is_correct = (attempt.student_answer.upper() == correct_option.option_label.upper())
             question_attempt.is_correct = is_correct
             question_attempt.score = question.marks if is_correct else 0
             
             db.add(question_attempt)
-            db.commit()
-            db.refresh(question_attempt)
+            await db.run_sync(
+                progress_service.record_attempt, user_id, question, question_attempt.score, question_attempt.is_correct
+            )
+            await db.commit()
+            await db.refresh(question_attempt)
+            await question_pool.maybe_top_up(db, question.topic_id, question.difficulty, user_id)
             
             print(f"✓ MCQ evaluated: {'Correct' if is_correct else 'Incorrect'}")
             
-            return {
-                "attempt_id": question_attempt.id,
-                "correct": is_correct,
-                "score": question_attempt.score,
-                "max_score": question.marks,
-                "correct_answer": correct_option.option_label,
-                "explanation": correct_option.explanation,
-                "time_taken": attempt.time_taken
-            }
+            return _mcq_result(question_attempt, question, correct_option)
         
         else:
             # Written Answer Evaluation
@@ -350,30 +445,22 @@ async def submit_answer(
             question_attempt.is_correct = (evaluation.get("score", 0) / question.marks) >= 0.6
             
             db.add(question_attempt)
-            db.commit()
-            db.refresh(question_attempt)
+            await db.run_sync(
+                progress_service.record_attempt, user_id, question, question_attempt.score, question_attempt.is_correct
+            )
+            await db.commit()
+            await db.refresh(question_attempt)
+            await question_pool.maybe_top_up(db, question.topic_id, question.difficulty, user_id)
             
             print(f"✓ Written answer evaluated: {evaluation.get('score')}/{question.marks}")
             print(f"{'='*60}\n")
             
-            return {
-                "attempt_id": question_attempt.id,
-                "score": evaluation.get("score"),
-                "max_score": question.marks,
-                "percentage": round((evaluation.get("score", 0) / question.marks) * 100, 1),
-                "feedback": evaluation.get("feedback"),
-                "strengths": evaluation.get("strengths", []),
-                "improvements": evaluation.get("improvements", []),
-                "keyword_coverage": evaluation.get("keyword_coverage", 0),
-                "keyword_total": evaluation.get("keyword_total", 0),
-                "model_answer": written_answer.model_answer,
-                "time_taken": attempt.time_taken
-            }
+            return _written_result(question_attempt, question, evaluation)
         
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         error_trace = traceback.format_exc()
         print(f"❌ Error submitting answer:")
         print(error_trace)
@@ -383,19 +470,101 @@ async def submit_answer(
 async def bulk_submit_answers(
     attempts: List[QuestionAttemptCreate],
     user_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Submit multiple answers at once (for practice sessions)
+    - One query loads every question with its options and model answer
+    - MCQs are graded in memory; written answers are graded concurrently
+    - All attempts and progress updates are saved with a single commit
     """
     
-    results = []
-    for attempt in attempts:
-        try:
-            result = await submit_answer(attempt, user_id, db)
-            results.append(result)
-        except Exception as e:
-            results.append({"error": str(e), "question_id": attempt.question_id})
+    print(f"\n{'='*60}")
+    print(f"📝 Bulk submit: {len(attempts)} answers from user {user_id}")
+    print(f"{'='*60}")
+    
+    try:
+        questions = await db.run_sync(question_repository.get_many, [a.question_id for a in attempts])
+        semaphore = asyncio.Semaphore(settings.BULK_GRADING_CONCURRENCY)
+        
+        async def grade(attempt: QuestionAttemptCreate):
+            question = questions.get(attempt.question_id)
+            if not question:
+                raise ValueError("Question not found")
+            
+            if question.question_type == "mcq":
+                correct_option = question_repository.correct_option(question)
+                if not correct_option:
+                    raise ValueError("Correct option not found")
+                is_correct = attempt.student_answer.upper() == correct_option.option_label.upper()
+                return question, (question.marks if is_correct else 0), is_correct, correct_option
+            
+            written_answer = question.written_answer
+            if not written_answer:
+                raise ValueError("Model answer not found")
+            
+            async with semaphore:
+                evaluation = await question_service.evaluate_written_answer(
+                    question=question,
+                    student_answer=attempt.student_answer,
+                    model_answer=written_answer.model_answer,
+                    marking_scheme=written_answer.marking_scheme,
+                    keywords=written_answer.keywords
+                )
+            score = evaluation.get("score", 0)
+            return question, score, (score / question.marks) >= 0.6, evaluation
+        
+        graded = await asyncio.gather(*(grade(a) for a in attempts), return_exceptions=True)
+        
+        records = []
+        for attempt, outcome in zip(attempts, graded):
+            if isinstance(outcome, BaseException):
+                continue
+            question, score, is_correct, _ = outcome
+            records.append(QuestionAttempt(
+                user_id=user_id,
+                question_id=attempt.question_id,
+                student_answer=attempt.student_answer,
+                time_taken=attempt.time_taken,
+                confidence_level=attempt.confidence_level,
+                score=score,
+                is_correct=is_correct
+            ))
+        
+        db.add_all(records)
+        await db.run_sync(
+            progress_service.record_attempts, user_id, [(questions[r.question_id], r.score, r.is_correct) for r in records]
+        )
+        await db.flush()
+        
+        # Build responses once the flush has assigned attempt ids
+        results = []
+        saved = iter(records)
+        for attempt, outcome in zip(attempts, graded):
+            if isinstance(outcome, BaseException):
+                results.append({"error": str(outcome), "question_id": attempt.question_id})
+                continue
+            question, _, _, detail = outcome
+            record = next(saved)
+            if question.question_type == "mcq":
+                results.append(_mcq_result(record, question, detail))
+            else:
+                results.append(_written_result(record, question, detail))
+        
+        pools = {(q.topic_id, q.difficulty) for q in questions.values()}
+        await db.commit()
+        
+        for topic_id, difficulty in pools:
+            await question_pool.maybe_top_up(db, topic_id, difficulty, user_id)
+        
+        print(f"✓ Bulk submit saved {len(records)}/{len(attempts)} attempts")
+        
+    except Exception as e:
+        await db.rollback()
+        error_trace = traceback.format_exc()
+        print(f"❌ Error in bulk submit:")
+        print(error_trace)
+        raise HTTPException(status_code=500, detail=str(e))
     
     return {
         "total_submitted": len(attempts),
@@ -410,91 +579,14 @@ async def bulk_submit_answers(
 async def get_topic_progress(
     topic_id: int,
     user_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get comprehensive practice progress for a topic
     """
     
     try:
-        # Total questions available
-        total_questions = db.query(func.count(Question.id)).filter(
-            Question.topic_id == topic_id
-        ).scalar() or 0
-        
-        # Questions attempted
-        attempted = db.query(func.count(QuestionAttempt.id.distinct())).join(Question).filter(
-            Question.topic_id == topic_id,
-            QuestionAttempt.user_id == user_id
-        ).scalar() or 0
-        
-        # Average score
-        avg_score = db.query(func.avg(QuestionAttempt.score)).join(Question).filter(
-            Question.topic_id == topic_id,
-            QuestionAttempt.user_id == user_id
-        ).scalar() or 0
-        
-        # Accuracy rate (MCQs only)
-        mcq_correct = db.query(func.count(QuestionAttempt.id)).join(Question).filter(
-            Question.topic_id == topic_id,
-            Question.question_type == "mcq",
-            QuestionAttempt.user_id == user_id,
-            QuestionAttempt.is_correct == True
-        ).scalar() or 0
-        
-        mcq_total = db.query(func.count(QuestionAttempt.id)).join(Question).filter(
-            Question.topic_id == topic_id,
-            Question.question_type == "mcq",
-            QuestionAttempt.user_id == user_id
-        ).scalar() or 1  # Avoid division by zero
-        
-        accuracy = (mcq_correct / mcq_total * 100) if mcq_total > 0 else 0
-        
-        # By difficulty breakdown
-        difficulty_stats = []
-        for diff in ["easy", "medium", "hard"]:
-            diff_attempted = db.query(func.count(QuestionAttempt.id)).join(Question).filter(
-                Question.topic_id == topic_id,
-                Question.difficulty == diff,
-                QuestionAttempt.user_id == user_id
-            ).scalar() or 0
-            
-            diff_avg = db.query(func.avg(QuestionAttempt.score)).join(Question).filter(
-                Question.topic_id == topic_id,
-                Question.difficulty == diff,
-                QuestionAttempt.user_id == user_id
-            ).scalar() or 0
-            
-            difficulty_stats.append({
-                "difficulty": diff,
-                "attempted": diff_attempted,
-                "average_score": round(float(diff_avg), 2)
-            })
-        
-        # Calculate mastery level (0-100)
-        mastery = 0
-        if attempted > 0:
-            completion_factor = min(attempted / total_questions, 1.0) if total_questions > 0 else 0
-            accuracy_factor = accuracy / 100
-            mastery = (completion_factor * 0.4 + accuracy_factor * 0.6) * 100
-        
-        # Update topic mastery in database
-        topic = db.query(Topic).filter(Topic.id == topic_id).first()
-        if topic:
-            topic.mastery_level = mastery
-            db.commit()
-        
-        return {
-            "topic_id": topic_id,
-            "topic_name": topic.name if topic else "Unknown",
-            "total_questions": total_questions,
-            "attempted": attempted,
-            "completion_percentage": round((attempted / total_questions * 100), 1) if total_questions > 0 else 0,
-            "average_score": round(float(avg_score), 2),
-            "accuracy_rate": round(accuracy, 1),
-            "mastery_level": round(mastery, 1),
-            "difficulty_breakdown": difficulty_stats
-        }
+        return await db.run_sync(progress_service.get_topic_progress, topic_id, user_id)
         
     except Exception as e:
         error_trace = traceback.format_exc()
@@ -506,34 +598,23 @@ async def get_topic_progress(
 async def get_overall_progress(
     user_id: int,
     plan_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get overall practice progress across all topics
     """
     
     try:
-        query = db.query(Topic)
-        if plan_id:
-            query = query.filter(Topic.plan_id == plan_id)
-        
-        topics = query.all()
-        
-        topic_progress = []
-        total_attempted = 0
-        total_questions = 0
-        
-        for topic in topics:
-            progress = await get_topic_progress(topic.id, user_id, db)
-            topic_progress.append(progress)
-            total_attempted += progress["attempted"]
-            total_questions += progress["total_questions"]
+        # Every topic's metrics in a single grouped query
+        topic_progress = await db.run_sync(progress_service.get_plan_progress, user_id, plan_id)
+        total_attempted = sum(p["attempted"] for p in topic_progress)
+        total_questions = sum(p["total_questions"] for p in topic_progress)
         
         return {
             "user_id": user_id,
             "topics": topic_progress,
             "summary": {
-                "total_topics": len(topics),
+                "total_topics": len(topic_progress),
                 "total_questions": total_questions,
                 "total_attempted": total_attempted,
                 "overall_completion": round((total_attempted / total_questions * 100), 1) if total_questions > 0 else 0
@@ -548,20 +629,22 @@ async def get_attempt_history(
     user_id: int,
     topic_id: Optional[int] = None,
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get recent question attempt history
     """
     
-    query = db.query(QuestionAttempt).filter(
+    query = select(QuestionAttempt).options(
+        joinedload(QuestionAttempt.question).joinedload(Question.topic)
+    ).where(
         QuestionAttempt.user_id == user_id
     )
     
     if topic_id:
-        query = query.join(Question).filter(Question.topic_id == topic_id)
+        query = query.join(Question).where(Question.topic_id == topic_id)
     
-    attempts = query.order_by(desc(QuestionAttempt.attempted_at)).limit(limit).all()
+    attempts = (await db.scalars(query.order_by(desc(QuestionAttempt.attempted_at)).limit(limit))).all()
     
     result = []
     for att in attempts:
@@ -594,24 +677,20 @@ async def get_weak_topics(
     user_id: int,
     plan_id: int,
     threshold: float = 60.0,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Identify topics where student is struggling
     - Based on accuracy and mastery level
     """
     
-    topics = db.query(Topic).filter(Topic.plan_id == plan_id).all()
-    
     weak_topics = []
     
-    for topic in topics:
-        progress = await get_topic_progress(topic.id, user_id, db)
-        
+    for progress in await db.run_sync(progress_service.get_plan_progress, user_id, plan_id):
         if progress["attempted"] >= 5 and progress["mastery_level"] < threshold:
             weak_topics.append({
-                "topic_id": topic.id,
-                "topic_name": topic.name,
+                "topic_id": progress["topic_id"],
+                "topic_name": progress["topic_name"],
                 "mastery_level": progress["mastery_level"],
                 "accuracy_rate": progress["accuracy_rate"],
                 "attempted": progress["attempted"],
@@ -627,17 +706,17 @@ async def get_weak_topics(
 async def mark_topic_for_review(
     topic_id: int,
     user_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Manually mark a topic for spaced repetition review
     """
     
     # Check if schedule already exists
-    schedule = db.query(SpacedRepetitionSchedule).filter(
+    schedule = await db.scalar(select(SpacedRepetitionSchedule).where(
         SpacedRepetitionSchedule.user_id == user_id,
         SpacedRepetitionSchedule.topic_id == topic_id
-    ).first()
+    ))
     
     if schedule:
         schedule.next_review_date = date.today()
@@ -651,7 +730,7 @@ async def mark_topic_for_review(
         )
         db.add(schedule)
     
-    db.commit()
+    await db.commit()
     
     return {
         "message": "Topic marked for review",
@@ -666,7 +745,7 @@ async def mark_topic_for_review(
 async def get_practice_stats(
     user_id: int,
     days: int = Query(7, ge=1, le=90),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get practice statistics for dashboard
@@ -675,32 +754,32 @@ async def get_practice_stats(
     since_date = datetime.now() - timedelta(days=days)
     
     # Questions attempted
-    total_attempts = db.query(func.count(QuestionAttempt.id)).filter(
+    total_attempts = await db.scalar(select(func.count(QuestionAttempt.id)).where(
         QuestionAttempt.user_id == user_id,
         QuestionAttempt.attempted_at >= since_date
-    ).scalar() or 0
+    )) or 0
     
     # Average score
-    avg_score = db.query(func.avg(QuestionAttempt.score)).filter(
+    avg_score = await db.scalar(select(func.avg(QuestionAttempt.score)).where(
         QuestionAttempt.user_id == user_id,
         QuestionAttempt.attempted_at >= since_date
-    ).scalar() or 0
+    )) or 0
     
     # Time spent (in minutes)
-    total_time = db.query(func.sum(QuestionAttempt.time_taken)).filter(
+    total_time = await db.scalar(select(func.sum(QuestionAttempt.time_taken)).where(
         QuestionAttempt.user_id == user_id,
         QuestionAttempt.attempted_at >= since_date
-    ).scalar() or 0
+    )) or 0
     
     # Daily breakdown
-    daily_stats = db.query(
+    daily_stats = (await db.execute(select(
         func.date(QuestionAttempt.attempted_at).label('date'),
         func.count(QuestionAttempt.id).label('count'),
         func.avg(QuestionAttempt.score).label('avg_score')
-    ).filter(
+    ).where(
         QuestionAttempt.user_id == user_id,
         QuestionAttempt.attempted_at >= since_date
-    ).group_by(func.date(QuestionAttempt.attempted_at)).all()
+    ).group_by(func.date(QuestionAttempt.attempted_at)))).all()
     
     return {
         "period_days": days,
@@ -725,19 +804,22 @@ async def get_practice_stats(
 async def clear_all_attempts(
     user_id: int,
     topic_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Clear attempt history (for testing/reset)
     """
     
-    query = db.query(QuestionAttempt).filter(QuestionAttempt.user_id == user_id)
+    statement = delete(QuestionAttempt).where(QuestionAttempt.user_id == user_id)
     
     if topic_id:
-        query = query.join(Question).filter(Question.topic_id == topic_id)
+        statement = statement.where(
+            QuestionAttempt.question_id.in_(select(Question.id).where(Question.topic_id == topic_id))
+        )
     
-    deleted = query.delete(synchronize_session=False)
-    db.commit()
+    deleted = (await db.execute(statement, execution_options={"synchronize_session": False})).rowcount
+    await db.run_sync(progress_service.rebuild, user_id=user_id, topic_id=topic_id)
+    await db.commit()
     
     return {
         "message": "Attempts cleared",
@@ -745,14 +827,15 @@ async def clear_all_attempts(
     }
 
 @router.get("/health")
-async def practice_health_check(db: Session = Depends(get_db)):
+async def practice_health_check(db: AsyncSession = Depends(get_async_db)):
     """Check practice system health"""
     
-    question_count = db.query(func.count(Question.id)).scalar()
-    attempt_count = db.query(func.count(QuestionAttempt.id)).scalar()
+    question_count = await db.scalar(select(func.count(Question.id)))
+    attempt_count = await db.scalar(select(func.count(QuestionAttempt.id)))
     
     return {
         "status": "healthy",
         "questions_generated": question_count,
-        "total_attempts": attempt_count
+        "total_attempts": attempt_count,
+        "single_flight": generation_flight.stats()
     }
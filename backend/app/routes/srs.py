@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
-from sqlalchemy.orm import Session
-from app.config.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config.database import get_async_db
 from app.services.srs_service import SRSService
 from datetime import date
 from typing import Optional
@@ -12,11 +12,11 @@ srs_service = SRSService()
 async def get_due_reviews(
     user_id: int,
     plan_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get topics due for review today"""
     try:
-        reviews = srs_service.get_due_reviews(db, user_id, plan_id)
+        reviews = await db.run_sync(srs_service.get_due_reviews, user_id, plan_id)
         return {
             "due_today": reviews,
             "count": len(reviews)
@@ -29,11 +29,11 @@ async def get_upcoming_reviews(
     user_id: int,
     days_ahead: int = Query(7, ge=1, le=30),
     plan_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get review schedule for upcoming days"""
     try:
-        schedule = srs_service.get_upcoming_reviews(db, user_id, days_ahead, plan_id)
+        schedule = await db.run_sync(srs_service.get_upcoming_reviews, user_id, days_ahead, plan_id)
         return {
             "schedule": schedule,
             "days_ahead": days_ahead
@@ -46,11 +46,11 @@ async def update_schedule(
     user_id: int,
     topic_id: int,
     performance_score: float = Query(..., ge=0, le=1),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update SRS schedule after practice"""
     try:
-        schedule = srs_service.update_schedule(db, user_id, topic_id, performance_score)
+        schedule = await db.run_sync(srs_service.update_schedule, user_id, topic_id, performance_score)
         
         return {
             "topic_id": topic_id,
@@ -1,11 +1,15 @@
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from app.config.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy import select, func
+from app.config.database import get_async_db
 from app.schemas.schemas import (
     StudyPlanCreate, StudyPlanResponse, TopicUpdateRequest, UserCreate
 )
-from app.models.models import StudyPlan, Topic, User
+from app.models.models import StudyPlan, Topic, User, Session as StudySession
 from app.services.plan_service import PlanService
+from app.services.question_pool import question_pool
+from app.config.settings import settings
 from typing import List
 from datetime import date
 
@@ -15,7 +19,7 @@ plan_service = PlanService()
 @router.post("/create", response_model=StudyPlanResponse)
 async def create_study_plan(
     plan_data: StudyPlanCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new study plan"""
     try:
@@ -27,7 +31,7 @@ async def create_study_plan(
         print(f"{'='*60}")
         
         # Check if user exists, if not create a default user
-        user = db.query(User).filter(User.id == plan_data.user_id).first()
+        user = await db.get(User, plan_data.user_id)
         if not user:
             print(f"⚠️ User {plan_data.user_id} not found, creating default user...")
             user = User(
@@ -36,8 +40,8 @@ async def create_study_plan(
                 name=f"User {plan_data.user_id}"
             )
             db.add(user)
-            db.commit()
-            db.refresh(user)
+            await db.commit()
+            await db.refresh(user)
             print(f"✓ Created user: {user.email}")
         
         # Create study plan
@@ -51,8 +55,9 @@ async def create_study_plan(
         )
         
         db.add(study_plan)
-        db.commit()
-        db.refresh(study_plan)
+        await db.commit()
+        # Columns stay loaded after commit; topics is a lazy relationship the response serializes
+        await db.refresh(study_plan, ["topics"])
         
         print(f"✓ Study plan created with ID: {study_plan.id}")
         print(f"{'='*60}\n")
@@ -60,7 +65,7 @@ async def create_study_plan(
         return study_plan
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"\n❌ Error creating study plan:")
         print(f"   Error: {str(e)}")
         import traceback
@@ -74,7 +79,7 @@ async def create_study_plan(
 async def generate_plan(
     plan_id: int,
     topics_data: TopicUpdateRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Generate study plan from topics"""
     try:
@@ -84,7 +89,7 @@ async def generate_plan(
         print(f"   Topics: {len(topics_data.topics)}")
         print(f"{'='*60}")
         
-        study_plan = db.query(StudyPlan).filter(StudyPlan.id == plan_id).first()
+        study_plan = await db.get(StudyPlan, plan_id)
         if not study_plan:
             raise HTTPException(status_code=404, detail="Study plan not found")
         
@@ -99,6 +104,7 @@ async def generate_plan(
         
         # Save topics
         current_date = date.today()
+        topic_ids = []
         for topic_data in plan:
             topic = Topic(
                 plan_id=plan_id,
@@ -108,7 +114,8 @@ async def generate_plan(
                 order_index=topic_data['order_index']
             )
             db.add(topic)
-            db.flush()
+            await db.flush()
+            topic_ids.append(topic.id)
             
             print(f"   → {topic.name}: {topic.allocated_hours}h (weight: {topic.weight})")
             
@@ -121,17 +128,24 @@ async def generate_plan(
                 daily_hours=study_plan.daily_hours
             )
         
-        db.commit()
+        await db.commit()
         
         print(f"✓ Study plan saved to database")
         print(f"{'='*60}\n")
         
+        # Pre-generate practice questions in the background
+        if settings.QUESTION_POOL_WARMUP:
+            try:
+                await question_pool.warm_up(topic_ids)
+            except Exception as e:
+                print(f"⚠️ Question pool warm-up failed: {e}")
+        
         return {"message": "Study plan generated successfully", "plan_id": plan_id}
         
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"\n❌ Error generating plan:")
         print(f"   Error: {str(e)}")
         import traceback
@@ -144,34 +158,33 @@ async def generate_plan(
 @router.get("/{plan_id}/dashboard")
 async def get_dashboard_data(
     plan_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get dashboard data for a study plan"""
-    from sqlalchemy import func
-    from app.models.models import Session as StudySession
-    
     try:
-        study_plan = db.query(StudyPlan).filter(StudyPlan.id == plan_id).first()
+        study_plan = await db.get(StudyPlan, plan_id)
         if not study_plan:
             raise HTTPException(status_code=404, detail="Study plan not found")
         
         # Calculate stats
-        total_sessions = db.query(func.count(StudySession.id)).join(Topic).filter(
+        total_sessions = await db.scalar(select(func.count(StudySession.id)).join(Topic).where(
             Topic.plan_id == plan_id
-        ).scalar() or 0
+        )) or 0
         
-        completed_sessions = db.query(func.count(StudySession.id)).join(Topic).filter(
+        completed_sessions = await db.scalar(select(func.count(StudySession.id)).join(Topic).where(
             Topic.plan_id == plan_id,
             StudySession.completed == True
-        ).scalar() or 0
+        )) or 0
         
         progress = (completed_sessions / total_sessions * 100) if total_sessions > 0 else 0
         
         # Get today's sessions WITH topic_id
-        today_sessions = db.query(StudySession).join(Topic).filter(
+        today_sessions = (await db.scalars(select(StudySession).join(Topic).options(
+            joinedload(StudySession.topic)
+        ).where(
             Topic.plan_id == plan_id,
             StudySession.scheduled_date == date.today()
-        ).all()
+        ))).all()
         
         return {
             "exam_date": study_plan.exam_date.isoformat(),
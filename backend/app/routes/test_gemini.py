@@ -13,7 +13,7 @@ async def test_gemini(prompt: str):
         
         client = genai.Client(api_key=settings.GEMINI_API_KEY)
         
-        response = client.models.generate_content(
+        response = await client.aio.models.generate_content(
             model="gemini-2.5-pro-preview-03-25",
             contents=prompt
         )
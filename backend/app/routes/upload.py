@@ -2,14 +2,18 @@ from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Form
 from sqlalchemy.orm import Session
 from app.config.database import get_db
 from app.services.pdf_service import PDFService
-from app.services.ai_service import AIService
+from app.services.document_store import DocumentStore
+from app.services.text_archive import TextArchive
+from app.services.ai_service import AIService, TopicExtractionError
 from app.models.models import UploadedFile
 from typing import List, Optional
 import traceback
-import json
+import asyncio
+import os
 
 router = APIRouter(prefix="/api/upload", tags=["upload"])
 pdf_service = PDFService()
+document_store = DocumentStore(pdf_service)
 ai_service = AIService()
 
 @router.post("/pdf")
@@ -34,47 +38,42 @@ async def upload_pdf(
         print(f"   Type: {file_type}")
         print(f"{'='*60}")
         
-        # Step 1: Read file content
-        file_content = await file.read()
-        print(f"✓ File read successfully: {len(file_content)} bytes")
+        # Step 1: Spool the upload to disk once, hashing it on the way
+        spooled_path, file_size, content_hash = await pdf_service.spool_upload(file)
+        print(f"✓ File received: {file_size} bytes (sha256 {content_hash[:12]})")
         
-        # Step 2: Save original PDF
-        pdf_path = pdf_service.save_pdf_file(file_content, file.filename)
-        print(f"✓ PDF saved to: {pdf_path}")
+        if file_size == 0:
+            os.remove(spooled_path)
+            raise HTTPException(status_code=400, detail="Uploaded PDF is empty")
         
-        # Step 3: Extract text from PDF
-        # Reset file pointer for extraction
-        await file.seek(0)
-        extracted_text = await pdf_service.extract_text_from_pdf(file)
-        
-        if not extracted_text or len(extracted_text.strip()) == 0:
-            raise HTTPException(status_code=400, detail="No text could be extracted from PDF")
-        
-        print(f"✓ Text extracted successfully: {len(extracted_text)} characters")
-        
-        # Step 4: Save extracted text to JSON
-        json_data = pdf_service.save_extracted_text_to_json(
-            text=extracted_text,
-            filename=file.filename,
-            file_type=file_type
-        )
+        # Step 2: Reuse the stored document for these bytes, or extract it once
+        try:
+            document, reused = await document_store.ingest(
+                db, spooled_path, content_hash, file_size, file.filename, file_type
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
-        print(f"✓ Extracted text saved to JSON")
-        print(f"   JSON file: {json_data['json_filename']}")
-        print(f"   Preview: {json_data['preview'][:100]}...")
+        if reused:
+            print(f"♻️ Reusing stored document: {document.json_path}")
+        print(f"✓ Text: {document.text_length} characters")
+        print(f"   JSON file: {os.path.basename(document.json_path)}")
         
-        # Step 5: Save metadata to database if plan_id exists
+        # Step 3: Save metadata to database if plan_id exists
         if plan_id:
             uploaded_file = UploadedFile(
                 plan_id=plan_id,
                 filename=file.filename,
                 file_type=file_type,
-                extracted_text=extracted_text[:1000]  # Store only preview in DB
+                extracted_text=document.preview,  # Store only preview in DB
+                content_hash=content_hash
             )
             db.add(uploaded_file)
             db.commit()
             db.refresh(uploaded_file)
             print(f"✓ Saved to database with ID: {uploaded_file.id}")
+        else:
+            db.commit()
         
         print(f"{'='*60}\n")
         
@@ -82,10 +81,13 @@ async def upload_pdf(
             "success": True,
             "filename": file.filename,
             "file_type": file_type,
-            "text_length": len(extracted_text),
-            "json_path": json_data['json_path'],
-            "json_filename": json_data['json_filename'],
-            "preview": json_data['preview']
+            "text_length": document.text_length,
+            "json_path": document.json_path,
+            "json_filename": os.path.basename(document.json_path),
+            "preview": document.preview[:500],
+            "content_hash": content_hash,
+            "deduplicated": reused,
+            "topics": document.topics
         }
             
     except HTTPException:
@@ -98,11 +100,15 @@ async def upload_pdf(
 
 @router.post("/extract-topics-from-json")
 async def extract_topics_from_json(
-    json_paths: List[str]
+    json_paths: List[str],
+    db: Session = Depends(get_db)
 ):
     """
     Step 2: Read text from JSON files and extract topics using Gemini
     This separates file upload from AI processing
+    - A single stored document's topics are cached on it and reused
+    - partial=True when some chunks failed (topics then aren't cached);
+      502 when too many did
     """
     try:
         print(f"\n{'='*60}")
@@ -110,6 +116,19 @@ async def extract_topics_from_json(
         print(f"   Number of files: {len(json_paths)}")
         print(f"{'='*60}")
         
+        documents = document_store.find_by_json_paths(db, json_paths)
+        document = documents[0] if len(json_paths) == 1 and len(documents) == 1 else None
+        if document is not None and document.topics:
+            print(f"♻️ Reusing {len(document.topics)} topics cached on document {document.content_hash[:12]}")
+            return {
+                "success": True,
+                "topics": document.topics,
+                "model": "gemini-2.5-pro",
+                "source_files": len(json_paths),
+                "text_length": document.text_length,
+                "cached": True
+            }
+        
         # Step 1: Read and combine text from all JSON files
         combined_text = pdf_service.combine_multiple_json_texts(json_paths)
         
@@ -120,17 +139,22 @@ async def extract_topics_from_json(
         print(f"   Preview: {combined_text[:200]}...")
         
         # Step 2: Extract subject from first JSON (or use default)
-        first_json_data = pdf_service.read_extracted_text_from_json(json_paths[0])
-        subject = first_json_data.get('subject', 'General Studies')
+        first_metadata = pdf_service.read_extracted_metadata(json_paths[0])
+        subject = first_metadata.get('subject', 'General Studies')
         
         # Step 3: Send to Gemini for topic extraction
         print(f"📤 Sending to Gemini API for topic extraction...")
-        topics = await ai_service.extract_topics(combined_text, subject)
+        report = await ai_service.extract_topics_report(combined_text, subject)
+        topics = report["topics"]
         
         print(f"✓ Topics extracted successfully: {len(topics)} topics")
         for i, topic in enumerate(topics, 1):
             print(f"   {i}. {topic['name']} (weight: {topic['weight']})")
         
+        if document is not None and not report["partial"] and not report["fallback"]:
+            document.topics = topics
+            db.commit()
+        
         print(f"{'='*60}\n")
         
         return {
@@ -138,11 +162,18 @@ async def extract_topics_from_json(
             "topics": topics,
             "model": "gemini-2.5-pro",
             "source_files": len(json_paths),
-            "text_length": len(combined_text)
+            "text_length": len(combined_text),
+            "cached": False,
+            "partial": report["partial"],
+            "fallback": report["fallback"],
+            "failed_chunks": report["failed_chunks"]
         }
         
     except HTTPException:
         raise
+    except TopicExtractionError as e:
+        print(f"\n❌ {e}")
+        raise HTTPException(status_code=502, detail=f"{e}. Please try again in a minute.")
     except Exception as e:
         error_trace = traceback.format_exc()
         print(f"\n❌ ERROR in extract_topics_from_json:")
@@ -180,6 +211,9 @@ async def extract_topics_legacy(
         
     except HTTPException:
         raise
+    except TopicExtractionError as e:
+        print(f"\n❌ {e}")
+        raise HTTPException(status_code=502, detail=f"{e}. Please try again in a minute.")
     except Exception as e:
         error_trace = traceback.format_exc()
         print(f"\n❌ ERROR in extract_topics_legacy:")
@@ -187,34 +221,32 @@ async def extract_topics_legacy(
         raise HTTPException(status_code=500, detail=f"Error extracting topics: {str(e)}")
 
 @router.get("/list-extracted-files")
-async def list_extracted_files():
-    """List all extracted JSON files for debugging"""
-    import os
-    extracted_dir = "uploads/extracted_texts"
-    
-    if not os.path.exists(extracted_dir):
-        return {"files": []}
-    
-    files = []
-    for filename in os.listdir(extracted_dir):
-        if filename.endswith('.json'):
-            filepath = os.path.join(extracted_dir, filename)
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            files.append({
-                "filename": filename,
-                "filepath": filepath,
-                "original_filename": data.get('filename'),
-                "file_type": data.get('file_type'),
-                "text_length": data.get('text_length'),
-                "extracted_at": data.get('extracted_at')
-            })
-    
-    return {"files": files}
+async def list_extracted_files(
+    file_type: Optional[str] = None,
+    plan_id: Optional[int] = None,
+    content_hash: Optional[str] = None,
+    cursor: Optional[int] = None,
+    limit: int = 50,
+    db: Session = Depends(get_db)
+):
+    """
+    List extracted text files from the extracted_files catalog (one indexed query)
+    - filter by file_type, plan_id (files uploaded to that plan) or content_hash
+    - newest first; pass next_cursor back as cursor for the next page (limit <= 200)
+    """
+    return document_store.catalog.list_files(
+        db, file_type=file_type, plan_id=plan_id, content_hash=content_hash, cursor=cursor, limit=limit
+    )
+
+@router.post("/extracted-files/rebuild")
+async def rebuild_extracted_file_catalog():
+    """Resync the extracted_files catalog with uploads/extracted_texts"""
+    counts = await asyncio.to_thread(document_store.catalog.rebuild)
+    return {"success": True, **counts}
 
 @router.get("/read-json/{filename}")
 async def read_json_file(filename: str):
-    """Read and return content of a specific JSON file"""
+    """Read and return content of a specific extracted text file"""
     import os
     json_path = os.path.join("uploads/extracted_texts", filename)
     
@@ -226,3 +258,29 @@ async def read_json_file(filename: str):
         return data
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/read-page/{filename}/{page_number}")
+async def read_extracted_page(filename: str, page_number: int):
+    """Text of a single PDF page, read from an archive's page index"""
+    path = os.path.join("uploads/extracted_texts", os.path.basename(filename))
+    
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Extracted text file not found")
+    if not TextArchive.is_archive(path):
+        raise HTTPException(status_code=400, detail="Page access needs an archive; legacy JSON files have no page index")
+    
+    text = TextArchive.read_page(path, page_number)
+    if text is None:
+        raise HTTPException(status_code=404, detail=f"Page {page_number} has no extracted text")
+    return {"filename": filename, "page_number": page_number, "text": text}
+
+@router.post("/documents/gc")
+async def collect_document_garbage():
+    """Delete stored documents no upload references and stray files, after DOCUMENT_GC_GRACE_HOURS"""
+    removed = await asyncio.to_thread(document_store.collect_garbage)
+    return {"success": True, **removed}
+
+@router.get("/documents/stats")
+async def document_store_stats(db: Session = Depends(get_db)):
+    """Stored documents, references (UploadedFile rows) and dedup hit counts for this worker"""
+    return document_store.stats(db)
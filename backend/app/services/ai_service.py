@@ -1,47 +1,209 @@
+from typing import Dict, Iterator, List, Optional
 from google import genai
 from app.config.settings import settings
+from app.services.llm_cache import LLMResponseCache
+from app.utils.retry import retry_async, EmptyResponseError, RateLimiter, LLM_RETRY_POLICIES, gemini_retry_budget
+import asyncio
 import json
+import os
 import re
 
+CHARS_PER_TOKEN = 4  # rough estimate for English text; no tokenizer dependency
+PAGE_BREAK = re.compile(r"(?=\n\n--- Page \d+ ---\n)")
+# Header combine_multiple_json_texts puts before each file
+SOURCE_HEADER = re.compile(r"\n\n={50}\nSOURCE: [^\n]*\n={50}\n\n")
+TOPIC_PREFIX = re.compile(r"^(?:(?:unit|module|chapter|part)\s*[\divxlc]+\b\s*[:.\-–]?\s*|[\divxlc]+[.)]\s+)", re.IGNORECASE)
+
+
+class TopicExtractionError(Exception):
+    """Too many chunks failed for the merged topics to represent the text"""
+
+
 class AIService:
     def __init__(self):
         self.client = genai.Client(api_key=settings.GEMINI_API_KEY)
         # Try gemini-2.0-flash if 2.5-pro continues to have issues
         self.model = "models/gemini-2.5-pro"
-    
+
+        # Per-chunk topic results; the disk tier (LLM_CACHE_DB_PATH) is shared with
+        # LLMService, so every worker reuses chunks any worker has already extracted
+        self.chunk_cache = LLMResponseCache(
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000")),
+            db_path=os.getenv("LLM_CACHE_DB_PATH") or None
+        )
+        self.semaphore = asyncio.Semaphore(settings.TOPIC_EXTRACTION_CONCURRENCY)
+        self.rate_limiter = RateLimiter(settings.TOPIC_EXTRACTION_RPM)
+
     async def extract_topics(self, text: str, subject: str) -> list:
-        """Extract topics - simplified version"""
-        
+        """Weighted topics for the whole text; see extract_topics_report"""
+        return (await self.extract_topics_report(text, subject))["topics"]
+
+    async def extract_topics_report(self, text: str, subject: str) -> Dict:
+        """
+        Extract weighted topics from the whole text (map-reduce)
+        - map: the text is split into ~TOPIC_CHUNK_TOKENS chunks, each extracted
+          concurrently (at most TOPIC_EXTRACTION_CONCURRENCY calls at once,
+          TOPIC_EXTRACTION_RPM per minute, retried with backoff)
+        - reduce: topics merged by normalized name, weighted by how much of
+          the text they cover, rescaled to 1-10
+        - chunk results are cached by content, so re-uploads and overlapping
+          documents only pay for chunks not seen before
+        - raises TopicExtractionError when more than TOPIC_EXTRACTION_MAX_FAILED_FRACTION
+          of the chunks failed; fewer failures return partial=True
+        - fallback=True when nothing was extracted and the topics are the generic defaults
+        """
+        chunks = list(self._chunk_text(text, settings.TOPIC_CHUNK_TOKENS * CHARS_PER_TOKEN))
+        if not chunks:
+            return {"topics": self._default_topics(), "chunks": 0, "failed_chunks": 0, "partial": False, "fallback": True}
+
+        results = await asyncio.gather(*(self._extract_chunk_topics(chunk, subject) for chunk in chunks))
+        cached = sum(1 for _, hit in results if hit)
+        failed = sum(1 for topics, _ in results if topics is None)
+        extracted = [(len(chunk), topics) for chunk, (topics, _) in zip(chunks, results) if topics]
+        print(f"🧩 Topic extraction: {len(chunks)} chunks ({cached} cached, {failed} failed)")
+
+        if failed > settings.TOPIC_EXTRACTION_MAX_FAILED_FRACTION * len(chunks):
+            raise TopicExtractionError(f"Topic extraction failed for {failed} of {len(chunks)} chunks")
+
+        if not extracted:
+            topics = self._default_topics()
+        elif len(chunks) == 1:
+            topics = extracted[0][1]
+        else:
+            topics = self._merge_topics(extracted, settings.TOPIC_EXTRACTION_MAX_TOPICS)
+        return {
+            "topics": topics,
+            "chunks": len(chunks),
+            "failed_chunks": failed,
+            "partial": failed > 0,
+            "fallback": not extracted
+        }
+
+    async def _extract_chunk_topics(self, chunk: str, subject: str):
+        """(topics, cache hit) for one chunk; topics is None if the chunk failed"""
         prompt = f"""
         Analyze this {subject} content and extract topics with weights (1-10).
-        
+
         Content:
-        {text[:3500]}
-        
+        {chunk}
+
         Return JSON: {{"topics": [{{"name": "Topic", "weight": 8}}]}}
         """
-        
-        try:
+
+        cache_key = self.chunk_cache.make_key(prompt, None, 0.0, 0, self.model)
+        cached = await self.chunk_cache.aget(cache_key)
+        if cached:
+            return cached["topics"], True
+
+        async def call_api():
+            await self.rate_limiter.acquire()
             # Simpler config without max_output_tokens
-            response = self.client.models.generate_content(
+            response = await self.client.aio.models.generate_content(
                 model=self.model,
                 contents=prompt
             )
-            
             if not response or not response.text:
-                return self._default_topics()
-            
+                raise EmptyResponseError("Gemini returned empty response")
+            return response
+
+        try:
+            async with self.semaphore:
+                response = await retry_async(call_api, LLM_RETRY_POLICIES, gemini_retry_budget, label="Topic extraction")
+
             content = response.text.strip()
             content = re.sub(r'^```json\s*', '', content)
             content = re.sub(r'^```', '', content)
             content = re.sub(r'\s*```$', '', content)
-            
-            result = json.loads(content.strip())
-            return result.get("topics", self._default_topics())
-            
-        except:
-            return self._default_topics()
-    
+
+            topics = self._clean_topics(json.loads(content.strip()).get("topics"))
+            if topics:
+                await self.chunk_cache.aset(cache_key, {"topics": topics}, settings.TOPIC_CHUNK_CACHE_TTL)
+            return topics, False
+
+        except Exception as e:
+            print(f"⚠️ Topic extraction chunk failed: {type(e).__name__}: {e}")
+            return None, False
+
+    @classmethod
+    def _chunk_text(cls, text: str, max_chars: int) -> Iterator[str]:
+        """
+        Chunks of at most max_chars, packed per source file
+        Each file starts a new chunk (its SOURCE header dropped), so a file chunks
+        the same way whatever it is combined with, and its chunks hit the cache
+        """
+        for document in SOURCE_HEADER.split(text):
+            yield from cls._chunk_document(document, max_chars)
+
+    @staticmethod
+    def _chunk_document(text: str, max_chars: int) -> Iterator[str]:
+        """Pack pages (then paragraphs, then words) into chunks of at most max_chars"""
+        pieces = []
+        for page in PAGE_BREAK.split(text):
+            if len(page) <= max_chars:
+                pieces.append(page)
+                continue
+            for paragraph in re.split(r"(?<=\n)\n", page):
+                while len(paragraph) > max_chars:
+                    cut = paragraph.rfind(" ", 0, max_chars)
+                    cut = cut if cut > 0 else max_chars
+                    pieces.append(paragraph[:cut])
+                    paragraph = paragraph[cut:]
+                pieces.append(paragraph)
+
+        current = ""
+        for piece in pieces:
+            if current and len(current) + len(piece) > max_chars:
+                if current.strip():
+                    yield current.strip()
+                current = ""
+            current += piece
+        if current.strip():
+            yield current.strip()
+
+    @staticmethod
+    def _clean_topics(topics) -> List[Dict]:
+        """Keep well-formed {"name", "weight"} entries, weight clamped to 1-10"""
+        cleaned = []
+        for topic in topics if isinstance(topics, list) else []:
+            if not isinstance(topic, dict) or not str(topic.get("name") or "").strip():
+                continue
+            try:
+                weight = float(topic.get("weight", 5))
+            except (TypeError, ValueError):
+                weight = 5
+            weight = min(10, max(1, weight))
+            cleaned.append({"name": str(topic["name"]).strip(), "weight": int(weight) if weight == int(weight) else weight})
+        return cleaned
+
+    @staticmethod
+    def _normalize_topic_name(name: str) -> str:
+        """"Unit 2: Process Scheduling." and "process  scheduling" are the same topic"""
+        name = TOPIC_PREFIX.sub("", name.strip())
+        return " ".join(re.sub(r"[^\w\s]", " ", name.casefold()).split())
+
+    def _merge_topics(self, extracted: List[tuple], max_topics: Optional[int] = None) -> List[Dict]:
+        """
+        Reduce per-chunk topics: score = sum of weight x chunk length over the
+        chunks naming the topic, rescaled so the top topic gets 10
+        """
+        total = sum(length for length, _ in extracted)
+        merged: Dict[str, Dict] = {}
+        for length, topics in extracted:
+            for topic in topics:
+                key = self._normalize_topic_name(topic["name"]) or topic["name"].casefold()
+                entry = merged.setdefault(key, {"name": topic["name"], "score": 0.0, "best": 0})
+                entry["score"] += topic["weight"] * length / total
+                if topic["weight"] > entry["best"]:
+                    # Display the name the highest-weighted mention used
+                    entry["name"], entry["best"] = topic["name"], topic["weight"]
+
+        ranked = sorted(merged.values(), key=lambda entry: -entry["score"])[:max_topics]
+        top = ranked[0]["score"]
+        return [
+            {"name": entry["name"], "weight": max(1, round(10 * entry["score"] / top))}
+            for entry in ranked
+        ]
+
     def _default_topics(self):
         return [
             {"name": "Introduction", "weight": 6},
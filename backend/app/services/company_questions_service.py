@@ -34,7 +34,7 @@ class CompanyQuestionsService:
         
         print(f"✓ Loaded {len(self.companies_cache)} companies")
     
-    def get_company_questions(self, company_name: str, role: str) -> Dict:
+    async def get_company_questions(self, company_name: str, role: str) -> Dict:
         """
         Get questions for a specific company
         Returns curated list or AI-generated fallback
@@ -48,7 +48,7 @@ class CompanyQuestionsService:
         
         # Fallback: Generate using AI
         print(f"⚠️  No curated data for {company_name}, generating with AI...")
-        return self._generate_with_ai(company_name, role)
+        return await self._generate_with_ai(company_name, role)
     
     def _format_response(self, company_data: Dict, role: str) -> Dict:
         """Format company data for response"""
@@ -82,7 +82,7 @@ class CompanyQuestionsService:
             "role_specific_notes": self._get_role_notes(role)
         }
     
-    def _generate_with_ai(self, company_name: str, role: str) -> Dict:
+    async def _generate_with_ai(self, company_name: str, role: str) -> Dict:
         """Generate question patterns using AI when company not in database"""
         
         prompt = f"""Generate a comprehensive interview preparation guide for {company_name} for the role of {role}.
@@ -111,7 +111,7 @@ Return in this JSON format:
 Return ONLY valid JSON, no other text."""
 
         try:
-            result = self.llm_service.generate_content(
+            result = await self.llm_service.agenerate_content(
                 prompt=prompt,
                 temperature=0.7,
                 max_tokens=2000,
@@ -0,0 +1,237 @@
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+from sqlalchemy import update, delete, func, exists, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.config.database import SessionLocal
+from app.config.settings import settings
+from app.models.models import StoredDocument, UploadedFile
+from app.services.extracted_file_catalog import ExtractedFileCatalog
+from app.services.pdf_service import PDFService, INCOMING_PREFIX, HEAD_CHARS
+from app.services.single_flight import generation_flight
+from app.services.text_archive import TextArchive, PARTIAL_PREFIX
+import asyncio
+import os
+import re
+import time
+
+HASH_FILENAME = re.compile(r"^[0-9a-f]{64}\.(pdf|json|sbt)$")
+
+
+class DocumentStore:
+    """
+    Content-addressed store for uploaded PDFs and their extracted text
+    - keyed by the SHA-256 of the PDF bytes: uploads/pdfs/<hash>.pdf and
+      uploads/extracted_texts/<hash>.sbt (TextArchive)
+    - a hit skips extraction and reuses the extracted text and cached topics
+    - concurrent uploads of a new file extract it once (generation_flight)
+    - references are the UploadedFile rows with its content_hash (deleted with
+      their plan); plan-less uploads keep it alive for the grace period after
+      last_used_at. collect_garbage() deletes documents with neither
+    - extracted_files catalog rows are written and deleted with the files
+    """
+
+    def __init__(self, pdf_service: PDFService):
+        self.pdf_service = pdf_service
+        self.catalog = ExtractedFileCatalog(pdf_service)
+        self.hits = 0
+        self.misses = 0
+
+    def _paths(self, content_hash: str) -> Tuple[str, str]:
+        return (
+            os.path.join(self.pdf_service.upload_dir, f"{content_hash}.pdf"),
+            os.path.join(self.pdf_service.extracted_dir, f"{content_hash}{TextArchive.EXTENSION}")
+        )
+
+    @staticmethod
+    def _is_stored(document: Optional[StoredDocument]) -> bool:
+        return document is not None and bool(document.json_path) and os.path.exists(document.json_path)
+
+    # ------------------------------------------------------------------
+    # Ingest
+    # ------------------------------------------------------------------
+
+    async def ingest(
+        self, db: Session, spooled_path: str, content_hash: str, size: int, filename: str, file_type: str
+    ) -> Tuple[StoredDocument, bool]:
+        """
+        Take ownership of a spooled upload and return its document, marked as used
+        Returns (document, reused); raises ValueError when the PDF has no text
+        - the caller that leads extraction hands its spooled file to the leader
+          task, which outlives a cancelled request; every other caller removes its own
+        """
+        existing = db.query(StoredDocument).filter(StoredDocument.content_hash == content_hash).first()
+        key = f"document:{content_hash}"
+        leading = False
+        try:
+            document = self.touch(db, content_hash) if self._is_stored(existing) else None
+            reused = document is not None
+            if not reused:
+                async def leader():
+                    return await asyncio.to_thread(self._store, spooled_path, content_hash, size, filename, file_type)
+
+                async def follower():
+                    return True  # the leader extracted it for us
+
+                # run() starts the leader task before its first await, so this can't go stale
+                leading = not generation_flight.in_flight(key)
+                reused = await generation_flight.run(key, leader, follower)
+                document = self.touch(db, content_hash)
+            if reused:
+                self.hits += 1
+            else:
+                self.misses += 1
+        finally:
+            if not leading and os.path.exists(spooled_path):
+                os.remove(spooled_path)
+
+        if document is None:
+            raise ValueError("No text could be extracted from PDF")
+        return document, reused
+
+    def _store(self, spooled_path: str, content_hash: str, size: int, filename: str, file_type: str) -> bool:
+        """
+        Extract a new document and record it (blocking; one caller per hash)
+        Returns True when another worker had already stored it
+        Owns spooled_path: it is moved into the store or removed
+        """
+        db = SessionLocal()
+        try:
+            document = db.query(StoredDocument).filter(StoredDocument.content_hash == content_hash).first()
+            if self._is_stored(document):
+                return True
+
+            pdf_path, json_path = self._paths(content_hash)
+            extracted = self.pdf_service.extract_to_archive(
+                spooled_path, filename, file_type, archive_filename=os.path.basename(json_path)
+            )
+            if extracted["text_length"] == 0:
+                os.remove(json_path)
+                return False
+            os.replace(spooled_path, pdf_path)
+
+            if document is None:
+                document = StoredDocument(content_hash=content_hash)
+                db.add(document)
+            document.filename = filename
+            document.size_bytes = size
+            document.pdf_path = pdf_path
+            document.json_path = json_path
+            document.text_length = extracted["text_length"]
+            document.preview = extracted["head"][:HEAD_CHARS]
+            document.last_used_at = datetime.utcnow()
+            self.catalog.record(db, json_path, extracted, content_hash=content_hash)
+            try:
+                db.commit()
+            except IntegrityError:
+                db.rollback()  # same bytes stored concurrently by another worker; files are identical
+            print(f"✓ Stored document {content_hash[:12]}: {extracted['text_length']} characters")
+            return False
+        finally:
+            db.close()
+            if os.path.exists(spooled_path):
+                os.remove(spooled_path)
+
+    # ------------------------------------------------------------------
+    # References
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _referenced():
+        """An UploadedFile row points at the document"""
+        return exists().where(UploadedFile.content_hash == StoredDocument.content_hash)
+
+    def touch(self, db: Session, content_hash: str) -> Optional[StoredDocument]:
+        """Mark the document used now (restarts its grace period) and return it; caller commits"""
+        result = db.execute(
+            update(StoredDocument)
+            .where(StoredDocument.content_hash == content_hash)
+            .values(last_used_at=datetime.utcnow())
+        )
+        if result.rowcount == 0:
+            return None
+        return db.query(StoredDocument).filter(StoredDocument.content_hash == content_hash).populate_existing().first()
+
+    def find_by_json_paths(self, db: Session, json_paths: List[str]) -> List[StoredDocument]:
+        names = [os.path.basename(path) for path in json_paths]
+        hashes = [name.rsplit(".", 1)[0] for name in names if HASH_FILENAME.match(name)]
+        if not hashes:
+            return []
+        return db.query(StoredDocument).filter(StoredDocument.content_hash.in_(hashes)).all()
+
+    # ------------------------------------------------------------------
+    # Garbage collection
+    # ------------------------------------------------------------------
+
+    def collect_garbage(self, grace_hours: Optional[float] = None) -> Dict:
+        """Blocking; runs in a thread, in a session of its own"""
+        db = SessionLocal()
+        try:
+            return self._collect_garbage(db, grace_hours)
+        finally:
+            db.close()
+
+    def _collect_garbage(self, db: Session, grace_hours: Optional[float]) -> Dict:
+        """
+        Delete unreferenced documents and stray files older than the grace period
+        - documents no UploadedFile row points at, unused for grace_hours: row, PDF and text
+        - <hash>.pdf / <hash>.sbt (or older .json) files with no document row
+        - spooled uploads and half-written archives left behind by a crashed request
+        Legacy timestamped files are never touched.
+        """
+        grace_hours = settings.DOCUMENT_GC_GRACE_HOURS if grace_hours is None else grace_hours
+        cutoff = datetime.utcnow() - timedelta(hours=grace_hours)
+        removed = {"documents": 0, "files": 0, "bytes": 0}
+
+        unused = (~self._referenced(), StoredDocument.last_used_at < cutoff)
+        candidates = db.query(StoredDocument).filter(*unused).all()
+        for document in candidates:
+            # Re-check in the DELETE so an upload that used it meanwhile keeps it
+            deleted = db.execute(
+                delete(StoredDocument).where(StoredDocument.id == document.id, *unused)
+            ).rowcount
+            if deleted:
+                self.catalog.remove(db, document.json_path)
+            db.commit()
+            if deleted:
+                removed["documents"] += 1
+                for path in (document.pdf_path, document.json_path):
+                    self._remove_file(path, removed)
+
+        known = {h for (h,) in db.query(StoredDocument.content_hash).all()}
+        cutoff_ts = time.time() - grace_hours * 3600
+        for directory in (self.pdf_service.upload_dir, self.pdf_service.extracted_dir):
+            for name in os.listdir(directory):
+                path = os.path.join(directory, name)
+                stray = (HASH_FILENAME.match(name) and name.rsplit(".", 1)[0] not in known) or \
+                    name.startswith((INCOMING_PREFIX, PARTIAL_PREFIX))
+                if stray and os.path.getmtime(path) < cutoff_ts:
+                    self._remove_file(path, removed)
+                    if directory == self.pdf_service.extracted_dir:
+                        self.catalog.remove(db, path)
+        db.commit()
+
+        print(f"🧹 Document GC: {removed['documents']} documents, {removed['files']} files, {removed['bytes']} bytes")
+        return removed
+
+    @staticmethod
+    def _remove_file(path: Optional[str], removed: Dict):
+        if path and os.path.exists(path):
+            removed["bytes"] += os.path.getsize(path)
+            os.remove(path)
+            removed["files"] += 1
+
+    def stats(self, db: Session) -> Dict:
+        documents, size = db.query(func.count(StoredDocument.id), func.sum(StoredDocument.size_bytes)).one()
+        referenced = db.query(func.count(StoredDocument.id)).filter(self._referenced()).scalar()
+        references = db.query(func.count(UploadedFile.id)).filter(
+            UploadedFile.content_hash.in_(select(StoredDocument.content_hash))
+        ).scalar()
+        return {
+            "documents": documents,
+            "referenced": referenced,
+            "references": references,
+            "bytes": size or 0,
+            "hits": self.hits,
+            "misses": self.misses
+        }
@@ -0,0 +1,158 @@
+from typing import Dict, Optional
+from datetime import datetime
+from sqlalchemy import select, delete
+from sqlalchemy.orm import Session
+from app.config.database import SessionLocal
+from app.models.models import ExtractedFile, UploadedFile
+from app.services.text_archive import TextArchive
+import os
+import re
+
+TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+HASH_NAME = re.compile(r"^([0-9a-f]{64})\.(json|sbt)$")
+MAX_PAGE_SIZE = 200
+
+
+class ExtractedFileCatalog:
+    """
+    extracted_files rows for the files in uploads/extracted_texts
+    - record()/remove() are called by the code that writes or deletes a file,
+      in the same transaction
+    - list_files(): one indexed query, filtered and keyset-paginated by id
+    - rebuild(): resync from disk (files copied in, deleted by hand, or written
+      before the catalog existed)
+    """
+
+    def __init__(self, pdf_service):
+        self.pdf_service = pdf_service
+
+    @staticmethod
+    def _parse_timestamp(value) -> Optional[datetime]:
+        try:
+            return datetime.strptime(value, TIMESTAMP_FORMAT)
+        except (TypeError, ValueError):
+            return None
+
+    def record(self, db: Session, path: str, metadata: Dict, content_hash: Optional[str] = None) -> ExtractedFile:
+        """Insert or refresh the row for a file just written; caller commits"""
+        filename = os.path.basename(path)
+        entry = db.query(ExtractedFile).filter(ExtractedFile.filename == filename).first()
+        if entry is None:
+            entry = ExtractedFile(filename=filename)
+            db.add(entry)
+        entry.filepath = path
+        entry.original_filename = metadata.get("filename")
+        entry.file_type = metadata.get("file_type")
+        entry.text_length = metadata.get("text_length") or 0
+        entry.page_count = metadata.get("page_count")
+        entry.size_bytes = os.path.getsize(path) if os.path.exists(path) else None
+        entry.content_hash = content_hash
+        entry.extracted_at = self._parse_timestamp(metadata.get("extracted_at"))
+        return entry
+
+    def remove(self, db: Session, path: str):
+        """Drop the row for a deleted file; caller commits"""
+        db.execute(delete(ExtractedFile).where(ExtractedFile.filename == os.path.basename(path)))
+
+    def list_files(
+        self,
+        db: Session,
+        file_type: Optional[str] = None,
+        plan_id: Optional[int] = None,
+        content_hash: Optional[str] = None,
+        cursor: Optional[int] = None,
+        limit: int = 50
+    ) -> Dict:
+        """Newest first; pass next_cursor back as cursor for the following page"""
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        query = select(ExtractedFile)
+        if file_type:
+            query = query.where(ExtractedFile.file_type == file_type)
+        if content_hash:
+            query = query.where(ExtractedFile.content_hash == content_hash)
+        if plan_id is not None:
+            query = query.where(ExtractedFile.content_hash.in_(
+                select(UploadedFile.content_hash).where(UploadedFile.plan_id == plan_id)
+            ))
+        if cursor is not None:
+            query = query.where(ExtractedFile.id < cursor)
+
+        rows = db.scalars(query.order_by(ExtractedFile.id.desc()).limit(limit + 1)).all()
+        page = rows[:limit]
+        return {
+            "files": [self.to_dict(entry) for entry in page],
+            "next_cursor": page[-1].id if len(rows) > limit else None
+        }
+
+    @staticmethod
+    def to_dict(entry: ExtractedFile) -> Dict:
+        return {
+            "filename": entry.filename,
+            "filepath": entry.filepath,
+            "original_filename": entry.original_filename,
+            "file_type": entry.file_type,
+            "text_length": entry.text_length,
+            "page_count": entry.page_count,
+            "size_bytes": entry.size_bytes,
+            "content_hash": entry.content_hash,
+            "extracted_at": entry.extracted_at.strftime(TIMESTAMP_FORMAT) if entry.extracted_at else None
+        }
+
+    # ------------------------------------------------------------------
+    # Resync from disk
+    # ------------------------------------------------------------------
+
+    def rebuild(self) -> Dict:
+        """Blocking; runs in a thread, in a session of its own"""
+        db = SessionLocal()
+        try:
+            return self._rebuild(db)
+        finally:
+            db.close()
+
+    def _rebuild(self, db: Session) -> Dict:
+        """Add rows for uncatalogued files, refresh changed ones, drop rows for missing files; commits"""
+        counts = {"added": 0, "updated": 0, "removed": 0, "failed": 0}
+        extracted_dir = self.pdf_service.extracted_dir
+        if not os.path.isdir(extracted_dir):
+            return counts
+
+        known = {
+            filename: size
+            for filename, size in db.query(ExtractedFile.filename, ExtractedFile.size_bytes).all()
+        }
+        on_disk = set()
+        for filename in sorted(os.listdir(extracted_dir)):
+            if not filename.endswith((".json", TextArchive.EXTENSION)):
+                continue
+            path = os.path.join(extracted_dir, filename)
+            on_disk.add(filename)
+            if known.get(filename) == os.path.getsize(path):
+                continue
+            try:
+                metadata = self.pdf_service.read_extracted_metadata(path)
+            except Exception as e:
+                counts["failed"] += 1
+                print(f"  ⚠️ Skipping unreadable extracted file {filename}: {e}")
+                continue
+            match = HASH_NAME.match(filename)
+            self.record(db, path, metadata, content_hash=match.group(1) if match else None)
+            counts["updated" if filename in known else "added"] += 1
+
+        missing = set(known) - on_disk
+        if missing:
+            db.execute(delete(ExtractedFile).where(ExtractedFile.filename.in_(missing)))
+            counts["removed"] = len(missing)
+        db.commit()
+        return counts
+
+    def backfill_if_empty(self, db: Session) -> Dict:
+        """Catalog files written before extracted_files existed (first start after upgrade)"""
+        if db.query(ExtractedFile.id).first() is not None:
+            return {}
+        extracted_dir = self.pdf_service.extracted_dir
+        if not os.path.isdir(extracted_dir) or not os.listdir(extracted_dir):
+            return {}
+        counts = self._rebuild(db)
+        print(f"✓ Backfilled extracted_files catalog: {counts['added']} files")
+        return counts
@@ -0,0 +1,305 @@
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from contextlib import closing
+from app.config.settings import settings
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import time
+import uuid
+
+# handler(payload, report_progress) -> result dict; report_progress is awaited
+JobHandler = Callable[[Dict, Callable[[float, str], Awaitable[None]]], Awaitable[Dict]]
+
+
+class JobQueue:
+    """
+    In-process background job queue backed by a local SQLite file
+    - All gunicorn workers on a host share the same queue file
+    - Each worker runs a few asyncio consumers that claim jobs atomically
+    - A dedupe key allows at most one queued/running job per key
+    - Higher priority jobs are claimed first, FIFO within a priority
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        concurrency: int = 2,
+        poll_interval: float = 1.0,
+        stale_after: float = 600.0,
+        keep_finished_for: float = 24 * 3600
+    ):
+        self.db_path = db_path
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.keep_finished_for = keep_finished_for
+
+        self.handlers: Dict[str, JobHandler] = {}
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._consumers = []
+        self._initialized = False
+
+    def register(self, job_type: str, handler: JobHandler):
+        """Register the coroutine that runs jobs of this type"""
+        self.handlers[job_type] = handler
+
+    # ------------------------------------------------------------------
+    # Producer API
+    # ------------------------------------------------------------------
+
+    def enqueue(
+        self,
+        job_type: str,
+        payload: Dict,
+        dedupe_key: Optional[str] = None,
+        priority: int = 0
+    ) -> Tuple[Dict, bool]:
+        """
+        Add a job; returns (job, created)
+        If an active job with the same dedupe_key exists, that job is returned with created=False
+        (and its priority raised to this request's if it is still queued)
+        - one write transaction, so the conflicting job can't finish between the
+          failed INSERT and the SELECT that returns it
+        """
+        self._ensure_schema()
+        job_id = uuid.uuid4().hex
+        now = time.time()
+
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT INTO jobs (id, job_type, payload, dedupe_key, status, progress, priority, created_at) "
+                    "VALUES (?, ?, ?, ?, 'queued', 0, ?, ?)",
+                    (job_id, job_type, json.dumps(payload), dedupe_key, priority, now)
+                )
+                created = True
+                row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            except sqlite3.IntegrityError:
+                conn.execute(
+                    "UPDATE jobs SET priority = ? WHERE dedupe_key = ? AND status = 'queued' AND priority < ?",
+                    (priority, dedupe_key, priority)
+                )
+                created = False
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE dedupe_key = ? AND status IN ('queued', 'running')",
+                    (dedupe_key,)
+                ).fetchone()
+            conn.execute("COMMIT")
+            return self._row_to_job(row), created
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        self._ensure_schema()
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def stats(self) -> Dict:
+        self._ensure_schema()
+        with closing(self._connect()) as conn, conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {
+            "by_status": {row["status"]: row["n"] for row in rows},
+            "consumers": len(self._consumers),
+            "worker": self.worker_id
+        }
+
+    # ------------------------------------------------------------------
+    # Consumer side
+    # ------------------------------------------------------------------
+
+    async def start(self):
+        """Start consumers in this process (call from app startup)"""
+        if self._consumers:
+            return
+        await asyncio.to_thread(self._ensure_schema)
+        await asyncio.to_thread(self._requeue_stale)
+        self._consumers = [
+            asyncio.create_task(self._consume(i)) for i in range(self.concurrency)
+        ]
+        print(f"✓ Job queue started ({self.concurrency} consumers, {self.db_path})")
+
+    async def stop(self):
+        for task in self._consumers:
+            task.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._consumers = []
+
+    async def _consume(self, index: int):
+        last_housekeeping = 0.0
+        while True:
+            try:
+                if index == 0 and time.time() - last_housekeeping > 60:
+                    await asyncio.to_thread(self._requeue_stale)
+                    await asyncio.to_thread(self._purge_finished)
+                    last_housekeeping = time.time()
+
+                job = await asyncio.to_thread(self._claim)
+                if not job:
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+
+                await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Job consumer {index} error: {e}")
+                await asyncio.sleep(self.poll_interval)
+
+    async def _run(self, job: Dict):
+        handler = self.handlers.get(job["job_type"])
+        if not handler:
+            await asyncio.to_thread(self._finish, job["id"], "failed", None, f"No handler for {job['job_type']}")
+            return
+
+        async def report_progress(progress: float, message: str = None):
+            await asyncio.to_thread(self._update_progress, job["id"], progress, message)
+
+        print(f"⚙️ Running job {job['id']} ({job['job_type']})")
+        try:
+            result = await handler(job["payload"], report_progress)
+        except asyncio.CancelledError:
+            # Worker shutting down - let another consumer pick it up
+            await asyncio.to_thread(self._release, job["id"])
+            raise
+        except Exception as e:
+            print(f"❌ Job {job['id']} failed: {e}")
+            await asyncio.to_thread(self._finish, job["id"], "failed", None, str(e))
+            return
+
+        await asyncio.to_thread(self._finish, job["id"], "completed", result, None)
+        print(f"✓ Job {job['id']} completed")
+
+    # ------------------------------------------------------------------
+    # SQLite helpers
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        # "with conn" doesn't close it; callers wrap it in closing()
+        conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _ensure_schema(self):
+        if self._initialized:
+            return
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, job_type TEXT NOT NULL, payload TEXT NOT NULL, "
+                "dedupe_key TEXT, status TEXT NOT NULL, progress REAL DEFAULT 0, message TEXT, "
+                "result TEXT, error TEXT, attempts INTEGER DEFAULT 0, worker TEXT, priority INTEGER DEFAULT 0, "
+                "created_at REAL NOT NULL, started_at REAL, heartbeat_at REAL, finished_at REAL)"
+            )
+            # Queue files created before priorities existed
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "priority" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN priority INTEGER DEFAULT 0")
+            # At most one active job per dedupe key
+            conn.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS ux_jobs_active_dedupe ON jobs(dedupe_key) "
+                "WHERE status IN ('queued', 'running')"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_jobs_claim ON jobs(status, priority, created_at)")
+        self._initialized = True
+
+    def _claim(self) -> Optional[Dict]:
+        """Atomically move the next queued job (highest priority, then oldest) to running"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' ORDER BY priority DESC, created_at LIMIT 1"
+            ).fetchone()
+            if not row:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, started_at = ?, heartbeat_at = ?, "
+                "attempts = attempts + 1 WHERE id = ?",
+                (self.worker_id, now, now, row["id"])
+            )
+            # Return the job as claimed (status running), not as it was read
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+            conn.execute("COMMIT")
+            return self._row_to_job(row)
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _update_progress(self, job_id: str, progress: float, message: Optional[str]):
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE jobs SET progress = ?, message = COALESCE(?, message), heartbeat_at = ? WHERE id = ?",
+                (round(min(max(progress, 0.0), 1.0), 3), message, time.time(), job_id)
+            )
+
+    def _finish(self, job_id: str, status: str, result: Optional[Dict], error: Optional[str]):
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, "
+                "progress = CASE WHEN ? = 'completed' THEN 1 ELSE progress END WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, error, time.time(), status, job_id)
+            )
+
+    def _release(self, job_id: str):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("UPDATE jobs SET status = 'queued', worker = NULL WHERE id = ?", (job_id,))
+
+    def _requeue_stale(self):
+        """Jobs whose worker stopped heartbeating (crash, redeploy) go back to the queue"""
+        with closing(self._connect()) as conn, conn:
+            requeued = conn.execute(
+                "UPDATE jobs SET status = 'queued', worker = NULL "
+                "WHERE status = 'running' AND heartbeat_at < ?",
+                (time.time() - self.stale_after,)
+            ).rowcount
+        if requeued:
+            print(f"⚠️ Requeued {requeued} stale jobs")
+
+    def _purge_finished(self):
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "DELETE FROM jobs WHERE status IN ('completed', 'failed') AND finished_at < ?",
+                (time.time() - self.keep_finished_for,)
+            )
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Dict:
+        return {
+            "id": row["id"],
+            "job_type": row["job_type"],
+            "payload": json.loads(row["payload"]),
+            "status": row["status"],
+            "progress": row["progress"],
+            "message": row["message"],
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "attempts": row["attempts"],
+            "priority": row["priority"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"]
+        }
+
+
+job_queue = JobQueue(
+    db_path=settings.JOB_QUEUE_DB_PATH,
+    concurrency=settings.JOB_QUEUE_WORKERS
+)
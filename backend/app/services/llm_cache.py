@@ -0,0 +1,194 @@
+from typing import Optional, Dict
+from collections import OrderedDict
+from contextlib import closing
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class LLMResponseCache:
+    """
+    Content-addressed cache for LLM responses
+    - Tier 1: in-process LRU with per-entry TTL
+    - Tier 2: optional SQLite file shared by all workers on the host
+    - aget()/aset(): for async callers; the SQLite tier runs in a thread
+    """
+
+    def __init__(self, max_entries: int = 1000, db_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.db_path = db_path
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.db_path:
+            self._init_disk()
+
+    @staticmethod
+    def make_key(
+        prompt: str,
+        system_instruction: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        provider: Optional[str]
+    ) -> str:
+        """SHA-256 over everything that changes the completion"""
+        payload = json.dumps(
+            [prompt, system_instruction, temperature, max_tokens, provider],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return cached value or None (expired entries count as misses; blocking)"""
+        now = time.time()
+        value = self._memory_get(key, now)
+        if value is None and self.db_path:
+            value = self._promote(key, self._disk_get(key, now))
+        return self._count_miss(value)
+
+    async def aget(self, key: str) -> Optional[Dict]:
+        """get() without blocking the event loop on the SQLite tier"""
+        now = time.time()
+        value = self._memory_get(key, now)
+        if value is None and self.db_path:
+            value = self._promote(key, await asyncio.to_thread(self._disk_get, key, now))
+        return self._count_miss(value)
+
+    def set(self, key: str, value: Dict, ttl: int):
+        """Store value for ttl seconds in every enabled tier (blocking)"""
+        expires_at = time.time() + ttl
+
+        with self._lock:
+            self._store(key, expires_at, value)
+
+        if self.db_path:
+            self._disk_set(key, expires_at, value)
+
+    async def aset(self, key: str, value: Dict, ttl: int):
+        """set() without blocking the event loop on the SQLite tier"""
+        expires_at = time.time() + ttl
+
+        with self._lock:
+            self._store(key, expires_at, value)
+
+        if self.db_path:
+            await asyncio.to_thread(self._disk_set, key, expires_at, value)
+
+    def clear(self):
+        """Drop every cached entry"""
+        with self._lock:
+            self._entries.clear()
+
+        if self.db_path:
+            with closing(self._connect()) as conn, conn:
+                conn.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for monitoring"""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 3) if lookups > 0 else 0,
+            "disk_tier": bool(self.db_path)
+        }
+
+    def _memory_get(self, key: str, now: float) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+        return None
+
+    def _promote(self, key: str, entry: Optional[tuple]) -> Optional[Dict]:
+        """Copy a disk hit into the LRU tier"""
+        if not entry:
+            return None
+        expires_at, value = entry
+        with self._lock:
+            self.disk_hits += 1
+            self._store(key, expires_at, value)
+        return value
+
+    def _count_miss(self, value: Optional[Dict]) -> Optional[Dict]:
+        if value is None:
+            with self._lock:
+                self.misses += 1
+        return value
+
+    def _store(self, key: str, expires_at: float, value: Dict):
+        """Insert into the LRU tier (caller holds the lock)"""
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    # ------------------------------------------------------------------
+    # SQLite tier
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3's "with conn" only commits/rolls back; callers wrap it in closing()
+        return sqlite3.connect(self.db_path, timeout=5)
+
+    def _init_disk(self):
+        try:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            with closing(self._connect()) as conn, conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS llm_cache ("
+                    "key TEXT PRIMARY KEY, expires_at REAL NOT NULL, value TEXT NOT NULL)"
+                )
+                conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+            print(f"  ✓ LLM cache disk tier: {self.db_path}")
+        except Exception as e:
+            print(f"  ✗ LLM cache disk tier disabled: {e}")
+            self.db_path = None
+
+    def _disk_get(self, key: str, now: float) -> Optional[tuple]:
+        try:
+            with closing(self._connect()) as conn, conn:
+                row = conn.execute(
+                    "SELECT expires_at, value FROM llm_cache WHERE key = ? AND expires_at > ?",
+                    (key, now)
+                ).fetchone()
+            if row:
+                return row[0], json.loads(row[1])
+        except Exception as e:
+            print(f"  ⚠️ LLM cache read failed: {e}")
+        return None
+
+    def _disk_set(self, key: str, expires_at: float, value: Dict):
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, expires_at, value) VALUES (?, ?, ?)",
+                    (key, expires_at, json.dumps(value, ensure_ascii=False))
+                )
+        except Exception as e:
+            print(f"  ⚠️ LLM cache write failed: {e}")
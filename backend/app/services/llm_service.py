@@ -1,6 +1,12 @@
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import functools
 import os
+import time
 from dotenv import load_dotenv
+from app.services.llm_cache import LLMResponseCache
+from app.services.provider_health import ProviderHealth
 
 load_dotenv()
 
@@ -17,9 +23,55 @@ class LLMService:
         self.clients = {}
         self._init_clients()
         
+        # Bounded pool for providers that have no async client, so a sync SDK
+        # call never runs on the event loop itself
+        self.executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("LLM_EXECUTOR_WORKERS", "8")),
+            thread_name_prefix="llm"
+        )
+        
+        # Hedging: if no provider has answered within LLM_HEDGE_DELAY seconds
+        # (roughly the p95 latency), the next provider is fired in parallel
+        self.hedge_delay = float(os.getenv("LLM_HEDGE_DELAY", "4.0"))
+        self.hedging_enabled = os.getenv("LLM_HEDGING", "true").lower() == "true"
+        self.default_timeout = float(os.getenv("LLM_PROVIDER_TIMEOUT", "30"))
+        self.provider_timeouts = self._parse_provider_timeouts(os.getenv("LLM_PROVIDER_TIMEOUTS", ""))
+        
+        # Circuit breaker + latency tracking per provider
+        self.health = {
+            name: ProviderHealth(
+                name,
+                window_size=int(os.getenv("LLM_HEALTH_WINDOW", "20")),
+                error_threshold=float(os.getenv("LLM_CIRCUIT_ERROR_RATE", "0.5")),
+                min_requests=int(os.getenv("LLM_CIRCUIT_MIN_REQUESTS", "4")),
+                cooldown=float(os.getenv("LLM_CIRCUIT_COOLDOWN", "30"))
+            )
+            for name in self.clients
+        }
+        
+        # Response cache - only used by calls that pass cache_ttl
+        self.cache = LLMResponseCache(
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000")),
+            db_path=os.getenv("LLM_CACHE_DB_PATH") or None
+        )
+        
         print(f"✓ LLM Service initialized")
         print(f"  Provider order: {self.provider_order}")
         print(f"  Available: {list(self.clients.keys())}")
+        print(f"  Hedging: {'after ' + str(self.hedge_delay) + 's' if self.hedging_enabled else 'off'}")
+    
+    @staticmethod
+    def _parse_provider_timeouts(raw: str) -> Dict[str, float]:
+        """Parse 'mistral:20,groq:10' into {'mistral': 20.0, 'groq': 10.0}"""
+        timeouts = {}
+        for item in raw.split(','):
+            if ':' in item:
+                name, seconds = item.split(':', 1)
+                try:
+                    timeouts[name.strip()] = float(seconds)
+                except ValueError:
+                    print(f"  ⚠️ Ignoring invalid timeout '{item}'")
+        return timeouts
     
     def _init_clients(self):
         """Initialize all available LLM clients"""
@@ -28,8 +80,11 @@ class LLMService:
         if os.getenv("MISTRAL_API_KEY"):
             try:
                 from mistralai import Mistral
+                client = Mistral(api_key=os.getenv("MISTRAL_API_KEY"))
                 self.clients['mistral'] = {
-                    'client': Mistral(api_key=os.getenv("MISTRAL_API_KEY")),
+                    'client': client,
+                    # Mistral exposes *_async methods on the same client
+                    'async_client': client if hasattr(client.chat, 'complete_async') else None,
                     'model': 'mistral-small-latest',
                     'type': 'mistral'
                 }
@@ -41,8 +96,14 @@ class LLMService:
         if os.getenv("GROQ_API_KEY"):
             try:
                 from groq import Groq
+                try:
+                    from groq import AsyncGroq
+                    async_client = AsyncGroq(api_key=os.getenv("GROQ_API_KEY"))
+                except ImportError:
+                    async_client = None
                 self.clients['groq'] = {
                     'client': Groq(api_key=os.getenv("GROQ_API_KEY")),
+                    'async_client': async_client,
                     'model': 'llama-3.3-70b-versatile',
                     'type': 'groq'
                 }
@@ -54,8 +115,10 @@ class LLMService:
         if os.getenv("GEMINI_API_KEY"):
             try:
                 from google import genai
+                client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
                 self.clients['gemini'] = {
-                    'client': genai.Client(api_key=os.getenv("GEMINI_API_KEY")),
+                    'client': client,
+                    'async_client': getattr(client, 'aio', None),
                     'model': 'gemini-2.0-flash-exp',
                     'type': 'gemini'
                 }
@@ -71,15 +134,10 @@ class LLMService:
         max_tokens: int = 2000,
         preferred_provider: Optional[str] = None
     ) -> Dict:
-        """Generate content with automatic fallback"""
-        
-        if preferred_provider and preferred_provider in self.clients:
-            providers_to_try = [preferred_provider] + [p for p in self.provider_order if p != preferred_provider]
-        else:
-            providers_to_try = self.provider_order
+        """Generate content with automatic fallback (blocking - prefer agenerate_content in routes)"""
         
         last_error = None
-        for provider_name in providers_to_try:
+        for provider_name in self._providers_to_try(preferred_provider):
             if provider_name not in self.clients:
                 continue
             
@@ -115,6 +173,323 @@ class LLMService:
             'error': f"All providers failed. Last error: {last_error}"
         }
     
+    async def agenerate_content(
+        self,
+        prompt: str,
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        preferred_provider: Optional[str] = None,
+        cache_ttl: Optional[int] = None,
+        hedge: Optional[bool] = None
+    ) -> Dict:
+        """
+        Generate content with automatic fallback without blocking the event loop
+        - cache_ttl: seconds to cache a successful response (None = no caching)
+        - hedge: override LLM_HEDGING for this call
+        """
+        
+        cache_key = None
+        if cache_ttl:
+            cache_key = self.cache.make_key(prompt, system_instruction, temperature, max_tokens, preferred_provider)
+            cached = await self.cache.aget(cache_key)
+            if cached:
+                print(f"  ⚡ Cache hit ({cached['provider']})")
+                return {**cached, 'cached': True}
+        
+        providers = self.get_effective_order(preferred_provider)
+        use_hedging = self.hedging_enabled if hedge is None else hedge
+        
+        try:
+            provider_name, response = await self._race_providers(
+                providers,
+                prompt,
+                system_instruction,
+                temperature,
+                max_tokens,
+                hedge_delay=self.hedge_delay if use_hedging else None
+            )
+        except Exception as e:
+            return {
+                'success': False,
+                'provider': None,
+                'text': None,
+                'error': f"All providers failed. Last error: {e}"
+            }
+        
+        result = {
+            'success': True,
+            'provider': provider_name,
+            'text': response,
+            'error': None
+        }
+        
+        if cache_key and response:
+            await self.cache.aset(cache_key, result, cache_ttl)
+        
+        return result
+    
+    async def astream_content(
+        self,
+        prompt: str,
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        preferred_provider: Optional[str] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Stream content as it is generated, yielding {'provider': ..., 'text': chunk}
+        - Falls back to the next provider only if nothing has been emitted yet
+        - Time to first chunk is bounded by the provider timeout
+        """
+        
+        last_error = "no providers available"
+        for provider_name in self.get_effective_order(preferred_provider):
+            health = self.health[provider_name]
+            if not health.allow_request():
+                continue
+            
+            print(f"  🤖 Streaming from {provider_name}...")
+            timeout = self.provider_timeouts.get(provider_name, self.default_timeout)
+            started = time.monotonic()
+            stream = self._astream_provider(provider_name, prompt, system_instruction, temperature, max_tokens)
+            emitted = False
+            
+            try:
+                first = await asyncio.wait_for(stream.__anext__(), timeout=timeout)
+                emitted = True
+                yield {'provider': provider_name, 'text': first}
+                
+                async for chunk in stream:
+                    yield {'provider': provider_name, 'text': chunk}
+            except StopAsyncIteration:
+                pass  # provider returned an empty completion
+            except (asyncio.CancelledError, GeneratorExit):
+                # Client went away - not the provider's fault
+                health.release()
+                await stream.aclose()
+                raise
+            except Exception as e:
+                last_error = str(e) or f"{provider_name} timed out after {timeout}s"
+                health.record_failure(time.monotonic() - started, last_error)
+                print(f"  ✗ {provider_name} stream failed: {last_error}")
+                await stream.aclose()
+                if emitted:
+                    raise
+                continue
+            
+            health.record_success(time.monotonic() - started)
+            print(f"  ✓ Stream complete from {provider_name}")
+            return
+        
+        raise Exception(f"All providers failed. Last error: {last_error}")
+    
+    async def _astream_provider(
+        self,
+        provider_name: str,
+        prompt: str,
+        system_instruction: Optional[str],
+        temperature: float,
+        max_tokens: int
+    ) -> AsyncIterator[str]:
+        """Yield non-empty text chunks from a provider's streaming API"""
+        
+        provider = self.clients[provider_name]
+        provider_type = provider['type']
+        client = provider.get('async_client')
+        
+        if client is None:
+            # No async streaming client - deliver the whole answer as one chunk
+            text = await self._acall_provider(provider_name, prompt, system_instruction, temperature, max_tokens)
+            if text:
+                yield text
+            return
+        
+        if provider_type == 'mistral':
+            stream = await client.chat.stream_async(
+                model=provider['model'],
+                messages=self._build_messages(prompt, system_instruction),
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
+            async for event in stream:
+                delta = event.data.choices[0].delta.content if event.data.choices else None
+                if delta:
+                    yield delta
+        elif provider_type == 'groq':
+            stream = await client.chat.completions.create(
+                model=provider['model'],
+                messages=self._build_messages(prompt, system_instruction),
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+            )
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    yield delta
+        elif provider_type == 'gemini':
+            from google.genai import types
+            
+            stream = await client.models.generate_content_stream(
+                model=provider['model'],
+                contents=prompt,
+                config=types.GenerateContentConfig(
+                    system_instruction=system_instruction,
+                    temperature=temperature,
+                    max_output_tokens=max_tokens,
+                )
+            )
+            async for chunk in stream:
+                if chunk.text:
+                    yield chunk.text
+        else:
+            raise Exception(f"Unknown provider type: {provider_type}")
+    
+    async def _race_providers(
+        self,
+        providers: List[str],
+        prompt: str,
+        system_instruction: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        hedge_delay: Optional[float] = None
+    ) -> tuple:
+        """
+        Walk the fallback chain, returning (provider_name, text) of the first success
+        - A failure starts the next provider immediately
+        - With hedge_delay, a slow provider also gets the next one started alongside it
+        - Whatever is still running once a winner is found gets cancelled
+        """
+        queue = list(providers)
+        pending: Dict[asyncio.Task, str] = {}
+        last_error = "no providers available"
+        
+        def launch_next() -> bool:
+            while queue:
+                provider_name = queue.pop(0)
+                if not self.health[provider_name].allow_request():
+                    print(f"  ⏭️ Skipping {provider_name} (circuit open)")
+                    continue
+                print(f"  🤖 Trying {provider_name}...")
+                task = asyncio.create_task(
+                    self._acall_with_timeout(provider_name, prompt, system_instruction, temperature, max_tokens)
+                )
+                # A cancelled task gives no verdict; free the half-open probe slot it claimed,
+                # even if it was cancelled before it ever started
+                health = self.health[provider_name]
+                if health.probe_in_flight:
+                    task.add_done_callback(lambda done, health=health: health.release() if done.cancelled() else None)
+                pending[task] = provider_name
+                return True
+            return False
+        
+        try:
+            launch_next()
+            
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending.keys(),
+                    timeout=hedge_delay if queue else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                
+                if not done:
+                    print(f"  ⏱️ No answer after {hedge_delay}s, hedging")
+                    launch_next()
+                    continue
+                
+                for task in done:
+                    provider_name = pending.pop(task)
+                    try:
+                        response = task.result()
+                    except Exception as e:
+                        last_error = str(e) or type(e).__name__
+                        print(f"  ✗ {provider_name} failed: {last_error}")
+                        launch_next()
+                        continue
+                    
+                    print(f"  ✓ Success with {provider_name}")
+                    return provider_name, response
+            
+            raise Exception(last_error)
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def _acall_with_timeout(
+        self,
+        provider_name: str,
+        prompt: str,
+        system_instruction: Optional[str],
+        temperature: float,
+        max_tokens: int
+    ) -> str:
+        """
+        Call provider, failing with TimeoutError after its configured timeout
+        Outcome and latency feed the provider's circuit breaker; if cancelled, the
+        caller's done-callback releases the probe slot (the coroutine may never run)
+        """
+        timeout = self.provider_timeouts.get(provider_name, self.default_timeout)
+        health = self.health[provider_name]
+        started = time.monotonic()
+        try:
+            response = await asyncio.wait_for(
+                self._acall_provider(provider_name, prompt, system_instruction, temperature, max_tokens),
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            error = f"{provider_name} timed out after {timeout}s"
+            health.record_failure(time.monotonic() - started, error)
+            raise TimeoutError(error)
+        except Exception as e:
+            health.record_failure(time.monotonic() - started, str(e))
+            raise
+        
+        health.record_success(time.monotonic() - started)
+        return response
+    
+    def _providers_to_try(self, preferred_provider: Optional[str] = None) -> List[str]:
+        """Provider order for a request, with the preferred provider first"""
+        if preferred_provider and preferred_provider in self.clients:
+            return [preferred_provider] + [p for p in self.provider_order if p != preferred_provider]
+        return self.provider_order
+    
+    def get_effective_order(self, preferred_provider: Optional[str] = None) -> List[str]:
+        """
+        Providers to try right now
+        - Open circuits are left out
+        - Preferred provider stays first; the rest are ordered by observed p50 latency
+          (providers without latency data keep their configured position at the end)
+        """
+        candidates = [
+            p for p in self._providers_to_try(preferred_provider)
+            if p in self.clients and self.health[p].is_available()
+        ]
+        
+        head = []
+        if preferred_provider and candidates and candidates[0] == preferred_provider:
+            head = [candidates.pop(0)]
+        
+        def latency_key(name: str) -> float:
+            p50 = self.health[name].p50_latency()
+            return p50 if p50 is not None else float('inf')
+        
+        return head + sorted(candidates, key=latency_key)
+    
+    def get_provider_health(self) -> Dict[str, Dict]:
+        """Circuit state and latency stats per provider"""
+        return {name: health.snapshot() for name, health in self.health.items()}
+    
+    @staticmethod
+    def _build_messages(prompt: str, system: Optional[str]) -> List[Dict]:
+        """Chat-style message list shared by Mistral and Groq"""
+        messages = []
+        if system:
+            messages.append({"role": "system", "content": system})
+        messages.append({"role": "user", "content": prompt})
+        return messages
+    
     def _call_provider(
         self,
         provider_name: str,
@@ -137,17 +512,48 @@ class LLMService:
         else:
             raise Exception(f"Unknown provider type: {provider_type}")
     
+    async def _acall_provider(
+        self,
+        provider_name: str,
+        prompt: str,
+        system_instruction: Optional[str],
+        temperature: float,
+        max_tokens: int
+    ) -> str:
+        """Call specific provider through its async client, or the executor if it has none"""
+        
+        provider = self.clients[provider_name]
+        provider_type = provider['type']
+        
+        if provider.get('async_client') is None:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor,
+                functools.partial(
+                    self._call_provider,
+                    provider_name,
+                    prompt,
+                    system_instruction,
+                    temperature,
+                    max_tokens
+                )
+            )
+        
+        if provider_type == 'mistral':
+            return await self._acall_mistral(provider, prompt, system_instruction, temperature, max_tokens)
+        elif provider_type == 'groq':
+            return await self._acall_groq(provider, prompt, system_instruction, temperature, max_tokens)
+        elif provider_type == 'gemini':
+            return await self._acall_gemini(provider, prompt, system_instruction, temperature, max_tokens)
+        else:
+            raise Exception(f"Unknown provider type: {provider_type}")
+    
     def _call_mistral(self, provider: Dict, prompt: str, system: str, temp: float, max_tokens: int) -> str:
         """Call Mistral API"""
         
-        messages = []
-        if system:
-            messages.append({"role": "system", "content": system})
-        messages.append({"role": "user", "content": prompt})
-        
         response = provider['client'].chat.complete(
             model=provider['model'],
-            messages=messages,
+            messages=self._build_messages(prompt, system),
             temperature=temp,
             max_tokens=max_tokens,
         )
@@ -157,14 +563,9 @@ class LLMService:
     def _call_groq(self, provider: Dict, prompt: str, system: str, temp: float, max_tokens: int) -> str:
         """Call Groq API"""
         
-        messages = []
-        if system:
-            messages.append({"role": "system", "content": system})
-        messages.append({"role": "user", "content": prompt})
-        
         response = provider['client'].chat.completions.create(
             model=provider['model'],
-            messages=messages,
+            messages=self._build_messages(prompt, system),
             temperature=temp,
             max_tokens=max_tokens,
         )
@@ -187,6 +588,46 @@ class LLMService:
         
         return response.text if response and response.text else ""
     
+    async def _acall_mistral(self, provider: Dict, prompt: str, system: str, temp: float, max_tokens: int) -> str:
+        """Call Mistral API (async)"""
+        
+        response = await provider['async_client'].chat.complete_async(
+            model=provider['model'],
+            messages=self._build_messages(prompt, system),
+            temperature=temp,
+            max_tokens=max_tokens,
+        )
+        
+        return response.choices[0].message.content
+    
+    async def _acall_groq(self, provider: Dict, prompt: str, system: str, temp: float, max_tokens: int) -> str:
+        """Call Groq API (async)"""
+        
+        response = await provider['async_client'].chat.completions.create(
+            model=provider['model'],
+            messages=self._build_messages(prompt, system),
+            temperature=temp,
+            max_tokens=max_tokens,
+        )
+        
+        return response.choices[0].message.content
+    
+    async def _acall_gemini(self, provider: Dict, prompt: str, system: str, temp: float, max_tokens: int) -> str:
+        """Call Gemini API (async)"""
+        from google.genai import types
+        
+        response = await provider['async_client'].models.generate_content(
+            model=provider['model'],
+            contents=prompt,
+            config=types.GenerateContentConfig(
+                system_instruction=system,
+                temperature=temp,
+                max_output_tokens=max_tokens,
+            )
+        )
+        
+        return response.text if response and response.text else ""
+    
     def get_available_providers(self) -> List[str]:
         """Get list of available providers"""
         return list(self.clients.keys())
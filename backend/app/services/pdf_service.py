@@ -1,97 +1,227 @@
 import PyPDF2
-from io import BytesIO
 from fastapi import UploadFile
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from typing import Iterator, List, Optional, Tuple
+from app.config.settings import settings
+from app.services.text_archive import TextArchive
+import multiprocessing
+import asyncio
+import hashlib
+import mmap
 import json
 import os
+import threading
+import uuid
 from datetime import datetime
 
+SPOOL_CHUNK_BYTES = 1024 * 1024
+INCOMING_PREFIX = ".incoming-"  # spooled uploads not yet moved into the document store
+HEAD_CHARS = 1000
+
+
+# PdfReader runs over a read-only memory map: pages are read from the page
+# cache as needed instead of being copied into each process
+def _page_count(pdf_path: str) -> int:
+    with open(pdf_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return len(PyPDF2.PdfReader(mapped).pages)
+
+
+# Pool worker's reader for the PDF it is extracting: reader.pages flattens the
+# whole page tree, so it's done once per worker instead of once per task.
+# Only the latest PDF stays mapped; the next PDF's first task replaces it
+_worker_reader = None  # (file key, file, mmap, PdfReader)
+
+
+def _cached_reader(pdf_path: str) -> PyPDF2.PdfReader:
+    global _worker_reader
+    stat = os.stat(pdf_path)
+    key = (pdf_path, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    if _worker_reader is None or _worker_reader[0] != key:
+        if _worker_reader is not None:
+            _worker_reader[2].close()
+            _worker_reader[1].close()
+            _worker_reader = None
+        f = open(pdf_path, "rb")
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        _worker_reader = (key, f, mapped, PyPDF2.PdfReader(mapped))
+    return _worker_reader[3]
+
+
+def _extract_pages(reader: PyPDF2.PdfReader, first: int, last: int) -> List[Tuple[int, str]]:
+    """(page_number, text) for pages first..last (1-based, inclusive)"""
+    return [(number, reader.pages[number - 1].extract_text() or "") for number in range(first, last + 1)]
+
+
+def _extract_page_range(pdf_path: str, first: int, last: int) -> List[Tuple[int, str]]:
+    """Process pool task (reuses the worker's reader for this PDF)"""
+    return _extract_pages(_cached_reader(pdf_path), first, last)
+
+
+def _page_fragments(pages: Iterator[Tuple[int, str]]) -> Iterator[Tuple[int, str]]:
+    """
+    (page_number, fragment) in the extracted-text layout ("--- Page N ---"
+    headers, blank line between pages, surrounding whitespace stripped);
+    the fragments concatenate to the full text
+    """
+    pending = None  # trailing whitespace of the previous page; dropped after the last
+    for number, text in pages:
+        if not text:
+            continue
+        body = text.rstrip()
+        prefix = "" if pending is None else pending + "\n\n"
+        pending = text[len(body):]
+        yield number, f"{prefix}--- Page {number} ---\n{body}"
+
+
 class PDFService:
+    """
+    PDF ingestion
+    - uploads are spooled to disk once, in chunks
+    - pages are extracted from a memory map in a process pool, PDF_PAGES_PER_TASK
+      pages per task, with a bounded number of tasks in flight
+    - extracted text is streamed into a TextArchive as pages complete, so memory
+      stays bounded whatever the size of the PDF
+    """
+
+    _pool = None
+    _pool_lock = threading.Lock()
+
     def __init__(self):
         self.upload_dir = "uploads/pdfs"
         self.extracted_dir = "uploads/extracted_texts"
         os.makedirs(self.upload_dir, exist_ok=True)
         os.makedirs(self.extracted_dir, exist_ok=True)
-    
-    @staticmethod
-    async def extract_text_from_pdf(file: UploadFile) -> str:
-        """Extract text content from uploaded PDF file"""
+
+    @classmethod
+    def _executor(cls) -> ProcessPoolExecutor:
+        with cls._pool_lock:
+            if cls._pool is None:
+                # spawn: forking a process that runs threads and an event loop is unsafe
+                cls._pool = ProcessPoolExecutor(
+                    max_workers=max(1, settings.PDF_EXTRACT_WORKERS),
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return cls._pool
+
+    @classmethod
+    def shutdown(cls):
+        """Stop the extraction worker processes (app shutdown)"""
+        with cls._pool_lock:
+            if cls._pool is not None:
+                cls._pool.shutdown(cancel_futures=True)
+                cls._pool = None
+
+    async def spool_upload(self, file: UploadFile) -> Tuple[str, int, str]:
+        """
+        Write the upload to uploads/pdfs in chunks, hashing as it goes
+        Returns (path, size in bytes, SHA-256 hex); the caller renames or removes the file
+        """
+        file_path = os.path.join(self.upload_dir, f"{INCOMING_PREFIX}{uuid.uuid4().hex}.pdf")
+
+        size = 0
+        digest = hashlib.sha256()
+        with open(file_path, "wb") as out:
+            while chunk := await file.read(SPOOL_CHUNK_BYTES):
+                digest.update(chunk)
+                await asyncio.to_thread(out.write, chunk)
+                size += len(chunk)
+        return file_path, size, digest.hexdigest()
+
+    def iter_pages(self, pdf_path: str) -> Iterator[Tuple[int, str]]:
+        """
+        (page_number, text) for every page, in order, as soon as each range is done
+        - small PDFs (one range) are extracted in the calling thread
+        - at most 2 ranges per worker are queued, which bounds memory
+        """
+        page_count = _page_count(pdf_path)
+        per_task = max(1, settings.PDF_PAGES_PER_TASK)
+        ranges = [
+            (first, min(first + per_task - 1, page_count))
+            for first in range(1, page_count + 1, per_task)
+        ]
+
+        if len(ranges) <= 1:
+            with open(pdf_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                reader = PyPDF2.PdfReader(mapped)
+                for first, last in ranges:
+                    yield from _extract_pages(reader, first, last)
+            return
+
+        pool = self._executor()
+        pending = iter(ranges)
+        in_flight = deque()
         try:
-            content = await file.read()
-            pdf_reader = PyPDF2.PdfReader(BytesIO(content))
-            
-            extracted_text = ""
-            for page_num, page in enumerate(pdf_reader.pages):
-                text = page.extract_text()
-                if text:
-                    extracted_text += f"\n--- Page {page_num + 1} ---\n"
-                    extracted_text += text + "\n"
-            
-            return extracted_text.strip()
-        except Exception as e:
-            raise Exception(f"Error extracting PDF text: {str(e)}")
-    
+            for first, last in pending:
+                in_flight.append(pool.submit(_extract_page_range, pdf_path, first, last))
+                if len(in_flight) >= 2 * max(1, settings.PDF_EXTRACT_WORKERS):
+                    break
+            while in_flight:
+                extracted = in_flight.popleft().result()
+                next_range = next(pending, None)
+                if next_range:
+                    in_flight.append(pool.submit(_extract_page_range, pdf_path, *next_range))
+                yield from extracted
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    def extract_to_archive(self, pdf_path: str, filename: str, file_type: str, archive_filename: Optional[str] = None) -> dict:
+        """
+        Extract a spooled PDF straight into a TextArchive (blocking; run in a thread)
+        Returns the metadata plus the first HEAD_CHARS characters, never the whole text
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        archive_filename = archive_filename or \
+            f"{timestamp}_{file_type}_{filename.replace('.pdf', '')}{TextArchive.EXTENSION}"
+        archive_path = os.path.join(self.extracted_dir, archive_filename)
+
+        metadata = TextArchive.write(
+            archive_path,
+            _page_fragments(self.iter_pages(pdf_path)),
+            {"filename": filename, "file_type": file_type, "extracted_at": timestamp},
+            head_chars=HEAD_CHARS
+        )
+        print(f"✓ Saved extracted text to: {archive_path}")
+        return {"json_path": archive_path, "json_filename": archive_filename, **metadata}
+
     @staticmethod
     def validate_pdf(file: UploadFile) -> bool:
         """Validate if uploaded file is a PDF"""
         return file.content_type == "application/pdf" or file.filename.endswith('.pdf')
     
-    def save_pdf_file(self, file_content: bytes, filename: str) -> str:
-        """Save PDF file to disk"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        safe_filename = f"{timestamp}_{filename}"
-        file_path = os.path.join(self.upload_dir, safe_filename)
-        
-        with open(file_path, "wb") as f:
-            f.write(file_content)
-        
-        return file_path
-    
-    def save_extracted_text_to_json(self, text: str, filename: str, file_type: str) -> dict:
-        """Save extracted text to JSON file and return metadata"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        json_filename = f"{timestamp}_{file_type}_{filename.replace('.pdf', '')}.json"
-        json_path = os.path.join(self.extracted_dir, json_filename)
-        
-        data = {
-            "filename": filename,
-            "file_type": file_type,
-            "extracted_at": timestamp,
-            "text_length": len(text),
-            "text": text,
-            "preview": text[:500] if len(text) > 500 else text
-        }
-        
-        # Write to JSON file
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
-        
-        print(f"✓ Saved extracted text to: {json_path}")
-        return {
-            "json_path": json_path,
-            "json_filename": json_filename,
-            **data
-        }
-    
     def read_extracted_text_from_json(self, json_path: str) -> dict:
-        """Read extracted text from JSON file"""
+        """Read extracted text and metadata (TextArchive, or legacy JSON file)"""
         try:
+            if TextArchive.is_archive(json_path):
+                data = TextArchive.read_metadata(json_path)
+                data["text"] = "".join(TextArchive.iter_text(json_path))
+                return data
             with open(json_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
             return data
         except Exception as e:
-            raise Exception(f"Error reading JSON file: {str(e)}")
+            raise Exception(f"Error reading extracted text file: {str(e)}")
+    
+    def read_extracted_metadata(self, path: str) -> dict:
+        """Metadata without the text; legacy JSON files still have to be parsed whole"""
+        if TextArchive.is_archive(path):
+            return TextArchive.read_metadata(path)
+        data = self.read_extracted_text_from_json(path)
+        data.pop("text", None)
+        return data
     
     def combine_multiple_json_texts(self, json_paths: list) -> str:
-        """Combine text from multiple JSON files"""
-        combined_text = ""
+        """Combine text from multiple extracted text files"""
+        parts = []
         
         for json_path in json_paths:
             if os.path.exists(json_path):
                 data = self.read_extracted_text_from_json(json_path)
                 file_type = data.get('file_type', 'unknown')
-                combined_text += f"\n\n{'='*50}\n"
-                combined_text += f"SOURCE: {file_type.upper()} - {data.get('filename', 'unknown')}\n"
-                combined_text += f"{'='*50}\n\n"
-                combined_text += data.get('text', '')
+                parts.append(f"\n\n{'='*50}\n")
+                parts.append(f"SOURCE: {file_type.upper()} - {data.get('filename', 'unknown')}\n")
+                parts.append(f"{'='*50}\n\n")
+                parts.append(data.get('text', ''))
         
-        return combined_text
+        return "".join(parts)
@@ -0,0 +1,252 @@
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+from sqlalchemy.orm import Session
+from sqlalchemy import func, case, and_
+from app.models.models import Topic, Question, QuestionAttempt, UserTopicStats
+
+DIFFICULTIES = ["easy", "medium", "hard"]
+
+COUNTER_COLUMNS = ["attempts", "score_sum", "scored", "mcq_attempts", "mcq_correct"] + [
+    f"{diff}_{field}" for diff in DIFFICULTIES for field in ("attempts", "score_sum", "scored")
+]
+
+
+class ProgressService:
+    """
+    Practice progress backed by the user_topic_stats materialization
+    - record_attempt: O(1) atomic increment, in the same transaction as the attempt
+    - reads: one stats row per topic plus a grouped question count, no writes
+    - rebuild: recompute rows from question_attempts (backfill, deletions)
+    """
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def record_attempt(
+        self,
+        db: Session,
+        user_id: int,
+        question: Question,
+        score: Optional[float],
+        is_correct: Optional[bool]
+    ):
+        """Add one attempt to the user's running totals (caller commits)"""
+        self.record_attempts(db, user_id, [(question, score, is_correct)])
+
+    def record_attempts(
+        self,
+        db: Session,
+        user_id: int,
+        graded: List[Tuple[Question, Optional[float], Optional[bool]]]
+    ):
+        """
+        Add graded attempts to the user's running totals (caller commits)
+        - Deltas are merged per topic, so a batch costs one UPDATE per topic
+        - Incremented in SQL so concurrent submits can't lose updates
+        """
+        deltas: Dict[int, Dict[str, float]] = {}
+        for question, score, is_correct in graded:
+            delta = deltas.setdefault(question.topic_id, {c: 0 for c in COUNTER_COLUMNS})
+            delta["attempts"] += 1
+            if score is not None:
+                delta["score_sum"] += score
+                delta["scored"] += 1
+            if question.question_type == "mcq":
+                delta["mcq_attempts"] += 1
+                if is_correct:
+                    delta["mcq_correct"] += 1
+            if question.difficulty in DIFFICULTIES:
+                delta[f"{question.difficulty}_attempts"] += 1
+                if score is not None:
+                    delta[f"{question.difficulty}_score_sum"] += score
+                    delta[f"{question.difficulty}_scored"] += 1
+
+        for topic_id, delta in deltas.items():
+            if topic_id is None:
+                continue
+            values = {
+                getattr(UserTopicStats, column): getattr(UserTopicStats, column) + amount
+                for column, amount in delta.items()
+                if amount
+            }
+            values[UserTopicStats.updated_at] = datetime.utcnow()
+
+            row_filter = db.query(UserTopicStats).filter(
+                UserTopicStats.user_id == user_id,
+                UserTopicStats.topic_id == topic_id
+            )
+            if row_filter.update(values, synchronize_session=False) == 0:
+                self._ensure_row(db, user_id, topic_id)
+                row_filter.update(values, synchronize_session=False)
+
+    def _ensure_row(self, db: Session, user_id: int, topic_id: int):
+        """Create an all-zero stats row unless another request just did"""
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            db.add(UserTopicStats(user_id=user_id, topic_id=topic_id, **{c: 0 for c in COUNTER_COLUMNS}))
+            db.flush()
+            return
+
+        db.execute(
+            insert(UserTopicStats).values(
+                user_id=user_id,
+                topic_id=topic_id,
+                updated_at=datetime.utcnow(),
+                **{c: 0 for c in COUNTER_COLUMNS}
+            ).on_conflict_do_nothing(index_elements=["user_id", "topic_id"])
+        )
+
+    def rebuild(self, db: Session, user_id: Optional[int] = None, topic_id: Optional[int] = None) -> int:
+        """
+        Recompute stats rows from question_attempts for the given scope
+        (everything when both are None); caller commits. Returns rows written.
+        """
+        delete_query = db.query(UserTopicStats)
+        if user_id is not None:
+            delete_query = delete_query.filter(UserTopicStats.user_id == user_id)
+        if topic_id is not None:
+            delete_query = delete_query.filter(UserTopicStats.topic_id == topic_id)
+        delete_query.delete(synchronize_session=False)
+
+        is_mcq = Question.question_type == "mcq"
+        query = db.query(
+            QuestionAttempt.user_id,
+            Question.topic_id,
+            Question.difficulty,
+            func.count(QuestionAttempt.id).label("attempts"),
+            func.sum(QuestionAttempt.score).label("score_sum"),
+            func.count(QuestionAttempt.score).label("scored"),
+            func.sum(case((is_mcq, 1), else_=0)).label("mcq_attempts"),
+            func.sum(case((and_(is_mcq, QuestionAttempt.is_correct == True), 1), else_=0)).label("mcq_correct")
+        ).join(
+            Question, Question.id == QuestionAttempt.question_id
+        ).filter(
+            QuestionAttempt.user_id.isnot(None),
+            Question.topic_id.isnot(None)
+        )
+        if user_id is not None:
+            query = query.filter(QuestionAttempt.user_id == user_id)
+        if topic_id is not None:
+            query = query.filter(Question.topic_id == topic_id)
+
+        rows: Dict[tuple, Dict] = {}
+        for r in query.group_by(QuestionAttempt.user_id, Question.topic_id, Question.difficulty).all():
+            values = rows.setdefault((r.user_id, r.topic_id), {c: 0 for c in COUNTER_COLUMNS})
+            values["attempts"] += r.attempts or 0
+            values["score_sum"] += float(r.score_sum or 0)
+            values["scored"] += r.scored or 0
+            values["mcq_attempts"] += r.mcq_attempts or 0
+            values["mcq_correct"] += r.mcq_correct or 0
+            if r.difficulty in DIFFICULTIES:
+                values[f"{r.difficulty}_attempts"] += r.attempts or 0
+                values[f"{r.difficulty}_score_sum"] += float(r.score_sum or 0)
+                values[f"{r.difficulty}_scored"] += r.scored or 0
+
+        db.add_all([
+            UserTopicStats(user_id=uid, topic_id=tid, **values)
+            for (uid, tid), values in rows.items()
+        ])
+        db.flush()
+        return len(rows)
+
+    def backfill_if_empty(self, db: Session) -> int:
+        """Populate user_topic_stats once for databases that predate it"""
+        if db.query(UserTopicStats.id).first() is not None:
+            return 0
+        if db.query(QuestionAttempt.id).first() is None:
+            return 0
+
+        written = self.rebuild(db)
+        db.commit()
+        print(f"✓ Backfilled user_topic_stats: {written} rows")
+        return written
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _question_counts(self, db: Session, topic_ids: List[int]) -> Dict[int, int]:
+        if not topic_ids:
+            return {}
+        rows = db.query(Question.topic_id, func.count(Question.id)).filter(
+            Question.topic_id.in_(topic_ids)
+        ).group_by(Question.topic_id).all()
+        return {topic_id: count for topic_id, count in rows}
+
+    def _stats_rows(self, db: Session, user_id: int, topic_ids: List[int]) -> Dict[int, UserTopicStats]:
+        if not topic_ids:
+            return {}
+        rows = db.query(UserTopicStats).filter(
+            UserTopicStats.user_id == user_id,
+            UserTopicStats.topic_id.in_(topic_ids)
+        ).all()
+        return {row.topic_id: row for row in rows}
+
+    def _build(self, topic_id: int, topic_name: str, total_questions: int, stats: Optional[UserTopicStats]) -> Dict:
+        """Progress response (same metrics and rounding as the original per-topic queries)"""
+        attempted = stats.attempts if stats else 0
+        avg_score = stats.score_sum / stats.scored if stats and stats.scored else 0
+        mcq_correct = stats.mcq_correct if stats else 0
+        mcq_total = (stats.mcq_attempts if stats else 0) or 1  # Avoid division by zero
+        accuracy = mcq_correct / mcq_total * 100
+
+        difficulty_stats = []
+        for diff in DIFFICULTIES:
+            diff_scored = getattr(stats, f"{diff}_scored") if stats else 0
+            diff_avg = getattr(stats, f"{diff}_score_sum") / diff_scored if diff_scored else 0
+            difficulty_stats.append({
+                "difficulty": diff,
+                "attempted": getattr(stats, f"{diff}_attempts") if stats else 0,
+                "average_score": round(float(diff_avg), 2)
+            })
+
+        # Mastery level (0-100)
+        mastery = 0
+        if attempted > 0:
+            completion_factor = min(attempted / total_questions, 1.0) if total_questions > 0 else 0
+            accuracy_factor = accuracy / 100
+            mastery = (completion_factor * 0.4 + accuracy_factor * 0.6) * 100
+
+        return {
+            "topic_id": topic_id,
+            "topic_name": topic_name,
+            "total_questions": total_questions,
+            "attempted": attempted,
+            "completion_percentage": round((attempted / total_questions * 100), 1) if total_questions > 0 else 0,
+            "average_score": round(float(avg_score), 2),
+            "accuracy_rate": round(accuracy, 1),
+            "mastery_level": round(mastery, 1),
+            "difficulty_breakdown": difficulty_stats
+        }
+
+    def get_topics_progress(self, db: Session, user_id: int, topics: List[Topic]) -> List[Dict]:
+        """Progress for each topic (in the given order) for one user"""
+        topic_ids = [t.id for t in topics]
+        counts = self._question_counts(db, topic_ids)
+        stats = self._stats_rows(db, user_id, topic_ids)
+
+        return [
+            self._build(topic.id, topic.name, counts.get(topic.id, 0), stats.get(topic.id))
+            for topic in topics
+        ]
+
+    def get_topic_progress(self, db: Session, topic_id: int, user_id: int) -> Dict:
+        topic = db.query(Topic).filter(Topic.id == topic_id).first()
+        return self._build(
+            topic_id,
+            topic.name if topic else "Unknown",
+            self._question_counts(db, [topic_id]).get(topic_id, 0),
+            self._stats_rows(db, user_id, [topic_id]).get(topic_id)
+        )
+
+    def get_plan_progress(self, db: Session, user_id: int, plan_id: Optional[int] = None) -> List[Dict]:
+        """Progress for every topic of a plan (or every topic when plan_id is None)"""
+        query = db.query(Topic)
+        if plan_id:
+            query = query.filter(Topic.plan_id == plan_id)
+        return self.get_topics_progress(db, user_id, query.all())
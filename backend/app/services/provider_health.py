@@ -0,0 +1,128 @@
+from typing import Optional, Dict
+from collections import deque
+import statistics
+import time
+
+
+class ProviderHealth:
+    """
+    Rolling health window and circuit breaker for one LLM provider
+
+    States:
+    - closed: requests flow normally
+    - open: provider is skipped until the cooldown elapses
+    - half_open: a single probe request is let through; success closes
+      the circuit, failure opens it again
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int = 20,
+        error_threshold: float = 0.5,
+        min_requests: int = 4,
+        cooldown: float = 30.0
+    ):
+        self.name = name
+        self.error_threshold = error_threshold
+        self.min_requests = min_requests
+        self.cooldown = cooldown
+
+        self.window = deque(maxlen=window_size)  # (success, latency_seconds)
+        self.state = self.CLOSED
+        self.opened_at: Optional[float] = None
+        self.probe_in_flight = False
+
+        self.total_requests = 0
+        self.total_failures = 0
+        self.last_error: Optional[str] = None
+
+    def is_available(self) -> bool:
+        """Whether the provider may be tried (does not claim the probe slot)"""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            return time.monotonic() - self.opened_at >= self.cooldown
+        return not self.probe_in_flight
+
+    def allow_request(self) -> bool:
+        """Claim permission to send a request, moving open -> half_open after cooldown"""
+        if self.state == self.CLOSED:
+            return True
+
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.cooldown:
+                return False
+            self.state = self.HALF_OPEN
+            print(f"  🔌 {self.name} circuit half-open, probing")
+
+        if self.probe_in_flight:
+            return False
+        self.probe_in_flight = True
+        return True
+
+    def record_success(self, latency: float):
+        self.total_requests += 1
+        self.window.append((True, latency))
+
+        if self.state == self.HALF_OPEN:
+            print(f"  🔌 {self.name} circuit closed")
+            self.state = self.CLOSED
+            self.window.clear()
+            self.window.append((True, latency))
+        self.probe_in_flight = False
+
+    def record_failure(self, latency: float, error: str = None):
+        self.total_requests += 1
+        self.total_failures += 1
+        self.last_error = error
+        self.window.append((False, latency))
+
+        if self.state == self.HALF_OPEN or self._should_open():
+            self._open()
+        self.probe_in_flight = False
+
+    def release(self):
+        """Call was cancelled (e.g. lost a hedge) - no verdict, free the probe slot"""
+        self.probe_in_flight = False
+
+    def error_rate(self) -> float:
+        if not self.window:
+            return 0.0
+        failures = sum(1 for success, _ in self.window if not success)
+        return failures / len(self.window)
+
+    def p50_latency(self) -> Optional[float]:
+        """Median latency of recent successful calls"""
+        latencies = [latency for success, latency in self.window if success]
+        return statistics.median(latencies) if latencies else None
+
+    def snapshot(self) -> Dict:
+        p50 = self.p50_latency()
+        return {
+            "state": self.state,
+            "available": self.is_available(),
+            "error_rate": round(self.error_rate(), 3),
+            "p50_latency_ms": round(p50 * 1000) if p50 is not None else None,
+            "window_requests": len(self.window),
+            "total_requests": self.total_requests,
+            "total_failures": self.total_failures,
+            "last_error": self.last_error,
+            "retry_in_seconds": (
+                max(0, round(self.cooldown - (time.monotonic() - self.opened_at), 1))
+                if self.state == self.OPEN else None
+            )
+        }
+
+    def _should_open(self) -> bool:
+        return len(self.window) >= self.min_requests and self.error_rate() >= self.error_threshold
+
+    def _open(self):
+        if self.state != self.OPEN:
+            print(f"  🔌 {self.name} circuit OPEN for {self.cooldown}s (error rate {self.error_rate():.0%})")
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
@@ -0,0 +1,216 @@
+from typing import Callable, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
+from app.config.database import SessionLocal
+from app.config.settings import settings
+from app.models.models import Topic, Question, QuestionAttempt
+from app.services.job_queue import job_queue
+from app.services.question_service import QuestionService
+import asyncio
+import time
+
+GENERATE_QUESTIONS_JOB = "generate_questions"
+
+# One generation batch (matches /generate-questions)
+BATCH_MCQ_COUNT = 10
+BATCH_WRITTEN_COUNT = 5
+BATCH_SIZE = BATCH_MCQ_COUNT + BATCH_WRITTEN_COUNT
+
+# Top-up check timestamps kept (least recently checked evicted first)
+MAX_TRACKED_CHECKS = 10000
+
+# On-demand requests jump ahead of warm-up and top-up work
+PRIORITY_ON_DEMAND = 10
+PRIORITY_TOP_UP = 5
+PRIORITY_WARM_UP = 0
+
+
+class QuestionPool:
+    """
+    Keeps a pre-generated pool of questions per (topic, difficulty)
+    - warm_up: queue generation for every topic of a new plan
+    - maybe_top_up: queue another batch when the pool runs low
+    - Generation runs on the job queue, so concurrency is bounded by JOB_QUEUE_WORKERS
+    """
+
+    def __init__(
+        self,
+        target_size: int = 15,
+        low_water: int = 5,
+        difficulties: Optional[List[str]] = None,
+        check_interval: float = 60.0,
+        max_tracked_checks: int = MAX_TRACKED_CHECKS
+    ):
+        self.target_size = target_size
+        self.low_water = low_water
+        self.difficulties = difficulties or ["easy", "medium", "hard"]
+        self.check_interval = check_interval
+        self.max_tracked_checks = max_tracked_checks
+
+        # key -> last check time, oldest first; bounded so per-user keys can't grow forever
+        self._last_check: "OrderedDict[Tuple, float]" = OrderedDict()
+        self.question_service = None  # created lazily (needs GEMINI_API_KEY)
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    async def enqueue_generation(
+        self,
+        topic_id: int,
+        difficulty: str,
+        question_count: int,
+        priority: int = PRIORITY_ON_DEMAND
+    ) -> Tuple[Dict, bool]:
+        """Queue one generation batch; joins an active job for the same topic/difficulty"""
+        return await asyncio.to_thread(
+            job_queue.enqueue,
+            GENERATE_QUESTIONS_JOB,
+            {
+                "topic_id": topic_id,
+                "difficulty": difficulty,
+                "question_count": question_count
+            },
+            f"{GENERATE_QUESTIONS_JOB}:{topic_id}:{difficulty}",
+            priority
+        )
+
+    async def warm_up(self, topic_ids: List[int]) -> int:
+        """Queue a first batch for every topic and difficulty; returns jobs created"""
+        created_count = 0
+        for topic_id in topic_ids:
+            for difficulty in self.difficulties:
+                _, created = await self.enqueue_generation(
+                    topic_id, difficulty, self.target_size, PRIORITY_WARM_UP
+                )
+                created_count += int(created)
+
+        print(f"🔥 Question pool warm-up: {created_count} jobs for {len(topic_ids)} topics")
+        return created_count
+
+    async def maybe_top_up(
+        self,
+        db: AsyncSession,
+        topic_id: int,
+        difficulty: str,
+        user_id: Optional[int] = None
+    ) -> bool:
+        """
+        Queue another batch when the pool is low
+        - Without a user: pool smaller than target_size
+        - With a user: fewer than low_water questions that user hasn't attempted
+        - Checked at most once per check_interval per key, so hot reads stay cheap
+        """
+        key = (topic_id, difficulty, user_id)
+        now = time.monotonic()
+        if now - self._last_check.get(key, 0) < self.check_interval:
+            return False
+        self._last_check[key] = now
+        self._last_check.move_to_end(key)
+        while len(self._last_check) > self.max_tracked_checks:
+            self._last_check.popitem(last=False)
+
+        try:
+            total = await db.scalar(select(func.count(Question.id)).where(
+                Question.topic_id == topic_id,
+                Question.difficulty == difficulty
+            )) or 0
+
+            if user_id is None:
+                needs_more = total < self.target_size
+            else:
+                attempted = await db.scalar(
+                    select(func.count(QuestionAttempt.question_id.distinct())).join(Question).where(
+                        Question.topic_id == topic_id,
+                        Question.difficulty == difficulty,
+                        QuestionAttempt.user_id == user_id
+                    )
+                ) or 0
+                needs_more = total - attempted < self.low_water
+
+            if not needs_more:
+                return False
+
+            _, created = await self.enqueue_generation(
+                topic_id, difficulty, max(total + BATCH_SIZE, self.target_size), PRIORITY_TOP_UP
+            )
+            if created:
+                print(f"🔋 Topping up question pool: topic {topic_id} ({difficulty}), {total} questions")
+            return created
+        except Exception as e:
+            # Top-up is best effort; never fail the request that triggered it
+            print(f"⚠️ Question pool top-up check failed: {e}")
+            return False
+
+    # ------------------------------------------------------------------
+    # Job handler
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _pool_status(topic_id: int, difficulty: str) -> Tuple[Optional[Topic], int]:
+        """(topic, pooled question count); blocking, so run it in a thread"""
+        db = SessionLocal()
+        try:
+            topic = db.get(Topic, topic_id)
+            if not topic:
+                return None, 0
+            existing_count = db.query(func.count(Question.id)).filter(
+                Question.topic_id == topic.id,
+                Question.difficulty == difficulty
+            ).scalar()
+            return topic, existing_count
+        finally:
+            db.close()
+
+    async def run_generation_job(self, payload: Dict, report_progress: Callable) -> Dict:
+        """Job handler: generate one batch unless the pool already has question_count questions"""
+        if self.question_service is None:
+            self.question_service = QuestionService()
+
+        topic, existing_count = await asyncio.to_thread(self._pool_status, payload["topic_id"], payload["difficulty"])
+        if not topic:
+            raise ValueError(f"Topic {payload['topic_id']} not found")
+
+        if existing_count >= payload["question_count"]:
+            return {
+                "topic": topic.name,
+                "mcq_count": existing_count,
+                "written_count": 0,
+                "total_questions": existing_count,
+                "difficulty": payload["difficulty"],
+                "cached": True
+            }
+
+        await report_progress(0.1, f"Generating questions for {topic.name}")
+
+        done = {"count": 0}
+
+        async def on_progress(part: str, count: int):
+            done["count"] += count
+            await report_progress(0.1 + 0.9 * min(done["count"] / BATCH_SIZE, 1.0), f"Saved {count} {part} questions")
+
+        mcqs, written = await self.question_service.generate_question_set(
+            topic=topic,
+            difficulty=payload["difficulty"],
+            mcq_count=BATCH_MCQ_COUNT,
+            written_count=BATCH_WRITTEN_COUNT,
+            on_progress=on_progress
+        )
+
+        return {
+            "topic": topic.name,
+            "mcq_count": len(mcqs),
+            "written_count": len(written),
+            "total_questions": len(mcqs) + len(written),
+            "difficulty": payload["difficulty"],
+            "cached": False
+        }
+
+
+question_pool = QuestionPool(
+    target_size=settings.QUESTION_POOL_TARGET,
+    low_water=settings.QUESTION_POOL_LOW_WATER,
+    difficulties=[d.strip() for d in settings.QUESTION_POOL_DIFFICULTIES.split(",") if d.strip()]
+)
+job_queue.register(GENERATE_QUESTIONS_JOB, question_pool.run_generation_job)
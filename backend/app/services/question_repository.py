@@ -0,0 +1,177 @@
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import func, and_, or_
+from app.models.models import Question
+import hashlib
+import random
+
+
+class QuestionRepository:
+    """
+    Question reads with options and model answers loaded up front
+    - mcq_options: selectinload (one extra IN query per page)
+    - written_answer/topic: joinedload (same query as the questions)
+    A page of questions costs 2-3 queries regardless of its size.
+    """
+
+    @staticmethod
+    def _with_details(query, include_topic: bool = False):
+        query = query.options(
+            selectinload(Question.mcq_options),
+            joinedload(Question.written_answer)
+        )
+        if include_topic:
+            query = query.options(joinedload(Question.topic))
+        return query
+
+    @staticmethod
+    def _rotation_params(session_seed: Optional[str]) -> Tuple[float, bool]:
+        """Pivot in [0, 1) and walk direction derived from the session seed"""
+        if session_seed is None:
+            return random.random(), random.random() < 0.5
+        digest = hashlib.sha256(session_seed.encode("utf-8")).hexdigest()
+        return int(digest[:13], 16) / float(16 ** 13), int(digest[13], 16) % 2 == 1
+
+    @staticmethod
+    def _parse_cursor(cursor: Optional[str]) -> Tuple[int, Optional[Tuple[float, int]]]:
+        """"<segment>:<random_key>:<id>" of the last question returned; raises ValueError"""
+        if not cursor:
+            return 0, None
+        segment, key, question_id = cursor.split(":")
+        if segment not in ("0", "1"):
+            raise ValueError("Invalid cursor")
+        return int(segment), (float(key), int(question_id))
+
+    def get_page(
+        self,
+        db: Session,
+        topic_id: int,
+        difficulty: str,
+        question_type: str = "all",
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        session_seed: Optional[str] = None,
+        offset: Optional[int] = None
+    ) -> Tuple[List[Question], int, Optional[str]]:
+        """
+        Page of questions for a topic, the total matching count, and the next cursor
+        - Order: a rotation, not a shuffle. Every session walks the same random_key
+          order; the seed only picks the pivot it starts from (wrapping around
+          once) and the direction
+        - Keyset pagination: cursor is the last (segment, random_key, id) returned,
+          so questions added mid-session (pool top-up) never cause repeats or
+          skips; ones that land behind the cursor show up in a later session
+        - offset (instead of cursor, for older clients): position in the same
+          rotation; stable for a seed, but questions added mid-session shift it
+        - Costs index range scans instead of sorting the whole pool by random()
+        """
+        filters = [
+            Question.topic_id == topic_id,
+            Question.difficulty == difficulty
+        ]
+        if question_type != "all":
+            filters.append(Question.question_type == question_type)
+
+        pivot, descending = self._rotation_params(session_seed)
+        segment, after = self._parse_cursor(cursor)
+        key = Question.random_key
+        if descending:
+            segments = (key <= pivot, key > pivot)
+            order = (key.desc(), Question.id.desc())
+        else:
+            segments = (key >= pivot, key < pivot)
+            order = (key, Question.id)
+
+        total = db.query(func.count(Question.id)).filter(*filters).scalar() or 0
+
+        # One row past the page tells whether there is a next one
+        rows = []
+        skip = offset or 0
+        for index in range(segment, len(segments)):
+            query = db.query(Question).filter(*filters, segments[index])
+            segment_offset = 0
+            if skip:
+                in_segment = db.query(func.count(Question.id)).filter(*filters, segments[index]).scalar() or 0
+                if skip >= in_segment:
+                    skip -= in_segment
+                    continue
+                segment_offset, skip = skip, 0
+            if index == segment and after is not None:
+                last_key, last_id = after
+                if descending:
+                    query = query.filter(or_(key < last_key, and_(key == last_key, Question.id < last_id)))
+                else:
+                    query = query.filter(or_(key > last_key, and_(key == last_key, Question.id > last_id)))
+            found = self._with_details(query).order_by(*order).offset(segment_offset).limit(limit + 1 - len(rows)).all()
+            rows += [(index, question) for question in found]
+            if len(rows) > limit:
+                break
+
+        page = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            index, last = page[-1]
+            next_cursor = f"{index}:{last.random_key!r}:{last.id}"
+        return [question for _, question in page], total, next_cursor
+
+    def get_with_details(self, db: Session, question_id: int) -> Optional[Question]:
+        """One question with its topic, options and model answer"""
+        return self._with_details(
+            db.query(Question).filter(Question.id == question_id),
+            include_topic=True
+        ).first()
+
+    def get_many(self, db: Session, question_ids: List[int]) -> Dict[int, Question]:
+        """Questions by id with options and model answers (for batch grading)"""
+        if not question_ids:
+            return {}
+        questions = self._with_details(
+            db.query(Question).filter(Question.id.in_(set(question_ids)))
+        ).all()
+        return {q.id: q for q in questions}
+
+    def get_mcqs(self, db: Session, topic_id: int, limit: int = 10) -> List[Question]:
+        """MCQs for a topic, easiest first"""
+        return self._with_details(
+            db.query(Question).filter(
+                Question.topic_id == topic_id,
+                Question.question_type == "mcq"
+            )
+        ).order_by(Question.difficulty).limit(limit).all()
+
+    @staticmethod
+    def sorted_options(question: Question) -> List:
+        return sorted(question.mcq_options, key=lambda opt: opt.option_label)
+
+    @staticmethod
+    def correct_option(question: Question):
+        return next((opt for opt in question.mcq_options if opt.is_correct), None)
+
+    def to_practice_dict(self, question: Question) -> Dict:
+        """Student-facing question (no answers), as returned by /api/practice/questions"""
+        if question.question_type == "mcq":
+            return {
+                "id": question.id,
+                "type": "mcq",
+                "question_text": question.question_text,
+                "marks": question.marks,
+                "time_limit": question.time_limit,
+                "difficulty": question.difficulty,
+                "options": [
+                    {
+                        "label": opt.option_label,
+                        "text": opt.option_text
+                    }
+                    for opt in self.sorted_options(question)
+                ]
+            }
+
+        return {
+            "id": question.id,
+            "type": "written",
+            "question_text": question.question_text,
+            "marks": question.marks,
+            "time_limit": question.time_limit,
+            "difficulty": question.difficulty,
+            "expected_length": question.written_answer.expected_length if question.written_answer else "200-300 words"
+        }
@@ -1,12 +1,16 @@
 from google import genai
 from google.genai import types
 from app.config.settings import settings
+import asyncio
 import json
 import re
-import time
-from typing import List, Dict
+from typing import Awaitable, Callable, List, Dict, Optional, Tuple
+from datetime import datetime
+from app.config.database import SessionLocal
 from app.models.models import Question, MCQOption, WrittenAnswer, Topic
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
+from app.utils.retry import retry_async, LLM_RETRY_POLICIES, gemini_retry_budget
+from app.services.single_flight import generation_flight
 
 class QuestionService:
     def __init__(self):
@@ -31,28 +35,77 @@ class QuestionService:
         
         return content.strip()
     
-    def _retry_with_backoff(self, func, max_retries=3):
-        """Retry function with exponential backoff"""
-        for attempt in range(max_retries):
-            try:
-                return func()
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    wait_time = 2 ** attempt
-                    print(f"⚠️ Attempt {attempt + 1} failed: {e}")
-                    print(f"   Retrying in {wait_time} seconds...")
-                    time.sleep(wait_time)
-                else:
-                    raise
-    
     async def generate_mcqs(
         self, 
         topic: Topic, 
         difficulty: str, 
-        count: int = 10,
-        db: Session = None
+        count: int = 10
+    ) -> List[Question]:
+        """Generate MCQs, sharing one Gemini call among concurrent requests for the same topic"""
+        return await self._single_flight("mcq", self._generate_mcqs, topic, difficulty, count)
+    
+    async def generate_written_questions(
+        self,
+        topic: Topic,
+        difficulty: str,
+        count: int = 5
     ) -> List[Question]:
-        """Generate MCQ questions using Gemini"""
+        """Generate written questions, sharing one Gemini call among concurrent requests"""
+        return await self._single_flight("written", self._generate_written_questions, topic, difficulty, count)
+    
+    async def _single_flight(
+        self,
+        question_type: str,
+        generator,
+        topic: Topic,
+        difficulty: str,
+        count: int
+    ) -> List[Question]:
+        """
+        Single-flight wrapper keyed on (question_type, topic_id, difficulty)
+        - The leader is shielded, so it keeps running if the caller is cancelled
+        - Concurrent callers (any worker) wait and then load the questions
+          created since they asked
+        - A leader that waited on another worker reuses its output instead of generating again
+        - Every query runs in a worker thread with a session of its own; the
+          returned questions are detached, with options and model answers loaded
+        """
+        key = f"{question_type}:{topic.id}:{difficulty}"
+        topic_id = topic.id
+        since = datetime.utcnow()
+        
+        def fresh_question_ids() -> List[int]:
+            db = SessionLocal()
+            try:
+                return [question_id for (question_id,) in db.query(Question.id).filter(
+                    Question.topic_id == topic_id,
+                    Question.difficulty == difficulty,
+                    Question.question_type == question_type,
+                    Question.created_at >= since
+                ).order_by(Question.id)]
+            finally:
+                db.close()
+        
+        async def leader() -> List[int]:
+            existing = await asyncio.to_thread(fresh_question_ids)
+            if existing:
+                print(f"♻️ Reusing {len(existing)} {question_type} questions generated by another worker")
+                return existing
+            return await generator(topic=topic, difficulty=difficulty, count=count)
+        
+        async def follower() -> List[int]:
+            return await asyncio.to_thread(fresh_question_ids)
+        
+        question_ids = await generation_flight.run(key, leader, follower)
+        return await asyncio.to_thread(self._load_questions, question_ids)
+    
+    async def _generate_mcqs(
+        self, 
+        topic: Topic, 
+        difficulty: str, 
+        count: int = 10
+    ) -> List[int]:
+        """Generate MCQ questions using Gemini; returns the new question ids"""
         
         print(f"\n{'='*60}")
         print(f"🎯 Generating {count} MCQs")
@@ -89,10 +142,10 @@ Generate exactly {count} questions now:"""
 
         try:
             # Function to call API
-            def call_api():
+            async def call_api():
                 print("📤 Sending request to Gemini...")
                 
-                response = self.client.models.generate_content(
+                response = await self.client.aio.models.generate_content(
                     model=self.model,
                     contents=prompt,
                     config=types.GenerateContentConfig(
@@ -107,7 +160,7 @@ Generate exactly {count} questions now:"""
                 return response
             
             # Retry with backoff
-            response = self._retry_with_backoff(call_api)
+            response = await retry_async(call_api, LLM_RETRY_POLICIES, gemini_retry_budget, label="MCQ generation")
             
             if not response:
                 raise Exception("No response from Gemini API")
@@ -151,55 +204,26 @@ Generate exactly {count} questions now:"""
             
             print(f"✓ Parsed {len(questions_data)} questions")
             
-            # Save to database
-            saved_questions = []
-            for i, q_data in enumerate(questions_data, 1):
-                print(f"   Saving question {i}/{len(questions_data)}...")
-                
-                question = Question(
-                    topic_id=topic.id,
-                    question_type="mcq",
-                    difficulty=difficulty,
-                    question_text=q_data["question"],
-                    marks=1,
-                    time_limit=60
-                )
-                db.add(question)
-                db.flush()
-                
-                # Add options
-                for opt in q_data["options"]:
-                    option = MCQOption(
-                        question_id=question.id,
-                        option_label=opt["label"],
-                        option_text=opt["text"],
-                        is_correct=opt["is_correct"],
-                        explanation=q_data.get("explanation") if opt["is_correct"] else None
-                    )
-                    db.add(option)
-                
-                saved_questions.append(question)
-            
-            db.commit()
-            print(f"✅ Successfully saved {len(saved_questions)} MCQs to database")
-            return saved_questions
+            # Save to database in a worker thread with its own session
+            # (waiting for the SQLite write lock must not block the event loop)
+            question_ids = await asyncio.to_thread(self._save_mcqs, topic.id, difficulty, questions_data)
+            print(f"✅ Successfully saved {len(question_ids)} MCQs to database")
+            return question_ids
             
         except Exception as e:
-            db.rollback()
             print(f"\n❌ Error generating MCQs:")
             print(f"   {str(e)}")
             import traceback
             traceback.print_exc()
             raise
     
-    async def generate_written_questions(
+    async def _generate_written_questions(
         self,
         topic: Topic,
         difficulty: str,
-        count: int = 5,
-        db: Session = None
-    ) -> List[Question]:
-        """Generate written questions using Gemini"""
+        count: int = 5
+    ) -> List[int]:
+        """Generate written questions using Gemini; returns the new question ids"""
         
         print(f"\n{'='*60}")
         print(f"📝 Generating {count} written questions")
@@ -248,9 +272,9 @@ FORMAT YOUR RESPONSE AS VALID JSON ONLY:
 Generate exactly {count} questions now:"""
 
         try:
-            def call_api():
+            async def call_api():
                 print("📤 Sending request to Gemini...")
-                return self.client.models.generate_content(
+                return await self.client.aio.models.generate_content(
                     model=self.model,
                     contents=prompt,
                     config=types.GenerateContentConfig(
@@ -261,7 +285,7 @@ Generate exactly {count} questions now:"""
                     )
                 )
             
-            response = self._retry_with_backoff(call_api)
+            response = await retry_async(call_api, LLM_RETRY_POLICIES, gemini_retry_budget, label="Written question generation")
             
             if not response or not response.text:
                 raise Exception("Empty response from Gemini")
@@ -274,48 +298,169 @@ Generate exactly {count} questions now:"""
             
             print(f"✓ Parsed {len(questions_data)} questions")
             
-            # Save to database
-            saved_questions = []
-            for i, q_data in enumerate(questions_data, 1):
-                print(f"   Saving question {i}/{len(questions_data)}...")
-                
-                question = Question(
-                    topic_id=topic.id,
-                    question_type="written",
-                    difficulty=difficulty,
-                    question_text=q_data["question"],
-                    marks=q_data.get("marks", marks),
-                    time_limit=q_data.get("time_minutes", marks + 2) * 60
-                )
-                db.add(question)
-                db.flush()
-                
-                # Combine model answer
-                model_answer_parts = q_data.get("model_answer", {})
-                full_answer = f"{model_answer_parts.get('introduction', '')}\n\n{model_answer_parts.get('main_body', '')}\n\n{model_answer_parts.get('conclusion', '')}"
-                
-                written_answer = WrittenAnswer(
-                    question_id=question.id,
-                    model_answer=full_answer,
-                    marking_scheme=q_data.get("marking_scheme", {}),
-                    keywords=q_data.get("keywords", []),
-                    expected_length=q_data.get("expected_length", "200-300 words")
-                )
-                db.add(written_answer)
-                saved_questions.append(question)
-            
-            db.commit()
-            print(f"✅ Successfully saved {len(saved_questions)} written questions")
-            return saved_questions
+            # Save to database (in a thread, see _generate_mcqs)
+            question_ids = await asyncio.to_thread(
+                self._save_written_questions, topic.id, difficulty, marks, questions_data
+            )
+            print(f"✅ Successfully saved {len(question_ids)} written questions")
+            return question_ids
             
         except Exception as e:
-            db.rollback()
             print(f"\n❌ Error generating written questions:")
             print(f"   {str(e)}")
             import traceback
             traceback.print_exc()
             raise
     
+    @staticmethod
+    def _load_questions(question_ids: List[int]) -> List[Question]:
+        """Questions by id with options and model answers, detached (blocking; runs in a thread)"""
+        db = SessionLocal()
+        try:
+            return db.query(Question).options(
+                selectinload(Question.mcq_options),
+                selectinload(Question.written_answer)
+            ).filter(Question.id.in_(question_ids)).order_by(Question.id).all()
+        finally:
+            db.close()
+    
+    def _save_mcqs(self, topic_id: int, difficulty: str, questions_data: List[Dict]) -> List[int]:
+        """
+        Insert generated MCQs with their options and commit (blocking; runs in a thread)
+        Uses a session of its own: a request's session must not be shared with a
+        thread while the event loop may still roll it back or close it
+        """
+        db = SessionLocal()
+        try:
+            return self._insert_mcqs(db, topic_id, difficulty, questions_data)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
+    def _insert_mcqs(self, db: Session, topic_id: int, difficulty: str, questions_data: List[Dict]) -> List[int]:
+        saved_questions = []
+        for i, q_data in enumerate(questions_data, 1):
+            print(f"   Saving question {i}/{len(questions_data)}...")
+            
+            question = Question(
+                topic_id=topic_id,
+                question_type="mcq",
+                difficulty=difficulty,
+                question_text=q_data["question"],
+                marks=1,
+                time_limit=60
+            )
+            db.add(question)
+            db.flush()
+            
+            # Add options
+            for opt in q_data["options"]:
+                option = MCQOption(
+                    question_id=question.id,
+                    option_label=opt["label"],
+                    option_text=opt["text"],
+                    is_correct=opt["is_correct"],
+                    explanation=q_data.get("explanation") if opt["is_correct"] else None
+                )
+                db.add(option)
+            
+            saved_questions.append(question)
+        
+        db.commit()
+        return [question.id for question in saved_questions]
+    
+    def _save_written_questions(
+        self,
+        topic_id: int,
+        difficulty: str,
+        marks: int,
+        questions_data: List[Dict]
+    ) -> List[int]:
+        """Insert generated written questions with their model answers and commit (blocking; runs in a thread, see _save_mcqs)"""
+        db = SessionLocal()
+        try:
+            return self._insert_written_questions(db, topic_id, difficulty, marks, questions_data)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
+    def _insert_written_questions(
+        self,
+        db: Session,
+        topic_id: int,
+        difficulty: str,
+        marks: int,
+        questions_data: List[Dict]
+    ) -> List[int]:
+        saved_questions = []
+        for i, q_data in enumerate(questions_data, 1):
+            print(f"   Saving question {i}/{len(questions_data)}...")
+            
+            question = Question(
+                topic_id=topic_id,
+                question_type="written",
+                difficulty=difficulty,
+                question_text=q_data["question"],
+                marks=q_data.get("marks", marks),
+                time_limit=q_data.get("time_minutes", marks + 2) * 60
+            )
+            db.add(question)
+            db.flush()
+            
+            # Combine model answer
+            model_answer_parts = q_data.get("model_answer", {})
+            full_answer = f"{model_answer_parts.get('introduction', '')}\n\n{model_answer_parts.get('main_body', '')}\n\n{model_answer_parts.get('conclusion', '')}"
+            
+            written_answer = WrittenAnswer(
+                question_id=question.id,
+                model_answer=full_answer,
+                marking_scheme=q_data.get("marking_scheme", {}),
+                keywords=q_data.get("keywords", []),
+                expected_length=q_data.get("expected_length", "200-300 words")
+            )
+            db.add(written_answer)
+            saved_questions.append(question)
+        
+        db.commit()
+        return [question.id for question in saved_questions]
+    
+    async def generate_question_set(
+        self,
+        topic: Topic,
+        difficulty: str,
+        mcq_count: int = 10,
+        written_count: int = 5,
+        on_progress: Optional[Callable[[str, int], Awaitable[None]]] = None
+    ) -> Tuple[List[Question], List[Question]]:
+        """
+        Generate MCQs and written questions concurrently
+        - Each part is saved in its own session, so the two commits are independent
+        - Waits for both; re-raises the first failure after the other has finished
+        - on_progress(part, count) is awaited as each part ("mcq"/"written") is saved
+        """
+        
+        async def run(generator, count, part):
+            questions = await generator(topic=topic, difficulty=difficulty, count=count)
+            if on_progress:
+                await on_progress(part, len(questions))
+            return questions
+        
+        mcqs, written = await asyncio.gather(
+            run(self.generate_mcqs, mcq_count, "mcq"),
+            run(self.generate_written_questions, written_count, "written"),
+            return_exceptions=True
+        )
+        
+        for result in (mcqs, written):
+            if isinstance(result, BaseException):
+                raise result
+        
+        return mcqs, written
+    
     async def evaluate_written_answer(
         self,
         question: Question,
@@ -369,8 +514,8 @@ FORMAT YOUR RESPONSE AS VALID JSON:
 Provide evaluation now:"""
 
         try:
-            def call_api():
-                return self.client.models.generate_content(
+            async def call_api():
+                return await self.client.aio.models.generate_content(
                     model=self.model,
                     contents=prompt,
                     config=types.GenerateContentConfig(
@@ -379,7 +524,7 @@ Provide evaluation now:"""
                     )
                 )
             
-            response = self._retry_with_backoff(call_api)
+            response = await retry_async(call_api, LLM_RETRY_POLICIES, gemini_retry_budget, label="Answer evaluation")
             
             if not response or not response.text:
                 raise Exception("Empty evaluation response")
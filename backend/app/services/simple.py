@@ -2,7 +2,7 @@ from google import genai
 from app.config.settings import settings
 import json
 import re
-import time
+from app.utils.retry import retry_async, EmptyResponseError, LLM_RETRY_POLICIES, gemini_retry_budget
 
 class AIService:
     def __init__(self):
@@ -21,44 +21,39 @@ class AIService:
         content = re.sub(r'```\s*$', '', content, flags=re.M)
         return content.strip()
     
-    def _retry_generate(self, prompt: str, system_instruction: str, config: dict, max_retries: int = 3):
-        """Retry generation if response is empty"""
-        for attempt in range(max_retries):
-            try:
-                response = self.client.models.generate_content(
-                    model=self.model,
-                    contents=prompt,
-                    config={
-                        "system_instruction": system_instruction,
-                        **config
-                    }
-                )
-                
-                # Check if response has text
-                if response and hasattr(response, 'text') and response.text:
-                    return response.text
-                
-                # Check candidates
-                if response and hasattr(response, 'candidates') and response.candidates:
-                    if len(response.candidates) > 0:
-                        candidate = response.candidates
-                        if hasattr(candidate, 'content') and candidate.content:
-                            if hasattr(candidate.content, 'parts') and candidate.content.parts:
-                                if len(candidate.content.parts) > 0:
-                                    if hasattr(candidate.content.parts, 'text'):
-                                        return candidate.content.parts.text
-                
-                print(f"Attempt {attempt + 1}: Gemini returned empty response, retrying...")
-                time.sleep(1)  # Wait before retry
-                
-            except Exception as e:
-                print(f"Attempt {attempt + 1} failed: {e}")
-                if attempt < max_retries - 1:
-                    time.sleep(1)
-                else:
-                    raise
-        
-        return None
+    async def _retry_generate(self, prompt: str, system_instruction: str, config: dict):
+        """Generate with shared async retry policy; None if every attempt came back empty"""
+        
+        async def call_api():
+            response = await self.client.aio.models.generate_content(
+                model=self.model,
+                contents=prompt,
+                config={
+                    "system_instruction": system_instruction,
+                    **config
+                }
+            )
+            
+            # Check if response has text
+            if response and hasattr(response, 'text') and response.text:
+                return response.text
+            
+            # Check candidates
+            if response and hasattr(response, 'candidates') and response.candidates:
+                if len(response.candidates) > 0:
+                    candidate = response.candidates
+                    if hasattr(candidate, 'content') and candidate.content:
+                        if hasattr(candidate.content, 'parts') and candidate.content.parts:
+                            if len(candidate.content.parts) > 0:
+                                if hasattr(candidate.content.parts, 'text'):
+                                    return candidate.content.parts.text
+            
+            raise EmptyResponseError("Gemini returned empty response")
+        
+        try:
+            return await retry_async(call_api, LLM_RETRY_POLICIES, gemini_retry_budget, label="Gemini generation")
+        except EmptyResponseError:
+            return None
     
     async def extract_topics(self, text: str, subject: str) -> list:
         """Extract topics from text using Gemini 2.5 Pro"""
@@ -84,7 +79,7 @@ class AIService:
         """
         
         try:
-            content = self._retry_generate(
+            content = await self._retry_generate(
                 prompt=prompt,
                 system_instruction=system_instruction,
                 config={
@@ -141,7 +136,7 @@ class AIService:
         prompt = f"Create a comprehensive lesson for: {topic_name} in {subject}"
         
         try:
-            content = self._retry_generate(
+            content = await self._retry_generate(
                 prompt=prompt,
                 system_instruction=system_instruction,
                 config={
@@ -194,7 +189,7 @@ class AIService:
         prompt = f"Analyze this {material_type}:\n\n{text[:2500]}"
         
         try:
-            content = self._retry_generate(
+            content = await self._retry_generate(
                 prompt=prompt,
                 system_instruction=system_instruction,
                 config={
@@ -0,0 +1,155 @@
+from typing import Awaitable, Callable, Dict, TypeVar
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from app.config.database import SessionLocal
+from app.models.models import GenerationLock
+import asyncio
+import os
+import socket
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one execution
+    - In-process: callers for a key share one asyncio task
+    - Across workers: a GenerationLock row; other workers wait for it to clear
+    - Lock rows expire after lock_ttl so a crashed worker can't block a key forever
+    """
+
+    def __init__(self, lock_ttl: float = 300.0, poll_interval: float = 1.0, wait_timeout: float = 600.0):
+        self.lock_ttl = lock_ttl
+        self.poll_interval = poll_interval
+        self.wait_timeout = wait_timeout
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+        self.leaders = 0
+        self.followers = 0
+        self.remote_waits = 0
+
+    async def run(
+        self,
+        key: str,
+        leader: Callable[[], Awaitable[T]],
+        follower: Callable[[], Awaitable[T]]
+    ) -> T:
+        """
+        Run leader() once per key across all concurrent callers
+        - The first caller's leader() does the work (and sees its result)
+        - Other callers wait for it, then run follower() to load the result in their own session
+        - leader() is shielded and outlives a cancelled caller, so it must not use
+          the caller's session or files; give it its own and return plain values
+        - leader() may run after another worker finished the key, so it should
+          check for fresh results before doing the expensive work
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.followers += 1
+            print(f"  🔁 Joining in-flight generation: {key}")
+            # Shield so a disconnecting follower doesn't cancel the shared work
+            await asyncio.shield(task)
+            return await follower()
+
+        self.leaders += 1
+        task = asyncio.ensure_future(self._lead(key, leader))
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._finished(key, done))
+        return await asyncio.shield(task)
+
+    def _finished(self, key: str, task: asyncio.Task):
+        """Done callback: forget the key and retrieve the result, so a leader whose
+        callers were all cancelled doesn't fail silently"""
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"  ⚠️ Single-flight leader for {key} failed: {task.exception()!r}")
+
+    def in_flight(self, key: str) -> bool:
+        """A leader for key is running in this process (a run() now would follow it)"""
+        return key in self._inflight
+
+    async def _lead(self, key: str, leader: Callable[[], Awaitable[T]]) -> T:
+        while True:
+            if await asyncio.to_thread(self._try_acquire, key):
+                try:
+                    return await leader()
+                finally:
+                    await asyncio.to_thread(self._release, key)
+
+            self.remote_waits += 1
+            print(f"  ⏳ {key} is being generated by another worker, waiting...")
+            await self._wait_for_release(key)
+
+    async def _wait_for_release(self, key: str):
+        waited = 0.0
+        while waited < self.wait_timeout:
+            await asyncio.sleep(self.poll_interval)
+            waited += self.poll_interval
+            if not await asyncio.to_thread(self._is_locked, key):
+                return
+        print(f"  ⚠️ Gave up waiting for {key} after {self.wait_timeout}s")
+
+    # ------------------------------------------------------------------
+    # Lock row helpers (blocking; run in a thread)
+    # ------------------------------------------------------------------
+
+    def _try_acquire(self, key: str) -> bool:
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            # Take over a lock left behind by a worker that died mid-generation
+            db.query(GenerationLock).filter(
+                GenerationLock.key == key,
+                GenerationLock.expires_at < now
+            ).delete(synchronize_session=False)
+            db.add(GenerationLock(
+                key=key,
+                owner=self.owner,
+                acquired_at=now,
+                expires_at=now + timedelta(seconds=self.lock_ttl)
+            ))
+            db.commit()
+            return True
+        except IntegrityError:
+            db.rollback()
+            return False
+        finally:
+            db.close()
+
+    def _release(self, key: str):
+        db = SessionLocal()
+        try:
+            db.query(GenerationLock).filter(
+                GenerationLock.key == key,
+                GenerationLock.owner == self.owner
+            ).delete(synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"  ⚠️ Failed to release generation lock {key}: {e}")
+        finally:
+            db.close()
+
+    def _is_locked(self, key: str) -> bool:
+        db = SessionLocal()
+        try:
+            return db.query(GenerationLock.key).filter(
+                GenerationLock.key == key,
+                GenerationLock.expires_at >= datetime.utcnow()
+            ).first() is not None
+        finally:
+            db.close()
+
+    def stats(self) -> Dict:
+        return {
+            "in_flight": sorted(self._inflight.keys()),
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "remote_waits": self.remote_waits
+        }
+
+
+# Shared by every QuestionService instance in this process
+generation_flight = SingleFlight()
@@ -0,0 +1,128 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import json
+import os
+import struct
+import uuid
+import zlib
+
+MAGIC = b"SBTX"
+VERSION = 1
+CODEC_ZLIB = 1
+PARTIAL_PREFIX = ".partial-"  # archive still being written; renamed into place when complete
+
+# magic, version, codec, reserved, page count, metadata offset, metadata length, index offset
+HEADER = struct.Struct("<4sBBHIQIQ")
+# page number, frame offset, frame length, characters
+INDEX_ENTRY = struct.Struct("<IQII")
+
+
+class TextArchive:
+    """
+    Compact on-disk format for extracted texts (.sbt)
+      header    32 bytes: magic, version, codec, page count, metadata/index offsets
+      frames    one zlib-compressed frame per page, in page order
+      metadata  compact JSON: filename, file_type, extracted_at, text_length, preview
+      index     per page: page number, frame offset, frame length, characters
+    - listing reads the header and metadata only, never the text
+    - one page is a seek and a single frame decompress
+    - frames concatenate to the same text the JSON format stored
+    - zlib from the standard library (zstd would be a new dependency)
+    """
+
+    EXTENSION = ".sbt"
+    PREVIEW_CHARS = 500
+
+    @staticmethod
+    def is_archive(path: str) -> bool:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+
+    @classmethod
+    def write(cls, path: str, pages: Iterable[Tuple[int, str]], metadata: Dict, head_chars: int = 1000) -> Dict:
+        """
+        Stream (page_number, text) frames into a new archive
+        Returns the stored metadata plus the first head_chars characters as "head"
+        - written to a temporary file next to path and os.replace'd into place,
+          so a crash or error mid-write never leaves a truncated archive at path
+        """
+        directory, filename = os.path.split(path)
+        partial_path = os.path.join(directory, f"{PARTIAL_PREFIX}{uuid.uuid4().hex}-{filename}.tmp")
+        try:
+            written = cls._write_file(partial_path, pages, metadata, head_chars)
+            os.replace(partial_path, path)
+        except BaseException:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+        return written
+
+    @classmethod
+    def _write_file(cls, path: str, pages: Iterable[Tuple[int, str]], metadata: Dict, head_chars: int) -> Dict:
+        index = []
+        text_length = 0
+        head = ""
+        with open(path, "wb") as f:
+            f.write(b"\0" * HEADER.size)
+            for page_number, text in pages:
+                frame = zlib.compress(text.encode("utf-8"), 6)
+                index.append((page_number, f.tell(), len(frame), len(text)))
+                f.write(frame)
+                text_length += len(text)
+                if len(head) < head_chars:
+                    head = (head + text)[:head_chars]
+
+            stored = {**metadata, "text_length": text_length, "preview": head[:cls.PREVIEW_CHARS]}
+            meta_bytes = json.dumps(stored, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            meta_offset = f.tell()
+            f.write(meta_bytes)
+            index_offset = f.tell()
+            for entry in index:
+                f.write(INDEX_ENTRY.pack(*entry))
+
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, VERSION, CODEC_ZLIB, 0, len(index), meta_offset, len(meta_bytes), index_offset))
+        return {**stored, "page_count": len(index), "head": head}
+
+    @staticmethod
+    def _header(f) -> Tuple[int, int, int, int]:
+        magic, version, codec, _, page_count, meta_offset, meta_length, index_offset = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION or codec != CODEC_ZLIB:
+            raise ValueError("Not a supported extracted-text archive")
+        return page_count, meta_offset, meta_length, index_offset
+
+    @classmethod
+    def read_metadata(cls, path: str) -> Dict:
+        """Header and metadata block only (two small reads)"""
+        with open(path, "rb") as f:
+            page_count, meta_offset, meta_length, _ = cls._header(f)
+            f.seek(meta_offset)
+            metadata = json.loads(f.read(meta_length).decode("utf-8"))
+        return {**metadata, "page_count": page_count}
+
+    @classmethod
+    def read_index(cls, path: str) -> List[Tuple[int, int, int, int]]:
+        with open(path, "rb") as f:
+            page_count, _, _, index_offset = cls._header(f)
+            f.seek(index_offset)
+            data = f.read(page_count * INDEX_ENTRY.size)
+        return [INDEX_ENTRY.unpack_from(data, i * INDEX_ENTRY.size) for i in range(page_count)]
+
+    @classmethod
+    def iter_text(cls, path: str) -> Iterator[str]:
+        """The full text, one decompressed page frame at a time"""
+        index = cls.read_index(path)
+        with open(path, "rb") as f:
+            for _, offset, length, _ in index:
+                f.seek(offset)
+                yield zlib.decompress(f.read(length)).decode("utf-8")
+
+    @classmethod
+    def read_page(cls, path: str, page_number: int) -> Optional[str]:
+        """Text of one PDF page without its "--- Page N ---" header; None if it had no text"""
+        for number, offset, length, _ in cls.read_index(path):
+            if number == page_number:
+                with open(path, "rb") as f:
+                    f.seek(offset)
+                    frame = zlib.decompress(f.read(length)).decode("utf-8")
+                return frame.split(f"--- Page {page_number} ---\n", 1)[-1]
+        return None
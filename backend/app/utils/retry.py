@@ -0,0 +1,169 @@
+from typing import Awaitable, Callable, Optional, Sequence, Tuple, Type, TypeVar
+from collections import deque
+import asyncio
+import random
+import time
+
+T = TypeVar("T")
+
+
+class EmptyResponseError(Exception):
+    """Provider answered but returned no usable content"""
+
+
+class RetryPolicy:
+    """
+    How to retry one class of error
+    - exceptions/when: which errors this policy applies to
+    - max_attempts: total tries including the first (1 = never retry)
+    - base_delay/max_delay: exponential backoff bounds in seconds (jittered)
+    """
+
+    def __init__(
+        self,
+        exceptions: Tuple[Type[BaseException], ...] = (Exception,),
+        max_attempts: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 10.0,
+        when: Optional[Callable[[BaseException], bool]] = None,
+        name: str = "default"
+    ):
+        self.exceptions = exceptions
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.when = when
+        self.name = name
+
+    def matches(self, error: BaseException) -> bool:
+        return isinstance(error, self.exceptions) and (self.when is None or self.when(error))
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number `attempt` (0-based): equal jitter over the exponential cap"""
+        cap = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return cap / 2 + random.uniform(0, cap / 2)
+
+
+class RetryBudget:
+    """
+    Limits retries to a fraction of recent calls so a provider outage
+    doesn't multiply traffic. Within `window` seconds, retries are allowed
+    while retries < min_retries + ratio * calls.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 10, window: float = 60.0):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self._calls = deque()
+        self._retries = deque()
+
+    def record_call(self):
+        self._calls.append(time.monotonic())
+
+    def try_spend(self) -> bool:
+        """Take one retry from the budget; False when exhausted"""
+        now = time.monotonic()
+        for events in (self._calls, self._retries):
+            while events and now - events[0] > self.window:
+                events.popleft()
+
+        if len(self._retries) >= self.min_retries + self.ratio * len(self._calls):
+            return False
+        self._retries.append(now)
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "calls_in_window": len(self._calls),
+            "retries_in_window": len(self._retries),
+            "ratio": self.ratio,
+            "window_seconds": self.window
+        }
+
+
+class RateLimiter:
+    """
+    Sliding-window limit of max_calls per `window` seconds (per process).
+    acquire() sleeps with asyncio.sleep until a slot frees up; max_calls <= 0 disables it.
+    """
+
+    def __init__(self, max_calls: int, window: float = 60.0):
+        self.max_calls = max_calls
+        self.window = window
+        self._calls = deque()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.max_calls <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0] >= self.window:
+                    self._calls.popleft()
+                if len(self._calls) < self.max_calls:
+                    self._calls.append(now)
+                    return
+                await asyncio.sleep(self.window - (now - self._calls[0]))
+
+
+async def retry_async(
+    func: Callable[[], Awaitable[T]],
+    policies: Sequence[RetryPolicy],
+    budget: Optional[RetryBudget] = None,
+    label: str = "call"
+) -> T:
+    """
+    Await func() and retry failures using the first policy that matches the error.
+    Sleeps with asyncio.sleep, so other requests keep running during backoff.
+    """
+    if budget:
+        budget.record_call()
+
+    attempt = 0
+    while True:
+        try:
+            return await func()
+        except Exception as e:
+            policy = next((p for p in policies if p.matches(e)), None)
+            if policy is None or attempt + 1 >= policy.max_attempts:
+                raise
+            if budget and not budget.try_spend():
+                print(f"⚠️ {label}: retry budget exhausted, giving up: {e}")
+                raise
+
+            wait_time = policy.backoff(attempt)
+            attempt += 1
+            print(f"⚠️ {label} attempt {attempt} failed ({policy.name}): {e}")
+            print(f"   Retrying in {wait_time:.1f} seconds...")
+            await asyncio.sleep(wait_time)
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    return getattr(error, "code", None) or getattr(error, "status_code", None)
+
+
+def _is_rate_limited(error: BaseException) -> bool:
+    return _status_code(error) == 429
+
+
+def _is_client_error(error: BaseException) -> bool:
+    code = _status_code(error)
+    return isinstance(code, int) and 400 <= code < 500 and code not in (408, 429)
+
+
+# Shared policies for LLM calls, checked in order
+LLM_RETRY_POLICIES = [
+    # Quota / rate limit: back off harder
+    RetryPolicy(max_attempts=4, base_delay=2.0, max_delay=30.0, when=_is_rate_limited, name="rate_limited"),
+    # Bad request, auth, not found: retrying won't help
+    RetryPolicy(max_attempts=1, when=_is_client_error, name="client_error"),
+    # Empty completion: usually transient, retry quickly
+    RetryPolicy(exceptions=(EmptyResponseError,), max_attempts=3, base_delay=0.5, max_delay=2.0, name="empty_response"),
+    # Server errors, timeouts, connection resets
+    RetryPolicy(max_attempts=3, base_delay=1.0, max_delay=8.0, name="transient"),
+]
+
+# One budget per process for all Gemini traffic
+gemini_retry_budget = RetryBudget()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Requests/sec benchmark: sync Session vs AsyncSession route handlers
+
+Seeds a throwaway SQLite database and drives the app in-process through
+httpx's ASGI transport at a fixed concurrency. Each endpoint is run twice:
+through the ported async route, and through a copy of the same handler on
+the old sync `get_db` session. While the load runs, a probe hits /health
+every few milliseconds; its latency shows how long the event loop is
+blocked by database calls.
+
+Keep --concurrency below DB_POOL_SIZE + DB_MAX_OVERFLOW: past that the sync
+handlers block the loop waiting for a connection that can only be returned
+once the loop runs again, and the sync run stalls until the pool timeout.
+
+Usage (from backend/):
+    python benchmarks/async_sessions.py [--requests 400] [--concurrency 10]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench_async.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["JOB_QUEUE_DB_PATH"] = os.path.join(os.path.dirname(DB_PATH), "jobs.db")
+os.environ["QUESTION_POOL_WARMUP"] = "false"
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import APIRouter, Depends
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.config.database import SessionLocal, get_db, init_database, async_engine
+from app.models.models import User, StudyPlan, Topic, Question, QuestionAttempt
+from app.services.progress_service import ProgressService
+from app.main import app
+
+USER_ID = 1
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+# ----------------------------------------------------------------------
+# The same handlers on the sync session (how every route worked before)
+# ----------------------------------------------------------------------
+
+sync_router = APIRouter(prefix="/bench-sync")
+progress_service = ProgressService()
+
+
+@sync_router.get("/overall-progress/{user_id}")
+async def sync_overall_progress(user_id: int, plan_id: int, db: Session = Depends(get_db)):
+    topics = progress_service.get_plan_progress(db, user_id, plan_id)
+    return {"user_id": user_id, "topics": topics}
+
+
+@sync_router.get("/stats/{user_id}")
+async def sync_stats(user_id: int, days: int = 7, db: Session = Depends(get_db)):
+    since_date = datetime.now() - timedelta(days=days)
+    filters = (QuestionAttempt.user_id == user_id, QuestionAttempt.attempted_at >= since_date)
+    return {
+        "total_attempts": db.query(func.count(QuestionAttempt.id)).filter(*filters).scalar() or 0,
+        "average_score": float(db.query(func.avg(QuestionAttempt.score)).filter(*filters).scalar() or 0),
+        "total_time": db.query(func.sum(QuestionAttempt.time_taken)).filter(*filters).scalar() or 0,
+        "daily": len(db.query(func.date(QuestionAttempt.attempted_at)).filter(*filters).group_by(
+            func.date(QuestionAttempt.attempted_at)
+        ).all())
+    }
+
+
+app.include_router(sync_router)
+
+
+def seed(topic_count: int, questions_per_topic: int, attempts: int) -> int:
+    import app.models.placement_models  # noqa: F401  (register tables)
+    init_database()
+    db = SessionLocal()
+    db.add(User(id=USER_ID, email="bench@studybuddy.com", name="Bench"))
+    plan = StudyPlan(
+        user_id=USER_ID, subject="Benchmark", exam_type="final",
+        exam_date=date.today() + timedelta(days=30), daily_hours=4, target_grade="A"
+    )
+    db.add(plan)
+    db.flush()
+
+    question_ids = []
+    for t in range(topic_count):
+        topic = Topic(plan_id=plan.id, name=f"Topic {t}", weight=1, allocated_hours=2, order_index=t)
+        db.add(topic)
+        db.flush()
+        for i in range(questions_per_topic):
+            question = Question(
+                topic_id=topic.id, question_type="mcq", difficulty=["easy", "medium", "hard"][i % 3],
+                question_text=f"Question {t}.{i}", marks=1, time_limit=60
+            )
+            db.add(question)
+            db.flush()
+            question_ids.append(question.id)
+
+    now = datetime.now()
+    for i in range(attempts):
+        db.add(QuestionAttempt(
+            user_id=USER_ID, question_id=question_ids[i % len(question_ids)], student_answer="A",
+            is_correct=i % 2 == 0, score=i % 2, time_taken=30, confidence_level=3,
+            attempted_at=now - timedelta(hours=i % 100)
+        ))
+    db.flush()
+    progress_service.rebuild(db)
+    db.commit()
+    plan_id = plan.id
+    db.close()
+    return plan_id
+
+
+async def run_load(client: httpx.AsyncClient, path: str, total: int, concurrency: int):
+    """Fire `total` GETs at `path` with `concurrency` in flight; probe /health meanwhile"""
+    latencies, probes = [], []
+    remaining = iter(range(total))
+    done = asyncio.Event()
+
+    async def worker():
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await client.get(path)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - started)
+
+    async def probe():
+        while not done.is_set():
+            started = time.perf_counter()
+            await client.get("/health")
+            probes.append(time.perf_counter() - started)
+            await asyncio.sleep(0.005)
+
+    prober = asyncio.create_task(probe())
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await prober
+
+    def p95(values):
+        return statistics.quantiles(values, n=20)[-1] * 1000 if len(values) >= 2 else 0
+
+    return total / elapsed, p95(latencies), p95(probes)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--topics", type=int, default=20)
+    parser.add_argument("--attempts", type=int, default=5000)
+    args = parser.parse_args()
+
+    plan_id = seed(args.topics, 30, args.attempts)
+    scenarios = [
+        ("overall-progress", f"/api/practice/overall-progress/{USER_ID}?plan_id={plan_id}",
+         f"/bench-sync/overall-progress/{USER_ID}?plan_id={plan_id}"),
+        ("stats", f"/api/practice/stats/{USER_ID}", f"/bench-sync/stats/{USER_ID}"),
+    ]
+
+    print(f"\n📊 {args.requests} requests per run, concurrency {args.concurrency} (SQLite, in-process ASGI)")
+    print(f"  {'endpoint':<18} {'session':<8} {'req/s':>8} {'p95 ms':>9} {'probe p95 ms':>13}")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, async_path, sync_path in scenarios:
+            for label, path in (("sync", sync_path), ("async", async_path)):
+                await run_load(client, path, 20, 4)  # warm up connections and caches
+                rps, p95, probe_p95 = await run_load(client, path, args.requests, args.concurrency)
+                print(f"  {name:<18} {label:<8} {rps:>8.1f} {p95:>9.2f} {probe_p95:>13.2f}")
+    print()
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Query-plan regression check for the hot practice/attempt queries
+
+Builds the schema in a throwaway SQLite database, runs EXPLAIN QUERY PLAN
+on each hot query shape and fails if any of them scans its table instead
+of searching an index. Run it after changing models or these queries.
+
+Usage (from backend/):
+    python benchmarks/check_query_plans.py
+"""
+
+import os
+import sys
+import tempfile
+from datetime import date, datetime
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench_plans.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select, func, text
+from app.config.database import Base, engine
+from app.models.models import (
+    Topic, Session as StudySession, Question, MCQOption, WrittenAnswer,
+    QuestionAttempt, SpacedRepetitionSchedule
+)
+from app.models.placement_models import DSAPracticeSession
+
+# (label, statement, index that must be used)
+HOT_QUERIES = [
+    (
+        "practice questions by topic/difficulty/type",
+        select(Question.id).where(
+            Question.topic_id == 1, Question.difficulty == "medium", Question.question_type == "mcq"
+        ),
+        "ix_questions_topic_difficulty_",
+    ),
+    (
+        "seeded random page",
+        select(Question.id).where(
+            Question.topic_id == 1, Question.difficulty == "medium", Question.random_key >= 0.5
+        ).order_by(Question.random_key, Question.id).limit(10),
+        "ix_questions_topic_difficulty_random",
+    ),
+    (
+        "options for a question page",
+        select(MCQOption.id).where(MCQOption.question_id.in_([1, 2, 3])),
+        "ix_mcq_options_question_id",
+    ),
+    (
+        "model answers for a question page",
+        select(WrittenAnswer.id).where(WrittenAnswer.question_id.in_([1, 2, 3])),
+        "ix_written_answers_question_id",
+    ),
+    (
+        "recent attempts for a user",
+        select(QuestionAttempt.id).where(
+            QuestionAttempt.user_id == 1, QuestionAttempt.attempted_at >= datetime(2024, 1, 1)
+        ).order_by(QuestionAttempt.attempted_at.desc()),
+        "ix_question_attempts_user_attempted",
+    ),
+    (
+        "attempts on a question by a user",
+        select(func.count(QuestionAttempt.id)).where(
+            QuestionAttempt.question_id == 1, QuestionAttempt.user_id == 1
+        ),
+        "ix_question_attempts_question_user",
+    ),
+    (
+        "due spaced-repetition reviews",
+        select(SpacedRepetitionSchedule.id).where(
+            SpacedRepetitionSchedule.user_id == 1,
+            SpacedRepetitionSchedule.next_review_date <= date(2024, 1, 1)
+        ),
+        "ix_spaced_repetition_user_next_review",
+    ),
+    (
+        "today's study sessions for a topic",
+        select(StudySession.id).where(
+            StudySession.topic_id == 1, StudySession.scheduled_date == date(2024, 1, 1)
+        ),
+        "ix_sessions_topic_scheduled",
+    ),
+    (
+        "topics of a plan",
+        select(Topic.id).where(Topic.plan_id == 1),
+        "ix_topics_plan_id",
+    ),
+    (
+        "DSA sessions for a profile",
+        select(DSAPracticeSession.id).where(
+            DSAPracticeSession.user_id == 1,
+            DSAPracticeSession.profile_id == 1,
+            DSAPracticeSession.attempted_at >= datetime(2024, 1, 1)
+        ),
+        "ix_dsa_practice_sessions_user_profile_attempted",
+    ),
+]
+
+
+def explain(conn, statement) -> str:
+    sql = str(statement.compile(engine, compile_kwargs={"literal_binds": True}))
+    rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")).fetchall()
+    return " | ".join(row[-1] for row in rows)
+
+
+def main() -> int:
+    Base.metadata.create_all(bind=engine)
+
+    failures = 0
+    with engine.connect() as conn:
+        for label, statement, expected_index in HOT_QUERIES:
+            plan = explain(conn, statement)
+            ok = expected_index in plan and "SCAN " not in plan.replace("SCAN CONSTANT ROW", "")
+            failures += 0 if ok else 1
+            print(f"{'✓' if ok else '❌'} {label}")
+            print(f"    {plan}")
+
+    print(f"\n{len(HOT_QUERIES) - failures}/{len(HOT_QUERIES)} hot queries use their index")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
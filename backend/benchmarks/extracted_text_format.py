@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Extracted-text storage benchmark: legacy pretty-printed JSON vs TextArchive
+
+Writes the same synthetic extracted texts in both formats into a temporary
+directory, then compares:
+- disk use of the directory
+- listing latency (metadata of every file, as a directory scan or catalog rebuild reads it)
+- reading one full text, and one page out of the middle
+
+Usage (from backend/):
+    python benchmarks/extracted_text_format.py [--files 200] [--pages 120]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.text_archive import TextArchive
+
+WORDS = (
+    "process thread scheduler memory page frame segment deadlock semaphore mutex kernel "
+    "interrupt cache virtual address table disk block inode file system queue priority"
+).split()
+
+
+def synthetic_pages(rng: random.Random, pages: int):
+    """(page_number, fragment) in the extracted-text layout"""
+    for number in range(1, pages + 1):
+        lines = [" ".join(rng.choice(WORDS) for _ in range(12)) for _ in range(40)]
+        prefix = "" if number == 1 else "\n\n"
+        yield number, f"{prefix}--- Page {number} ---\n" + "\n".join(lines)
+
+
+def write_legacy(path: str, text: str, filename: str):
+    """PDFService.save_extracted_text_to_json before this format existed"""
+    data = {
+        "filename": filename,
+        "file_type": "syllabus",
+        "extracted_at": "20260101_120000",
+        "text_length": len(text),
+        "text": text,
+        "preview": text[:500] if len(text) > 500 else text
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+
+
+def dir_bytes(directory: str) -> int:
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+
+
+def timed(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=120)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp()
+    legacy_dir, archive_dir = os.path.join(root, "json"), os.path.join(root, "sbt")
+    os.makedirs(legacy_dir)
+    os.makedirs(archive_dir)
+
+    rng = random.Random(7)
+    for i in range(args.files):
+        pages = list(synthetic_pages(rng, args.pages))
+        filename = f"notes_{i}.pdf"
+        write_legacy(os.path.join(legacy_dir, f"{i}.json"), "".join(text for _, text in pages), filename)
+        TextArchive.write(os.path.join(archive_dir, f"{i}{TextArchive.EXTENSION}"), pages,
+                          {"filename": filename, "file_type": "syllabus", "extracted_at": "20260101_120000"})
+
+    def list_legacy():
+        for name in os.listdir(legacy_dir):
+            with open(os.path.join(legacy_dir, name), encoding="utf-8") as f:
+                json.load(f).get("text_length")
+
+    def list_archive():
+        for name in os.listdir(archive_dir):
+            TextArchive.read_metadata(os.path.join(archive_dir, name)).get("text_length")
+
+    legacy_file, archive_file = os.path.join(legacy_dir, "0.json"), os.path.join(archive_dir, f"0{TextArchive.EXTENSION}")
+    with open(legacy_file, encoding="utf-8") as f:
+        same = json.load(f)["text"] == "".join(TextArchive.iter_text(archive_file))
+    middle = args.pages // 2
+
+    def page_legacy():
+        with open(legacy_file, encoding="utf-8") as f:
+            text = json.load(f)["text"]
+        text.split(f"--- Page {middle} ---\n", 1)[1].split("\n\n--- Page", 1)[0]
+
+    rows = [
+        ("disk MB", dir_bytes(legacy_dir) / 1024 / 1024, dir_bytes(archive_dir) / 1024 / 1024),
+        (f"list {args.files} files ms", timed(list_legacy), timed(list_archive)),
+        ("read one text ms", timed(lambda: json.load(open(legacy_file, encoding="utf-8"))),
+         timed(lambda: "".join(TextArchive.iter_text(archive_file)))),
+        ("read one page ms", timed(page_legacy), timed(lambda: TextArchive.read_page(archive_file, middle))),
+    ]
+
+    print(f"\n📦 {args.files} extracted texts x {args.pages} pages")
+    print(f"  {'':<22} {'json':>10} {'archive':>10}")
+    for label, legacy, archive in rows:
+        print(f"  {label:<22} {legacy:>10.2f} {archive:>10.2f}")
+    print(f"\n{'✓' if same else '❌'} archive text {'matches' if same else 'differs from'} the JSON text\n")
+
+
+if __name__ == "__main__":
+    main()
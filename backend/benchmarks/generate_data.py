@@ -0,0 +1,682 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic data generator
+
+Bulk-loads a database with realistic volumes for every table in models.py,
+placement_models.py and peer_models.py, so the query paths can be
+benchmarked at production-like scale instead of against init_db.py's single
+user. Rows are built from one random.Random(seed) with explicit ids and
+written with batched Core inserts (executemany), parents before children.
+
+The same --seed, --anchor and sizing flags always produce the same rows;
+--anchor defaults to a fixed date, not today, so the seed alone is enough.
+--checksum prints a digest of everything generated to confirm it.
+
+Distributions
+- ~30% of users never practice; the rest follow a long-tailed (lognormal)
+  activity curve, so a few heavy users own a large share of attempts
+- per-user skill ~ Beta(5, 3), lowered by question difficulty and a
+  per-topic bias; written scores are partial marks around that skill
+- attempts cluster in the last few weeks (exponential recency)
+- difficulty mix 30/50/20 easy/medium/hard, 80% MCQ
+- user_topic_stats is computed from the generated attempts, so it matches
+  what ProgressService.rebuild would write
+
+Usage (from backend/):
+    python benchmarks/generate_data.py --scale small --database-url sqlite:////tmp/bench.db
+    python benchmarks/generate_data.py --scale large --seed 7 --reset
+
+Scales: small (1k users), medium (10k), large (100k users, ~4M attempts,
+~1M topics). --users / --attempts-per-user / --questions-per-topic override
+the preset.
+"""
+
+import argparse
+import hashlib
+import math
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+from random import Random
+
+# Default --anchor: fixed, so --seed alone reproduces a dataset
+DEFAULT_ANCHOR = date(2026, 1, 1)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--users", type=int, help="override the preset's user count")
+    parser.add_argument("--attempts-per-user", type=int, help="mean attempts per user (inactive users included)")
+    parser.add_argument("--questions-per-topic", type=int, help="question bank size of each practiced topic")
+    parser.add_argument("--anchor", type=date.fromisoformat, default=DEFAULT_ANCHOR,
+                        help=f"'today' for the generated timeline, YYYY-MM-DD (default: {DEFAULT_ANCHOR})")
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows per executemany")
+    parser.add_argument("--database-url", help="target database (default: the app's DATABASE_URL)")
+    parser.add_argument("--reset", action="store_true", help="drop and recreate all tables first")
+    parser.add_argument("--checksum", action="store_true", help="print a digest of the generated rows")
+    return parser.parse_args()
+
+
+SCALES = {
+    "small": {"users": 1_000, "attempts_per_user": 40, "questions_per_topic": 12},
+    "medium": {"users": 10_000, "attempts_per_user": 40, "questions_per_topic": 12},
+    "large": {"users": 100_000, "attempts_per_user": 40, "questions_per_topic": 10},
+}
+
+# The target database has to be chosen before app.config.database builds its engines
+if __name__ == "__main__":
+    ARGS = parse_args()
+    if ARGS.database_url:
+        os.environ["DATABASE_URL"] = ARGS.database_url
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, select, func, text
+from app.config.database import Base, engine
+from app.models.models import (
+    User, StudyPlan, Topic, Session as StudySession, Question, GenerationLock, MCQOption,
+    WrittenAnswer, QuestionAttempt, UserTopicStats, SpacedRepetitionSchedule, WeaknessPattern,
+    UploadedFile
+)
+from app.models.placement_models import (
+    PlacementUser, PlacementProfile, PlacementPlan, DSAPracticeSession, TopicProgress, DailyGoal
+)
+from app.models.peer_models import (
+    PeerProfile, StudyPartnership, DoubtThread, DoubtResponse, StudyGroup, GroupMembership,
+    GroupSession, RevisionChallenge, WeaknessAnalysis
+)
+from app.services.progress_service import COUNTER_COLUMNS
+
+# ----------------------------------------------------------------------
+# Vocabulary
+# ----------------------------------------------------------------------
+
+SUBJECTS = {
+    "Operating Systems": [
+        "Processes and Threads", "CPU Scheduling", "Synchronization", "Deadlocks", "Memory Management",
+        "Paging", "Virtual Memory", "File Systems", "I/O Systems", "Disk Scheduling", "Protection", "Virtualization"
+    ],
+    "Database Management Systems": [
+        "ER Model", "Relational Model", "Relational Algebra", "SQL", "Normalization", "Functional Dependencies",
+        "Transactions", "Concurrency Control", "Recovery", "Indexing", "B+ Trees", "Query Optimization"
+    ],
+    "Computer Networks": [
+        "OSI Model", "Physical Layer", "Data Link Layer", "MAC Protocols", "IP Addressing", "Routing",
+        "Transport Layer", "TCP Congestion Control", "DNS", "HTTP", "Network Security", "Wireless Networks"
+    ],
+    "Data Structures": [
+        "Arrays", "Linked Lists", "Stacks", "Queues", "Trees", "Binary Search Trees", "Heaps",
+        "Hashing", "Graphs", "Tries", "Segment Trees", "Disjoint Sets"
+    ],
+    "Physics": [
+        "Kinematics", "Laws of Motion", "Work and Energy", "Rotational Motion", "Gravitation", "Oscillations",
+        "Waves", "Thermodynamics", "Electrostatics", "Current Electricity", "Magnetism", "Optics"
+    ],
+    "Chemistry": [
+        "Atomic Structure", "Chemical Bonding", "States of Matter", "Thermochemistry", "Equilibrium",
+        "Redox Reactions", "Electrochemistry", "Chemical Kinetics", "Coordination Compounds",
+        "Hydrocarbons", "Organic Reactions", "Polymers"
+    ],
+    "Mathematics": [
+        "Sets and Relations", "Complex Numbers", "Matrices", "Determinants", "Sequences and Series",
+        "Limits", "Differentiation", "Integration", "Differential Equations", "Vectors", "Probability",
+        "Statistics"
+    ],
+    "Biology": [
+        "Cell Structure", "Cell Division", "Genetics", "Molecular Biology", "Evolution", "Plant Physiology",
+        "Photosynthesis", "Respiration", "Human Physiology", "Ecology", "Biotechnology", "Reproduction"
+    ],
+}
+EXAM_TYPES = ["midterm", "final", "quiz", "semester", "competitive"]
+GRADES = ["A+", "A", "B+", "B", "C"]
+DIFFICULTIES = [("easy", 0.3), ("medium", 0.5), ("hard", 0.2)]
+DIFFICULTY_PENALTY = {"easy": 0.0, "medium": 0.12, "hard": 0.25}
+ERROR_CATEGORIES = ["conceptual", "calculation", "careless", "time_management", "incomplete_answer"]
+FILE_TYPES = [("pdf", 0.7), ("docx", 0.2), ("txt", 0.1)]
+
+COMPANIES = ["Amazon", "Google", "Microsoft", "Flipkart", "Infosys", "TCS", "Adobe", "Atlassian", "Uber", "Goldman Sachs"]
+ROLES = ["SDE", "SDE Intern", "Backend Engineer", "Data Analyst", "Frontend Engineer"]
+ROUND_TYPES = ["aptitude", "dsa_coding", "technical", "system_design", "hr"]
+DSA_TOPICS = {
+    "Arrays": ["Two Sum", "Best Time to Buy and Sell Stock", "Contains Duplicate", "Product of Array Except Self"],
+    "Strings": ["Valid Anagram", "Longest Substring Without Repeating Characters", "Group Anagrams"],
+    "LinkedList": ["Reverse Linked List", "Merge Two Sorted Lists", "Linked List Cycle"],
+    "Trees": ["Binary Tree Inorder Traversal", "Validate BST", "Lowest Common Ancestor"],
+    "Graphs": ["Number of Islands", "Course Schedule", "Clone Graph"],
+    "Dynamic Programming": ["Climbing Stairs", "Coin Change", "Longest Increasing Subsequence"],
+    "Binary Search": ["Search in Rotated Sorted Array", "Find Minimum in Rotated Sorted Array"],
+    "Heaps": ["Kth Largest Element", "Merge K Sorted Lists", "Top K Frequent Elements"],
+}
+APPROACHES = ["brute force", "two pointers", "hash map", "sliding window", "dfs", "bfs", "dp", "greedy"]
+ROOM_TYPES = ["subject_prep", "dsa_prep", "placement_prep"]
+GROUP_SESSION_TYPES = ["dsa_practice", "revision_challenge", "mock_interview"]
+SKILL_LEVELS = ["beginner", "intermediate", "advanced"]
+FILLER = (
+    "The lecture notes cover definitions, worked examples and common exam questions. "
+    "Key results are stated with proofs where required and followed by practice problems. "
+)
+
+# lognormal(0, 1.1) activity has mean e^(1.1^2 / 2)
+ACTIVITY_SIGMA = 1.1
+ACTIVITY_MEAN = math.exp(ACTIVITY_SIGMA ** 2 / 2)
+INACTIVE_SHARE = 0.3
+
+
+def weighted(rng: Random, choices):
+    """Pick from [(value, weight), ...]"""
+    roll = rng.random() * sum(w for _, w in choices)
+    for value, weight in choices:
+        roll -= weight
+        if roll < 0:
+            return value
+    return choices[-1][0]
+
+
+def clamp(value, low, high):
+    return max(low, min(high, value))
+
+
+# ----------------------------------------------------------------------
+# Batched Core inserts
+# ----------------------------------------------------------------------
+
+class BulkLoader:
+    """
+    Buffers rows per table and writes them with executemany
+    - buffers are flushed together in FK order (metadata.sorted_tables),
+      so parent rows always land before their children
+    - optionally folds every row into a digest for reproducibility checks
+    """
+
+    def __init__(self, engine, batch_size: int, checksum: bool = False):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.buffers = {}
+        self.buffered = 0
+        self.counts = {}
+        self.digest = hashlib.sha256() if checksum else None
+        self.order = [t.name for t in Base.metadata.sorted_tables]
+
+    def add(self, model, **row):
+        table = model.__table__
+        self.buffers.setdefault(table.name, (table, []))[1].append(row)
+        self.buffered += 1
+        if self.digest is not None:
+            self.digest.update(f"{table.name}{sorted(row.items())}".encode())
+        if self.buffered >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffered:
+            return
+        with self.engine.begin() as conn:
+            for name in self.order:
+                if name not in self.buffers:
+                    continue
+                table, rows = self.buffers.pop(name)
+                for start in range(0, len(rows), self.batch_size):
+                    conn.execute(insert(table), rows[start:start + self.batch_size])
+                self.counts[name] = self.counts.get(name, 0) + len(rows)
+        self.buffered = 0
+
+
+# ----------------------------------------------------------------------
+# Generator
+# ----------------------------------------------------------------------
+
+class DataGenerator:
+    """Builds every table's rows from one seeded RNG, user by user"""
+
+    def __init__(self, loader: BulkLoader, seed: int, anchor: date, users: int,
+                 attempts_per_user: int, questions_per_topic: int):
+        self.loader = loader
+        self.rng = Random(seed)
+        self.today = anchor
+        self.now = datetime.combine(anchor, datetime.min.time()) + timedelta(hours=12)
+        self.users = users
+        self.attempts_per_user = attempts_per_user
+        self.questions_per_topic = questions_per_topic
+        self.ids = {}
+        self.peer_user_ids = []
+
+    def next_id(self, table: str) -> int:
+        self.ids[table] = self.ids.get(table, 0) + 1
+        return self.ids[table]
+
+    def days_ago(self, max_days: float = 365) -> datetime:
+        """Exponential recency: most activity in the last few weeks"""
+        days = min(self.rng.expovariate(1 / 21), max_days)
+        return self.now - timedelta(seconds=int(days * 86400))
+
+    def run(self):
+        for user_id in range(1, self.users + 1):
+            self.generate_user(user_id)
+        self.generate_peer_network()
+        self.loader.flush()
+
+    # -- exam prep -----------------------------------------------------
+
+    def generate_user(self, user_id: int):
+        rng = self.rng
+        created_at = self.now - timedelta(days=rng.randint(30, 720), seconds=rng.randint(0, 86399))
+        self.loader.add(User, id=user_id, email=f"user{user_id}@studybuddy.com",
+                        name=f"Student {user_id}", created_at=created_at)
+
+        skill = rng.betavariate(5, 3)
+        activity = min(rng.lognormvariate(0, ACTIVITY_SIGMA), 25)
+        if rng.random() < INACTIVE_SHARE:
+            attempt_count = 0
+        else:
+            mean = self.attempts_per_user / (1 - INACTIVE_SHARE)
+            attempt_count = max(1, round(mean * activity / ACTIVITY_MEAN))
+
+        plans = [self.generate_plan(user_id, created_at) for _ in range(1 + (rng.random() < 0.25) + (rng.random() < 0.05))]
+        topics = [topic for plan in plans for topic in plan]
+        if attempt_count:
+            self.generate_practice(user_id, skill, topics, attempt_count)
+
+        if rng.random() < 0.3:
+            self.generate_placement(user_id, activity)
+        if rng.random() < 0.2:
+            self.generate_peer_profile(user_id, skill, activity)
+
+    def generate_plan(self, user_id: int, user_created: datetime):
+        """A study plan with its topics, scheduled sessions and uploads; returns topic ids"""
+        rng = self.rng
+        plan_id = self.next_id("study_plans")
+        subject = rng.choice(sorted(SUBJECTS))
+        exam_date = self.today + timedelta(days=rng.randint(-60, 120))
+        created_at = max(user_created, datetime.combine(exam_date, datetime.min.time()) - timedelta(days=rng.randint(14, 120)))
+        daily_hours = rng.choice([1.0, 1.5, 2.0, 3.0, 4.0, 6.0])
+        self.loader.add(StudyPlan, id=plan_id, user_id=user_id, subject=subject,
+                        exam_type=rng.choice(EXAM_TYPES), exam_date=exam_date, daily_hours=daily_hours,
+                        target_grade=rng.choice(GRADES),
+                        status="completed" if exam_date < self.today else "active", created_at=created_at)
+
+        names = rng.sample(SUBJECTS[subject], rng.randint(5, len(SUBJECTS[subject])))
+        weights = [rng.uniform(0.5, 2.0) for _ in names]
+        span_days = max(1, (exam_date - created_at.date()).days)
+        total_hours = daily_hours * span_days
+        topic_ids = []
+        for index, (name, weight) in enumerate(zip(names, weights)):
+            topic_id = self.next_id("topics")
+            topic_ids.append(topic_id)
+            self.loader.add(Topic, id=topic_id, plan_id=plan_id, name=name, weight=round(weight, 2),
+                            allocated_hours=round(total_hours * weight / sum(weights), 1), order_index=index,
+                            mastery_level=0.0)
+            for _ in range(rng.randint(1, 4)):
+                scheduled = created_at.date() + timedelta(days=rng.randint(0, span_days))
+                completed = scheduled < self.today and rng.random() < 0.7
+                self.loader.add(
+                    StudySession, id=self.next_id("sessions"), topic_id=topic_id, scheduled_date=scheduled,
+                    duration=rng.choice([0.5, 1.0, 1.5, 2.0]), completed=completed,
+                    completed_at=datetime.combine(scheduled, datetime.min.time()) + timedelta(hours=rng.randint(8, 23))
+                    if completed else None
+                )
+
+        if rng.random() < 0.2:
+            for n in range(rng.randint(1, 3)):
+                file_type = weighted(rng, FILE_TYPES)
+                self.loader.add(
+                    UploadedFile, id=self.next_id("uploaded_files"), plan_id=plan_id,
+                    filename=f"{subject.lower().replace(' ', '_')}_notes_{n + 1}.{file_type}", file_type=file_type,
+                    extracted_text=f"{subject} notes part {n + 1}. " + FILLER * rng.randint(5, 40),
+                    uploaded_at=created_at + timedelta(minutes=rng.randint(1, 600))
+                )
+        return topic_ids
+
+    def generate_questions(self, topic_id: int):
+        """Question bank for a practiced topic; returns [(id, type, difficulty, marks, correct_label)]"""
+        rng = self.rng
+        bank = []
+        for n in range(self.questions_per_topic):
+            question_id = self.next_id("questions")
+            difficulty = weighted(rng, DIFFICULTIES)
+            question_type = "mcq" if rng.random() < 0.8 else "written"
+            marks = 1 if question_type == "mcq" else rng.choice([2, 5, 10])
+            self.loader.add(
+                Question, id=question_id, topic_id=topic_id, question_type=question_type, difficulty=difficulty,
+                question_text=f"Topic {topic_id} {difficulty} {question_type} question {n + 1}?", marks=marks,
+                time_limit=60 if question_type == "mcq" else marks * 180,
+                source="generated" if rng.random() < 0.9 else "pyq",
+                created_at=self.days_ago(), random_key=rng.random()
+            )
+            correct_label = None
+            if question_type == "mcq":
+                correct_label = rng.choice("ABCD")
+                for label in "ABCD":
+                    self.loader.add(
+                        MCQOption, id=self.next_id("mcq_options"), question_id=question_id, option_label=label,
+                        option_text=f"Option {label} for question {question_id}", is_correct=label == correct_label,
+                        explanation=f"{correct_label} is correct." if label == correct_label else None
+                    )
+            else:
+                self.loader.add(
+                    WrittenAnswer, id=self.next_id("written_answers"), question_id=question_id,
+                    model_answer=f"Model answer for question {question_id}. " + FILLER * 2,
+                    marking_scheme={"introduction": 1, "main_body": marks - 2, "conclusion": 1},
+                    keywords=[{"word": f"term{k}", "importance": rng.choice(["high", "medium", "low"])} for k in range(3)],
+                    expected_length=f"{marks * 25}-{marks * 35} words"
+                )
+            bank.append((question_id, question_type, difficulty, marks, correct_label))
+
+        if rng.random() < 0.01:
+            acquired = self.days_ago(30)
+            self.loader.add(GenerationLock, key=f"mcq:{topic_id}:{weighted(rng, DIFFICULTIES)}",
+                            owner=f"worker-{rng.randint(1, 8)}:{rng.randint(1000, 65000)}",
+                            acquired_at=acquired, expires_at=acquired + timedelta(minutes=2))
+        return bank
+
+    def generate_practice(self, user_id: int, skill: float, topics, attempt_count: int):
+        """Attempts over a few favourite topics, plus the stats/SRS/weakness rows they imply"""
+        rng = self.rng
+        practiced = rng.sample(topics, min(len(topics), 1 + attempt_count // 10, 8))
+        banks = {topic_id: self.generate_questions(topic_id) for topic_id in practiced}
+        bias = {topic_id: rng.gauss(0, 0.08) for topic_id in practiced}
+        topic_weights = [(topic_id, 1 / (rank + 1)) for rank, topic_id in enumerate(practiced)]
+
+        attempts = []
+        for _ in range(attempt_count):
+            topic_id = weighted(rng, topic_weights)
+            question_id, question_type, difficulty, marks, correct_label = rng.choice(banks[topic_id])
+            p = clamp(skill + bias[topic_id] - DIFFICULTY_PENALTY[difficulty], 0.05, 0.98)
+            if question_type == "mcq":
+                is_correct = rng.random() < p
+                score = float(marks) if is_correct else 0.0
+                answer = correct_label if is_correct else rng.choice([l for l in "ABCD" if l != correct_label])
+                time_taken = int(clamp(rng.lognormvariate(3.6, 0.5), 5, 600))
+            else:
+                score = round(marks * clamp(rng.gauss(p, 0.15), 0, 1) * 2) / 2
+                is_correct = score / marks >= 0.6
+                answer = f"Answer to question {question_id}. " + FILLER
+                time_taken = int(clamp(rng.lognormvariate(6.3, 0.4), 60, 3600))
+            attempts.append((self.days_ago(), topic_id, question_id, question_type, difficulty, answer,
+                             is_correct, score, time_taken,
+                             clamp(round(1 + 4 * p + rng.gauss(0, 0.8)), 1, 5)))
+
+        attempts.sort(key=lambda a: a[0])
+        stats = {}
+        last_seen = {}
+        for attempted_at, topic_id, question_id, question_type, difficulty, answer, is_correct, score, \
+                time_taken, confidence in attempts:
+            self.loader.add(
+                QuestionAttempt, id=self.next_id("question_attempts"), user_id=user_id, question_id=question_id,
+                student_answer=answer, is_correct=is_correct, score=score, time_taken=time_taken,
+                confidence_level=confidence, attempted_at=attempted_at
+            )
+            row = stats.setdefault(topic_id, {column: 0 for column in COUNTER_COLUMNS})
+            row["attempts"] += 1
+            row["score_sum"] += score
+            row["scored"] += 1
+            row[f"{difficulty}_attempts"] += 1
+            row[f"{difficulty}_score_sum"] += score
+            row[f"{difficulty}_scored"] += 1
+            if question_type == "mcq":
+                row["mcq_attempts"] += 1
+                row["mcq_correct"] += int(is_correct)
+            last_seen[topic_id] = attempted_at
+
+        for topic_id in sorted(stats):
+            row = stats[topic_id]
+            self.loader.add(UserTopicStats, id=self.next_id("user_topic_stats"), user_id=user_id,
+                            topic_id=topic_id, updated_at=last_seen[topic_id], **row)
+
+            interval = rng.choice([1, 3, 7, 14, 30])
+            self.loader.add(
+                SpacedRepetitionSchedule, id=self.next_id("spaced_repetition_schedule"), user_id=user_id,
+                topic_id=topic_id, next_review_date=last_seen[topic_id].date() + timedelta(days=interval),
+                interval_days=interval, ease_factor=round(rng.uniform(1.3, 2.8), 2),
+                review_count=rng.randint(1, 12), last_reviewed=last_seen[topic_id]
+            )
+
+            if row["mcq_attempts"] >= 5 and row["mcq_correct"] / row["mcq_attempts"] < 0.5:
+                for category in rng.sample(ERROR_CATEGORIES, rng.randint(1, 2)):
+                    self.loader.add(
+                        WeaknessPattern, id=self.next_id("weakness_patterns"), user_id=user_id, topic_id=topic_id,
+                        error_category=category, occurrence_count=rng.randint(1, max(1, row["attempts"] // 3)),
+                        last_detected=last_seen[topic_id], remedial_content_generated=rng.random() < 0.4
+                    )
+
+    # -- placement prep ------------------------------------------------
+
+    def generate_placement(self, user_id: int, activity: float):
+        rng = self.rng
+        placement_user_id = self.next_id("placement_users")
+        self.loader.add(PlacementUser, id=placement_user_id, email=f"user{user_id}@placement.com",
+                        name=f"Student {user_id}", created_at=self.days_ago(365))
+
+        for _ in range(1 + (rng.random() < 0.15)):
+            profile_id = self.next_id("placement_profiles")
+            created_at = self.days_ago(180)
+            interview_date = self.today + timedelta(days=rng.randint(-30, 90))
+            rounds = [
+                {"round_number": n + 1, "type": round_type, "duration": rng.choice([45, 60, 90])}
+                for n, round_type in enumerate(rng.sample(ROUND_TYPES, rng.randint(2, 4)))
+            ]
+            company = rng.choice(COMPANIES)
+            self.loader.add(
+                PlacementProfile, id=profile_id, user_id=placement_user_id, company_name=company,
+                role=rng.choice(ROLES), interview_date=interview_date, hours_per_day=rng.choice([2.0, 3.0, 4.0, 6.0]),
+                round_structure=rounds, status="completed" if interview_date < self.today else "active",
+                created_at=created_at, updated_at=created_at
+            )
+
+            topics = rng.sample(sorted(DSA_TOPICS), rng.randint(3, len(DSA_TOPICS)))
+            total_days = max(7, (interview_date - created_at.date()).days)
+            sessions = int(activity * rng.randint(5, 20))
+            progress = {topic: {"attempted": 0, "solved": 0, "minutes": 0, "easy": 0, "medium": 0,
+                                "hard": 0, "last": None} for topic in topics}
+            for _ in range(sessions):
+                topic = rng.choice(topics)
+                difficulty = weighted(rng, DIFFICULTIES)
+                solved = rng.random() < 0.75 - DIFFICULTY_PENALTY[difficulty]
+                minutes = int(clamp(rng.lognormvariate(3.2, 0.5), 5, 180))
+                attempted_at = self.days_ago(180)
+                self.loader.add(
+                    DSAPracticeSession, id=self.next_id("dsa_practice_sessions"), user_id=placement_user_id,
+                    profile_id=profile_id, topic=topic, problem_name=rng.choice(DSA_TOPICS[topic]),
+                    difficulty=difficulty, attempted=True, solved=solved, time_spent_minutes=minutes,
+                    code_submitted="def solve():\n    pass\n" if rng.random() < 0.3 else None,
+                    approach_used=rng.choice(APPROACHES) if solved else None, notes=None,
+                    attempted_at=attempted_at,
+                    solved_at=attempted_at + timedelta(minutes=minutes) if solved else None
+                )
+                entry = progress[topic]
+                entry["attempted"] += 1
+                entry["minutes"] += minutes
+                if solved:
+                    entry["solved"] += 1
+                    entry[difficulty] += 1
+                entry["last"] = max(entry["last"] or attempted_at, attempted_at)
+
+            completed_tasks = 0
+            for topic in topics:
+                entry = progress[topic]
+                completed_tasks += entry["solved"]
+                self.loader.add(
+                    TopicProgress, id=self.next_id("topic_progress"), user_id=placement_user_id,
+                    profile_id=profile_id, topic=topic, problems_attempted=entry["attempted"],
+                    problems_solved=entry["solved"], time_spent_minutes=entry["minutes"],
+                    easy_solved=entry["easy"], medium_solved=entry["medium"], hard_solved=entry["hard"],
+                    weakness_score=round(1 - entry["solved"] / entry["attempted"], 2) if entry["attempted"] else 1.0,
+                    last_practiced=entry["last"], created_at=created_at, updated_at=entry["last"] or created_at
+                )
+
+            total_tasks = max(completed_tasks, len(topics) * 10)
+            self.loader.add(
+                PlacementPlan, id=self.next_id("placement_plans"), profile_id=profile_id,
+                plan_json={"company": company, "weeks": [
+                    {"week": w + 1, "topics": topics[w::4]} for w in range(min(4, len(topics)))
+                ]},
+                total_days=total_days, total_hours=float(total_days * 3), total_tasks=total_tasks,
+                completed_tasks=completed_tasks, total_topics=len(topics),
+                progress_percentage=round(completed_tasks / total_tasks * 100, 1), created_at=created_at
+            )
+
+            for offset in range(min(14, total_days)):
+                day = self.today - timedelta(days=offset)
+                target = rng.randint(3, 8)
+                done = min(target, int(rng.random() * activity * 4))
+                self.loader.add(
+                    DailyGoal, id=self.next_id("daily_goals"), user_id=placement_user_id, profile_id=profile_id,
+                    date=day, target_problems=target, completed_problems=done,
+                    topics_planned=rng.sample(topics, min(2, len(topics))), completed=done >= target,
+                    created_at=datetime.combine(day, datetime.min.time())
+                )
+
+    # -- peer learning -------------------------------------------------
+
+    def generate_peer_profile(self, user_id: int, skill: float, activity: float):
+        rng = self.rng
+        goal_type = rng.choice(["exam", "placement"])
+        self.loader.add(
+            PeerProfile, id=self.next_id("peer_profiles"), user_id=user_id, name=f"Student {user_id}",
+            goal_type=goal_type, subject=rng.choice(sorted(SUBJECTS)) if goal_type == "exam" else None,
+            company=rng.choice(COMPANIES) if goal_type == "placement" else None,
+            hours_per_day=rng.choice([1.0, 2.0, 3.0, 4.0]),
+            skill_level=SKILL_LEVELS[min(2, int(skill * 3))], confidence_rating=round(clamp(skill * 5, 1, 5), 1),
+            is_looking_for_partner=rng.random() < 0.4, current_study_streak=int(clamp(activity * 3, 0, 60)),
+            created_at=self.days_ago(365)
+        )
+        self.peer_user_ids.append(user_id)
+
+        # Doubt threads, answered by peers who joined earlier
+        for _ in range(int(rng.random() * activity * 1.5)):
+            thread_id = self.next_id("doubt_threads")
+            topic = rng.choice(SUBJECTS[rng.choice(sorted(SUBJECTS))])
+            responses = rng.randint(0, 5)
+            self.loader.add(
+                DoubtThread, id=thread_id, user_id=user_id, topic=topic, title=f"Doubt about {topic}",
+                question=f"Can someone explain {topic.lower()}? " + FILLER, upvotes=int(rng.expovariate(1 / 3)),
+                is_resolved=responses > 0 and rng.random() < 0.6, created_at=self.days_ago(180)
+            )
+            accepted = rng.randrange(responses) if responses and rng.random() < 0.5 else None
+            for n in range(responses):
+                is_ai = rng.random() < 0.2
+                self.loader.add(
+                    DoubtResponse, id=self.next_id("doubt_responses"), thread_id=thread_id,
+                    user_id=None if is_ai else rng.choice(self.peer_user_ids),
+                    response_text=f"Here is how {topic.lower()} works. " + FILLER, is_ai_response=is_ai,
+                    upvotes=int(rng.expovariate(1 / 2)), is_accepted=n == accepted, created_at=self.days_ago(180)
+                )
+
+    def generate_peer_network(self):
+        """Partnerships and study groups across all peer profiles"""
+        rng = self.rng
+        peers = list(self.peer_user_ids)
+        rng.shuffle(peers)
+        for user1, user2 in zip(peers[0::2], peers[1::2]):
+            if rng.random() < 0.5:
+                self.loader.add(
+                    StudyPartnership, id=self.next_id("study_partnerships"), user1_id=user1, user2_id=user2,
+                    status=weighted(rng, [("active", 0.7), ("paused", 0.2), ("ended", 0.1)]),
+                    match_score=round(rng.uniform(0.5, 1.0), 2), created_at=self.days_ago(180)
+                )
+
+        for _ in range(max(1, len(peers) // 20) if peers else 0):
+            group_id = self.next_id("study_groups")
+            room_type = rng.choice(ROOM_TYPES)
+            goal = f"{rng.choice(COMPANIES)} SDE" if room_type != "subject_prep" else f"{rng.choice(sorted(SUBJECTS))} Exam"
+            members = rng.sample(peers, min(len(peers), rng.randint(2, 6)))
+            self.loader.add(StudyGroup, id=group_id, name=f"{goal} Group {group_id}", room_type=room_type, goal=goal,
+                            max_members=6, current_members=len(members), created_at=self.days_ago(365))
+            for n, member in enumerate(members):
+                self.loader.add(GroupMembership, id=self.next_id("group_memberships"), group_id=group_id,
+                                user_id=member, role="admin" if n == 0 else "member", joined_at=self.days_ago(180))
+
+            for _ in range(rng.randint(0, 6)):
+                scheduled = self.now + timedelta(days=rng.randint(-30, 14), hours=rng.randint(0, 12))
+                status = "completed" if scheduled < self.now else "scheduled"
+                self.loader.add(
+                    GroupSession, id=self.next_id("group_sessions"), group_id=group_id,
+                    session_type=rng.choice(GROUP_SESSION_TYPES),
+                    problem_name=rng.choice(DSA_TOPICS[rng.choice(sorted(DSA_TOPICS))]),
+                    duration_minutes=rng.choice([30, 45, 60, 90]), scheduled_at=scheduled, status=status,
+                    participants=[
+                        {"user_id": member, "score": rng.randint(0, 100), "time_taken": rng.randint(300, 3600)}
+                        for member in members
+                    ] if status == "completed" else [],
+                    created_at=scheduled - timedelta(days=rng.randint(1, 7))
+                )
+
+            for _ in range(rng.randint(0, 3)):
+                count = rng.choice([5, 10])
+                status = rng.choice(["upcoming", "active", "completed"])
+                self.loader.add(
+                    RevisionChallenge, id=self.next_id("revision_challenges"), group_id=group_id,
+                    title=f"{count} Questions in {count * 4} Minutes", description=f"Quick revision for {goal}",
+                    questions=[{"question": f"Challenge question {n + 1}"} for n in range(count)],
+                    time_limit_minutes=count * 4, status=status,
+                    scores=[{"user_id": member, "score": rng.randint(0, count), "time_taken": rng.randint(60, count * 240)}
+                            for member in members] if status == "completed" else [],
+                    created_at=self.days_ago(60)
+                )
+
+            for topic in rng.sample(SUBJECTS[rng.choice(sorted(SUBJECTS))], 2):
+                avg_score = round(rng.uniform(30, 90), 1)
+                self.loader.add(
+                    WeaknessAnalysis, id=self.next_id("weakness_analysis"), group_id=group_id, topic=topic,
+                    avg_score=avg_score, total_attempts=rng.randint(5, 200),
+                    weakness_level="high" if avg_score < 50 else "medium" if avg_score < 70 else "low",
+                    next_session_date=self.now + timedelta(days=rng.randint(1, 14)) if avg_score < 70 else None,
+                    updated_at=self.days_ago(30)
+                )
+
+
+# ----------------------------------------------------------------------
+# Entry point
+# ----------------------------------------------------------------------
+
+def prepare_schema(reset: bool):
+    if reset:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        if conn.execute(select(func.count()).select_from(User.__table__)).scalar():
+            raise SystemExit("❌ Target database already has users; rerun with --reset to replace its contents")
+
+
+def sync_sequences():
+    """Explicit ids bypass PostgreSQL sequences; move them past the generated rows"""
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if "id" in table.c and table.c.id.primary_key:
+                conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                    f"COALESCE((SELECT MAX(id) FROM {table.name}), 0) + 1, false)"
+                ))
+
+
+def main():
+    preset = SCALES[ARGS.scale]
+    users = ARGS.users or preset["users"]
+    attempts_per_user = ARGS.attempts_per_user or preset["attempts_per_user"]
+    questions_per_topic = ARGS.questions_per_topic or preset["questions_per_topic"]
+
+    print(f"🌱 Generating {users:,} users (seed {ARGS.seed}, anchor {ARGS.anchor}) into {engine.url.render_as_string()}")
+    prepare_schema(ARGS.reset)
+
+    loader = BulkLoader(engine, ARGS.batch_size, checksum=ARGS.checksum)
+    generator = DataGenerator(loader, ARGS.seed, ARGS.anchor, users, attempts_per_user, questions_per_topic)
+    started = time.perf_counter()
+    generator.run()
+    sync_sequences()
+    elapsed = time.perf_counter() - started
+
+    total = sum(loader.counts.values())
+    print(f"\n  {'table':<28} {'rows':>12}")
+    for table in Base.metadata.sorted_tables:
+        print(f"  {table.name:<28} {loader.counts.get(table.name, 0):>12,}")
+    print(f"\n✓ {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+    if loader.digest is not None:
+        print(f"  checksum {loader.digest.hexdigest()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Load harness for the FastAPI app
+
+Boots app.main:app in-process (startup/shutdown events included) against a
+freshly seeded SQLite database, with every LLM call answered by the stub
+provider in stub_llm.py after --llm-delay seconds. A weighted mix of
+practice, progress, SRS, chatbot and placement requests is fired through
+httpx's ASGI transport at a fixed concurrency, then each endpoint reports:
+
+    requests, errors, throughput, p50/p95/p99 latency, DB queries per request
+
+Query counts come from cursor events on both the sync and the async engine,
+attributed to the request that issued them.
+
+Usage (from backend/):
+    python benchmarks/load_harness.py [--requests 1000] [--concurrency 20]
+        [--llm-delay 0.5] [--users 20] [--seed 42] [--only practice,progress] [--verbose]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import contextvars
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+WORK_DIR = tempfile.mkdtemp(prefix="studybuddy_load_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(WORK_DIR, 'load.db')}"
+os.environ["JOB_QUEUE_DB_PATH"] = os.path.join(WORK_DIR, "jobs.db")
+os.environ["LLM_CACHE_DB_PATH"] = os.path.join(WORK_DIR, "llm_cache.db")
+os.environ["QUESTION_POOL_WARMUP"] = "false"
+os.environ.setdefault("SECRET_KEY", "benchmark")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import stub_llm
+
+LLM_DELAY = 0.5
+for i, arg in enumerate(sys.argv):
+    if arg == "--llm-delay" and i + 1 < len(sys.argv):
+        LLM_DELAY = float(sys.argv[i + 1])
+    elif arg.startswith("--llm-delay="):
+        LLM_DELAY = float(arg.split("=", 1)[1])
+stub_llm.install(delay=LLM_DELAY)
+
+import httpx
+from sqlalchemy import event
+from app.config.database import SessionLocal, engine, async_engine
+from app.models.models import (
+    User, StudyPlan, Topic, Question, MCQOption, WrittenAnswer, QuestionAttempt,
+    SpacedRepetitionSchedule
+)
+from app.models.placement_models import PlacementUser, PlacementProfile, DSAPracticeSession, TopicProgress
+from app.services.progress_service import ProgressService
+from app.main import app
+
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+TOPICS_PER_PLAN = 8
+QUESTIONS_PER_TOPIC = 30  # per difficulty: 2/3 MCQ, 1/3 written
+DIFFICULTIES = ["easy", "medium", "hard"]
+DSA_TOPICS = ["arrays", "strings", "trees", "graphs", "dynamic programming"]
+
+
+def log(message: str = ""):
+    """Harness output (the app's own prints are silenced unless --verbose)"""
+    print(message, file=sys.__stdout__, flush=True)
+
+
+# ----------------------------------------------------------------------
+# Per-request query counting
+# ----------------------------------------------------------------------
+
+_request_queries = contextvars.ContextVar("request_queries", default=None)
+
+
+def _count_query(*args):
+    counter = _request_queries.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+for _engine in (engine, async_engine.sync_engine):
+    event.listen(_engine, "before_cursor_execute", _count_query)
+
+
+def counting_app(asgi_app, query_log: dict):
+    """ASGI wrapper recording the queries each request ran, keyed by request id header"""
+    async def wrapped(scope, receive, send):
+        if scope["type"] != "http":
+            return await asgi_app(scope, receive, send)
+        counter = [0]
+        token = _request_queries.set(counter)
+        try:
+            await asgi_app(scope, receive, send)
+        finally:
+            _request_queries.reset(token)
+            request_id = dict(scope["headers"]).get(b"x-bench-id")
+            if request_id:
+                query_log[request_id.decode()] = counter[0]
+    return wrapped
+
+
+# ----------------------------------------------------------------------
+# Seed data
+# ----------------------------------------------------------------------
+
+def seed(user_count: int, rng: random.Random) -> dict:
+    """Users with a plan, questions, attempts, SRS schedules and a placement profile each"""
+    db = SessionLocal()
+    world = {"users": [], "written_questions": defaultdict(list), "mcq_questions": defaultdict(list)}
+    today = date.today()
+
+    for u in range(1, user_count + 1):
+        db.add(User(id=u, email=f"load{u}@studybuddy.com", name=f"Load {u}"))
+        plan = StudyPlan(
+            user_id=u, subject=f"Subject {u}", exam_type="final",
+            exam_date=today + timedelta(days=30), daily_hours=4, target_grade="A"
+        )
+        db.add(plan)
+        db.flush()
+
+        topics = []
+        for t in range(TOPICS_PER_PLAN):
+            topic = Topic(plan_id=plan.id, name=f"Topic {u}.{t}", weight=1.0, allocated_hours=4, order_index=t)
+            db.add(topic)
+            topics.append(topic)
+        db.flush()
+
+        for topic in topics:
+            for difficulty in DIFFICULTIES:
+                for i in range(QUESTIONS_PER_TOPIC // len(DIFFICULTIES)):
+                    is_mcq = i % 3 != 2
+                    question = Question(
+                        topic_id=topic.id, question_type="mcq" if is_mcq else "written",
+                        difficulty=difficulty, question_text=f"{topic.name} {difficulty} question {i}",
+                        marks=1 if is_mcq else 10, time_limit=60 if is_mcq else 600
+                    )
+                    if is_mcq:
+                        question.mcq_options = [
+                            MCQOption(option_label=label, option_text=f"Option {label}",
+                                      is_correct=label == "B", explanation="Because B")
+                            for label in "ABCD"
+                        ]
+                    else:
+                        question.written_answer = WrittenAnswer(
+                            model_answer="Model answer", marking_scheme={"main_body": 10},
+                            keywords=[{"word": "stub", "importance": "high"}], expected_length="200-250 words"
+                        )
+                    db.add(question)
+        db.flush()
+
+        for topic in topics:
+            for question in topic.questions:
+                bucket = world["mcq_questions"] if question.question_type == "mcq" else world["written_questions"]
+                bucket[u].append(question.id)
+                if rng.random() < 0.4:
+                    correct = rng.random() < 0.65
+                    db.add(QuestionAttempt(
+                        user_id=u, question_id=question.id, student_answer="B" if correct else "A",
+                        is_correct=correct, score=question.marks if correct else 0, time_taken=rng.randint(10, 300),
+                        confidence_level=rng.randint(1, 5),
+                        attempted_at=datetime.utcnow() - timedelta(hours=rng.randint(0, 24 * 14))
+                    ))
+            db.add(SpacedRepetitionSchedule(
+                user_id=u, topic_id=topic.id, next_review_date=today + timedelta(days=rng.randint(-3, 7)),
+                interval_days=rng.choice([1, 3, 7]), ease_factor=2.5, review_count=rng.randint(0, 4)
+            ))
+
+        placement_user = PlacementUser(id=u, email=f"load{u}@placement.com", name=f"Load {u}")
+        db.add(placement_user)
+        profile = PlacementProfile(
+            user_id=u, company_name="Google", role="SDE", interview_date=today + timedelta(days=45),
+            hours_per_day=3, round_structure=[{"round_number": 1, "type": "dsa_coding", "duration": 90}]
+        )
+        db.add(profile)
+        db.flush()
+        for topic_name in DSA_TOPICS:
+            solved = rng.randint(0, 10)
+            db.add(TopicProgress(
+                user_id=u, profile_id=profile.id, topic=topic_name, problems_attempted=solved + rng.randint(0, 5),
+                problems_solved=solved, time_spent_minutes=solved * 25, easy_solved=solved,
+                medium_solved=0, hard_solved=0, weakness_score=round(rng.random(), 2)
+            ))
+            for p in range(rng.randint(2, 6)):
+                db.add(DSAPracticeSession(
+                    user_id=u, profile_id=profile.id, topic=topic_name, problem_name=f"{topic_name} #{p}",
+                    difficulty=rng.choice(DIFFICULTIES), solved=rng.random() < 0.6,
+                    time_spent_minutes=rng.randint(10, 60),
+                    attempted_at=datetime.utcnow() - timedelta(days=rng.randint(0, 6))
+                ))
+
+        world["users"].append({
+            "user_id": u, "plan_id": plan.id, "profile_id": profile.id,
+            "topic_ids": [t.id for t in topics]
+        })
+        db.commit()
+
+    ProgressService().rebuild(db)
+    db.commit()
+    db.close()
+    return world
+
+
+# ----------------------------------------------------------------------
+# Request mix
+# ----------------------------------------------------------------------
+
+def build_mix(world: dict):
+    """(group, endpoint label, weight, factory(rng) -> (method, url, kwargs))"""
+
+    def user(rng):
+        return rng.choice(world["users"])
+
+    def questions_page(rng):
+        u = user(rng)
+        return "GET", f"/api/practice/questions/{rng.choice(u['topic_ids'])}", {
+            "params": {"difficulty": rng.choice(DIFFICULTIES), "question_type": "all", "limit": 10}
+        }
+
+    def submit_mcq(rng):
+        u = user(rng)
+        return "POST", "/api/practice/submit-answer", {
+            "params": {"user_id": u["user_id"]},
+            "json": {"question_id": rng.choice(world["mcq_questions"][u["user_id"]]),
+                     "student_answer": rng.choice("ABCD"), "time_taken": 30, "confidence_level": 3}
+        }
+
+    def submit_written(rng):
+        u = user(rng)
+        return "POST", "/api/practice/submit-answer", {
+            "params": {"user_id": u["user_id"]},
+            "json": {"question_id": rng.choice(world["written_questions"][u["user_id"]]),
+                     "student_answer": "A stub answer mentioning the key idea.", "time_taken": 300,
+                     "confidence_level": 3}
+        }
+
+    def overall_progress(rng):
+        u = user(rng)
+        return "GET", f"/api/practice/overall-progress/{u['user_id']}", {"params": {"plan_id": u["plan_id"]}}
+
+    def topic_progress(rng):
+        u = user(rng)
+        return "GET", f"/api/practice/progress/{rng.choice(u['topic_ids'])}", {"params": {"user_id": u["user_id"]}}
+
+    def practice_stats(rng):
+        return "GET", f"/api/practice/stats/{user(rng)['user_id']}", {}
+
+    def dashboard(rng):
+        return "GET", f"/api/study-plan/{user(rng)['plan_id']}/dashboard", {}
+
+    def due_reviews(rng):
+        u = user(rng)
+        return "GET", f"/api/srs/due-reviews/{u['user_id']}", {"params": {"plan_id": u["plan_id"]}}
+
+    def upcoming_reviews(rng):
+        return "GET", f"/api/srs/upcoming-reviews/{user(rng)['user_id']}", {}
+
+    def chat_query(rng):
+        u = user(rng)
+        return "POST", "/api/chatbot/query", {
+            "json": {"query": "How should I revise this topic?", "plan_id": u["plan_id"], "user_id": u["user_id"]}
+        }
+
+    def quick_help(rng):
+        return "POST", "/api/chatbot/quick-help", {
+            "json": {"topic": f"Topic {rng.randint(1, 5)}", "help_type": rng.choice(["explain", "tips"])}
+        }
+
+    def dsa_daily(rng):
+        u = user(rng)
+        return "GET", f"/api/placement/practice/daily/{u['profile_id']}", {"params": {"user_id": u["user_id"]}}
+
+    def dsa_analytics(rng):
+        u = user(rng)
+        return "GET", f"/api/placement/practice/analytics/{u['profile_id']}", {"params": {"user_id": u["user_id"]}}
+
+    def dsa_history(rng):
+        u = user(rng)
+        return "GET", f"/api/placement/practice/history/{u['profile_id']}", {"params": {"user_id": u["user_id"]}}
+
+    return [
+        ("practice", "GET questions page", 20, questions_page),
+        ("practice", "POST submit mcq", 12, submit_mcq),
+        ("practice", "POST submit written", 4, submit_written),
+        ("progress", "GET overall-progress", 10, overall_progress),
+        ("progress", "GET topic progress", 8, topic_progress),
+        ("progress", "GET practice stats", 5, practice_stats),
+        ("progress", "GET plan dashboard", 6, dashboard),
+        ("srs", "GET due-reviews", 7, due_reviews),
+        ("srs", "GET upcoming-reviews", 3, upcoming_reviews),
+        ("chatbot", "POST chat query", 4, chat_query),
+        ("chatbot", "POST quick-help", 4, quick_help),
+        ("placement", "GET dsa daily", 6, dsa_daily),
+        ("placement", "GET dsa analytics", 6, dsa_analytics),
+        ("placement", "GET dsa history", 5, dsa_history),
+    ]
+
+
+# ----------------------------------------------------------------------
+# Runner
+# ----------------------------------------------------------------------
+
+def percentile(values, pct: int) -> float:
+    if len(values) < 2:
+        return values[0] * 1000 if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1] * 1000
+
+
+async def run(args) -> int:
+    rng = random.Random(args.seed)
+
+    await app.router.startup()
+    log(f"🌱 Seeding {args.users} users...")
+    started = time.perf_counter()
+    world = seed(args.users, rng)
+    log(f"✓ Seeded in {time.perf_counter() - started:.1f}s ({WORK_DIR})")
+
+    mix = build_mix(world)
+    if args.only:
+        groups = set(args.only.split(","))
+        mix = [m for m in mix if m[0] in groups]
+    weights = [m[2] for m in mix]
+    plan = [rng.choices(mix, weights=weights)[0] for _ in range(args.requests)]
+    requests = [(label, factory(rng)) for _, label, _, factory in plan]
+
+    query_log = {}
+    results = defaultdict(lambda: {"latencies": [], "errors": 0, "queries": []})
+    pending = iter(enumerate(requests))
+
+    transport = httpx.ASGITransport(app=counting_app(app, query_log))
+    async with httpx.AsyncClient(transport=transport, base_url="http://load", timeout=120) as client:
+        async def worker():
+            for request_id, (label, (method, url, kwargs)) in pending:
+                headers = {"x-bench-id": str(request_id)}
+                started = time.perf_counter()
+                try:
+                    response = await client.request(method, url, headers=headers, **kwargs)
+                    failed = response.status_code >= 400 or (
+                        response.headers.get("content-type", "").startswith("application/json")
+                        and isinstance(response.json(), dict) and response.json().get("error") is True
+                    )
+                except Exception:
+                    failed = True
+                elapsed = time.perf_counter() - started
+                entry = results[label]
+                entry["latencies"].append(elapsed)
+                entry["errors"] += int(failed)
+                entry["queries"].append(query_log.pop(str(request_id), 0))
+
+        log(f"🚀 {args.requests} requests, concurrency {args.concurrency}, LLM delay {LLM_DELAY}s")
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        wall = time.perf_counter() - started
+
+    await app.router.shutdown()
+
+    total_errors = sum(r["errors"] for r in results.values())
+    log(f"\n📊 {args.requests} requests in {wall:.2f}s = {args.requests / wall:.1f} req/s overall "
+          f"({total_errors} errors, {stub_llm.CALLS['generate'] + stub_llm.CALLS['stream']} LLM calls)")
+    log(f"  {'endpoint':<24} {'n':>5} {'err':>4} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'q/req':>6} {'q max':>6}")
+    for _, label, _, _ in build_mix(world):
+        if label not in results:
+            continue
+        entry = results[label]
+        latencies = entry["latencies"]
+        log(
+            f"  {label:<24} {len(latencies):>5} {entry['errors']:>4} {len(latencies) / wall:>7.1f} "
+            f"{percentile(latencies, 50):>8.1f} {percentile(latencies, 95):>8.1f} {percentile(latencies, 99):>8.1f} "
+            f"{statistics.mean(entry['queries']):>6.1f} {max(entry['queries']):>6}"
+        )
+    log()
+    return 1 if total_errors else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--llm-delay", type=float, default=0.5, help="seconds the stub LLM waits per call")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", help="comma-separated groups: practice,progress,srs,chatbot,placement")
+    parser.add_argument("--verbose", action="store_true", help="keep the app's request logging")
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        if not args.verbose:
+            stack.enter_context(contextlib.redirect_stdout(open(os.devnull, "w")))
+        sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+PDF ingestion benchmark: in-memory serial extraction vs the streaming pipeline
+
+Writes a synthetic text PDF, then ingests it both ways:
+- serial: the whole file in memory, pages extracted one by one on the event
+  loop and concatenated (how /api/upload/pdf used to work)
+- streaming: PDFService.spool_upload + extract_to_archive (process pool over
+  a memory map, text streamed into a TextArchive)
+
+Reports wall time and the p95 latency of a coroutine probing the event loop
+while ingestion runs, then (in a second run, since tracing slows in-process
+work) the peak Python heap in this process. The two outputs are checked to
+carry the same text.
+
+Usage (from backend/):
+    python benchmarks/pdf_ingestion.py [--pages 300] [--workers 4]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import zlib
+from io import BytesIO
+
+WORK_DIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(WORK_DIR, 'bench.db')}")
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import PyPDF2
+from starlette.datastructures import UploadFile
+
+LINE = "Process scheduling decides which ready process runs next on the CPU"
+
+
+def write_pdf(path: str, pages: int, lines_per_page: int = 45):
+    """Minimal multi-page PDF with a Helvetica text stream on each page"""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for p in range(pages):
+        lines = [f"Page {p + 1} line {i + 1}: {LINE}" for i in range(lines_per_page)]
+        ops = "BT /F1 9 Tf 40 800 Td 11 TL " + " ".join(f"({line}) '" for line in lines) + " ET"
+        stream = zlib.compress(ops.encode())
+        objects.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids).encode()
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % pages
+
+    out = BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    with open(path, "wb") as f:
+        f.write(out.getvalue())
+
+
+async def serial_ingest(pdf_path: str) -> str:
+    """The old path: read everything, extract serially on the loop, += the text"""
+    with open(pdf_path, "rb") as f:
+        upload = UploadFile(file=BytesIO(f.read()), filename="bench.pdf")
+    content = await upload.read()
+    reader = PyPDF2.PdfReader(BytesIO(content))
+    extracted_text = ""
+    for page_num, page in enumerate(reader.pages):
+        text = page.extract_text()
+        if text:
+            extracted_text += f"\n--- Page {page_num + 1} ---\n"
+            extracted_text += text + "\n"
+    return extracted_text.strip()
+
+
+async def streaming_ingest(pdf_service, pdf_path: str) -> dict:
+    with open(pdf_path, "rb") as f:
+        upload = UploadFile(file=f, filename="bench.pdf")
+        spooled, _, _ = await pdf_service.spool_upload(upload)
+    return await asyncio.to_thread(pdf_service.extract_to_archive, spooled, "bench.pdf", "syllabus")
+
+
+async def measure(make_coro):
+    """Run the ingestion, probing the loop every 5 ms; returns (result, seconds, probe p95 ms, peak heap MB)"""
+    probes = []
+    done = asyncio.Event()
+
+    async def probe():
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.005)
+            probes.append(time.perf_counter() - started - 0.005)
+
+    prober = asyncio.create_task(probe())
+    started = time.perf_counter()
+    result = await make_coro()
+    elapsed = time.perf_counter() - started
+    done.set()
+    await prober
+    p95 = statistics.quantiles(probes, n=20)[-1] * 1000 if len(probes) >= 2 else elapsed * 1000
+
+    tracemalloc.start()
+    await make_coro()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, p95, peak / 1024 / 1024
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    os.environ["PDF_EXTRACT_WORKERS"] = str(args.workers)
+    os.chdir(WORK_DIR)  # PDFService writes under ./uploads
+    from app.services.pdf_service import PDFService
+    pdf_service = PDFService()
+
+    pdf_path = os.path.join(WORK_DIR, "syllabus.pdf")
+    write_pdf(pdf_path, args.pages)
+    print(f"\n📄 {args.pages} pages, {os.path.getsize(pdf_path) / 1024:.0f} KiB, {args.workers} extraction workers")
+
+    await streaming_ingest(pdf_service, pdf_path)  # start the worker processes
+
+    serial_text, serial_s, serial_probe, serial_mb = await measure(lambda: serial_ingest(pdf_path))
+    streamed, stream_s, stream_probe, stream_mb = await measure(lambda: streaming_ingest(pdf_service, pdf_path))
+
+    same = pdf_service.read_extracted_text_from_json(streamed["json_path"])["text"] == serial_text
+
+    print(f"  {'pipeline':<10} {'seconds':>8} {'peak heap MB':>13} {'loop p95 ms':>12}")
+    print(f"  {'serial':<10} {serial_s:>8.2f} {serial_mb:>13.1f} {serial_probe:>12.1f}")
+    print(f"  {'streaming':<10} {stream_s:>8.2f} {stream_mb:>13.1f} {stream_probe:>12.1f}")
+    print(f"\n{'✓' if same else '❌'} extracted text {'matches' if same else 'differs'} ({len(serial_text)} chars)\n")
+    PDFService.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Query-count benchmark for question reads (N+1 vs eager loading)
+
+Seeds a throwaway SQLite database, then runs the old per-question option
+lookups next to QuestionRepository and prints queries and time per call.
+
+Usage (from backend/):
+    python benchmarks/question_queries.py [--questions 200] [--page 50]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench_questions.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, func
+from app.config.database import Base, engine, SessionLocal
+from app.models.models import Topic, Question, MCQOption, WrittenAnswer
+from app.services.question_repository import QuestionRepository
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def seed(question_count: int) -> int:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    topic = Topic(name="Benchmark topic")
+    db.add(topic)
+    db.flush()
+
+    for i in range(question_count):
+        question_type = "mcq" if i % 3 else "written"
+        question = Question(
+            topic_id=topic.id,
+            question_type=question_type,
+            difficulty="medium",
+            question_text=f"Question {i}",
+            marks=1 if question_type == "mcq" else 10,
+            time_limit=60
+        )
+        db.add(question)
+        db.flush()
+
+        if question_type == "mcq":
+            for label in "ABCD":
+                db.add(MCQOption(
+                    question_id=question.id,
+                    option_label=label,
+                    option_text=f"Option {label}",
+                    is_correct=(label == "B")
+                ))
+        else:
+            db.add(WrittenAnswer(
+                question_id=question.id,
+                model_answer="Model answer",
+                marking_scheme={},
+                keywords=[],
+                expected_length="200-300 words"
+            ))
+
+    db.commit()
+    topic_id = topic.id
+    db.close()
+    return topic_id
+
+
+def page_n_plus_one(db, topic_id: int, limit: int):
+    """The original /api/practice/questions loop"""
+    query = db.query(Question).filter(
+        Question.topic_id == topic_id,
+        Question.difficulty == "medium"
+    ).order_by(func.random())
+    total = query.count()
+    result = []
+    for q in query.limit(limit).all():
+        if q.question_type == "mcq":
+            options = db.query(MCQOption).filter(MCQOption.question_id == q.id).all()
+            result.append([opt.option_text for opt in sorted(options, key=lambda x: x.option_label)])
+        else:
+            result.append(q.written_answer.expected_length if q.written_answer else None)
+    return result, total
+
+
+def page_eager(db, topic_id: int, limit: int):
+    repository = QuestionRepository()
+    questions, total = repository.get_page(db, topic_id, "medium", "all", limit, 0)
+    return [repository.to_practice_dict(q) for q in questions], total
+
+
+def measure(counter: QueryCounter, label: str, func_, *args, repeat: int = 20):
+    queries = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        db = SessionLocal()
+        before = counter.count
+        func_(db, *args)
+        queries = counter.count - before
+        db.close()
+    elapsed_ms = (time.perf_counter() - started) / repeat * 1000
+    print(f"  {label:<28} {queries:>6} queries   {elapsed_ms:>8.2f} ms/call")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--page", type=int, default=50)
+    args = parser.parse_args()
+
+    topic_id = seed(args.questions)
+    counter = QueryCounter()
+
+    print(f"\n📊 Question page of {args.page} ({args.questions} questions seeded, SQLite)")
+    measure(counter, "before: per-question lookups", page_n_plus_one, topic_id, args.page)
+    measure(counter, "after: QuestionRepository", page_eager, topic_id, args.page)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Stub LLM provider for benchmarks
+
+Stands in for google-genai's `genai.Client`, which every LLM path in the app
+goes through (QuestionService, AIService and LLMService's Gemini provider).
+Responses are canned JSON shaped like the real prompts expect, returned
+after a configurable delay so that timing reflects waiting on a provider
+without spending quota.
+
+    import stub_llm
+    stub_llm.install(delay=0.5)   # before importing app.main
+"""
+
+import asyncio
+import json
+import os
+import re
+import time
+
+# Seconds each call waits before answering (changed by install())
+DELAY = 0.5
+CALLS = {"generate": 0, "stream": 0}
+
+
+class StubResponse:
+    def __init__(self, text: str):
+        self.text = text
+        self.candidates = []
+
+
+def _count(prompt: str, default: int = 5) -> int:
+    match = re.search(r"Generate (\d+)", prompt)
+    return int(match.group(1)) if match else default
+
+
+def canned_response(prompt: str) -> str:
+    """Answer in the format the prompt asks for"""
+    if "multiple-choice" in prompt:
+        return json.dumps({"questions": [
+            {
+                "question": f"Stub multiple-choice question {i + 1}?",
+                "options": [
+                    {"label": label, "text": f"Option {label}", "is_correct": label == "B"}
+                    for label in "ABCD"
+                ],
+                "explanation": "B is correct because it is the stub answer."
+            }
+            for i in range(_count(prompt))
+        ]})
+
+    if "written questions" in prompt:
+        marks_match = re.search(r"worth (\d+) marks", prompt)
+        marks = int(marks_match.group(1)) if marks_match else 10
+        return json.dumps({"questions": [
+            {
+                "question": f"Explain stub concept {i + 1} in detail.",
+                "marks": marks,
+                "time_minutes": marks + 2,
+                "model_answer": {
+                    "introduction": "Stub introduction.",
+                    "main_body": "Stub explanation of the key points.",
+                    "conclusion": "Stub conclusion."
+                },
+                "marking_scheme": {"introduction": 2, "main_body": marks - 3, "conclusion": 1},
+                "keywords": [{"word": "stub", "importance": "high"}],
+                "expected_length": "200-250 words"
+            }
+            for i in range(_count(prompt))
+        ]})
+
+    if "Grade this student's exam answer" in prompt:
+        marks_match = re.search(r"QUESTION \((\d+) marks\)", prompt)
+        marks = int(marks_match.group(1)) if marks_match else 10
+        return json.dumps({
+            "score": round(marks * 0.7, 1),
+            "max_score": marks,
+            "feedback": "Stub feedback: solid answer, expand on the examples.",
+            "strengths": ["Clear structure"],
+            "improvements": ["More detail"],
+            "keyword_coverage": 1,
+            "keyword_total": 1
+        })
+
+    if "extract topics with weights" in prompt:
+        # "Topic: <name>" headings in the content (synthetic syllabi), else one stub topic
+        names = re.findall(r"^\s*Topic: (.+)$", prompt, re.MULTILINE)
+        return json.dumps({"topics": [{"name": name.strip(), "weight": 7} for name in dict.fromkeys(names)]
+                           or [{"name": "Stub topic", "weight": 1.0}]})
+
+    if "JSON" in prompt:
+        return json.dumps({"topics": [{"name": "Stub topic", "weight": 1.0}]})
+
+    return "This is a stub answer from the benchmark LLM provider. " * 4
+
+
+class _AsyncModels:
+    async def generate_content(self, model=None, contents="", config=None):
+        CALLS["generate"] += 1
+        await asyncio.sleep(DELAY)
+        return StubResponse(canned_response(str(contents)))
+
+    async def generate_content_stream(self, model=None, contents="", config=None):
+        CALLS["stream"] += 1
+        text = canned_response(str(contents))
+
+        async def chunks():
+            await asyncio.sleep(DELAY)
+            for i in range(0, len(text), 40):
+                yield StubResponse(text[i:i + 40])
+
+        return chunks()
+
+
+class _SyncModels:
+    def generate_content(self, model=None, contents="", config=None):
+        CALLS["generate"] += 1
+        time.sleep(DELAY)
+        return StubResponse(canned_response(str(contents)))
+
+
+class _Aio:
+    def __init__(self):
+        self.models = _AsyncModels()
+
+
+class StubGenAIClient:
+    """Drop-in for genai.Client(api_key=...)"""
+
+    def __init__(self, *args, **kwargs):
+        self.models = _SyncModels()
+        self.aio = _Aio()
+
+
+def install(delay: float = 0.5):
+    """Route every genai.Client through the stub; call before importing the app"""
+    global DELAY
+    DELAY = delay
+
+    # Only the Gemini provider is configured, so LLMService uses the stub too
+    # (empty rather than unset, so load_dotenv can't bring real keys back)
+    for key in ("MISTRAL_API_KEY", "GROQ_API_KEY"):
+        os.environ[key] = ""
+    os.environ["LLM_PROVIDER_ORDER"] = "gemini"
+    os.environ["DEFAULT_LLM_PROVIDER"] = "gemini"
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+    from google import genai
+    genai.Client = StubGenAIClient
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Topic extraction benchmark: one truncated call vs chunked map-reduce
+
+Builds a synthetic syllabus whose sections each start with a "Topic: <name>"
+heading, then extracts topics through the stub LLM provider (fixed delay per
+call, topics read back from the headings in the prompt):
+- truncated: the old single call on text[:3500]
+- map-reduce: AIService.extract_topics over the whole text
+- repeat: the same text again (every chunk from the cache)
+- overlap: the syllabus combined with a second file (only its chunks are new)
+
+Reports topics found out of the syllabus total, LLM calls and wall time.
+TOPIC_EXTRACTION_MAX_TOPICS is lifted so coverage isn't hidden by the cap, and
+TOPIC_EXTRACTION_RPM so the stub's wall time isn't hidden by the rate limit.
+
+Usage (from backend/):
+    python benchmarks/topic_extraction.py [--topics 60] [--delay 0.5]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+WORK_DIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(WORK_DIR, 'bench.db')}")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ["LLM_CACHE_DB_PATH"] = os.path.join(WORK_DIR, "llm_cache.db")
+os.environ.setdefault("TOPIC_EXTRACTION_MAX_TOPICS", "100000")
+os.environ.setdefault("TOPIC_EXTRACTION_RPM", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import stub_llm
+
+FILLER = "Students should be able to explain the mechanism, compare trade-offs and solve numerical problems."
+
+
+def syllabus(names, lines_per_topic: int = 12) -> str:
+    """Extracted-text layout: two topics per page"""
+    pages = []
+    for number, start in enumerate(range(0, len(names), 2), start=1):
+        body = "\n".join(
+            f"Topic: {name}\n" + "\n".join(f"{FILLER} ({name} {i + 1})" for i in range(lines_per_topic))
+            for name in names[start:start + 2]
+        )
+        pages.append(("" if number == 1 else "\n\n") + f"--- Page {number} ---\n" + body)
+    return "".join(pages)
+
+
+def combined(files) -> str:
+    """combine_multiple_json_texts layout"""
+    return "".join(
+        f"\n\n{'=' * 50}\nSOURCE: SYLLABUS - {filename}\n{'=' * 50}\n\n{text}" for filename, text in files
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", type=int, default=60)
+    parser.add_argument("--delay", type=float, default=0.5)
+    args = parser.parse_args()
+
+    stub_llm.install(args.delay)
+    from app.config.settings import settings
+    from app.services.ai_service import AIService
+    ai_service = AIService()
+
+    names = [f"Subject area {i + 1}" for i in range(args.topics)]
+    extra = [f"Lab topic {i + 1}" for i in range(args.topics // 4)]
+    text = combined([("syllabus.pdf", syllabus(names))])
+    overlapping = combined([("syllabus.pdf", syllabus(names)), ("lab.pdf", syllabus(extra))])
+
+    async def truncated():
+        # The previous implementation: one call on the first 3500 characters
+        response = await ai_service.client.aio.models.generate_content(
+            model=ai_service.model,
+            contents=f"Analyze this General Studies content and extract topics with weights (1-10).\n\n"
+                     f"Content:\n{text[:3500]}\n\nReturn JSON"
+        )
+        return json.loads(response.text)["topics"]
+
+    runs = [
+        ("truncated", truncated, len(names)),
+        ("map-reduce", lambda: ai_service.extract_topics(text, "General Studies"), len(names)),
+        ("repeat", lambda: ai_service.extract_topics(text, "General Studies"), len(names)),
+        ("overlap", lambda: ai_service.extract_topics(overlapping, "General Studies"), len(names) + len(extra)),
+    ]
+
+    print(f"\n📚 {len(text)} characters, {args.topics} topics, {args.delay}s per LLM call, "
+          f"chunks of ~{settings.TOPIC_CHUNK_TOKENS} tokens, {settings.TOPIC_EXTRACTION_CONCURRENCY} at once")
+    print(f"  {'run':<11} {'topics':>9} {'calls':>6} {'seconds':>8}")
+    ai_service.chunk_cache.clear()
+    for label, run, expected in runs:
+        calls = stub_llm.CALLS["generate"]
+        started = time.perf_counter()
+        topics = await run()
+        elapsed = time.perf_counter() - started
+        found = f"{len(topics)}/{expected}"
+        print(f"  {label:<11} {found:>9} {stub_llm.CALLS['generate'] - calls:>6} {elapsed:>8.2f}")
+    print()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,11 +1,26 @@
 """
 Initialize database with default user
-Run this once: python init_db.py
+Run this once: python init_db.py (safe to re-run; start.sh runs it on every start)
+- creates missing tables, then upgrades existing ones with Alembic (alembic upgrade head)
+- python init_db.py --rebuild-stats also recomputes user_topic_stats from attempt history
 """
 from app.config.database import SessionLocal, engine, Base
 from app.models.models import User
+from app.services.progress_service import ProgressService
+import os
 import sys
 
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def upgrade_schema():
+    """Apply pending Alembic migrations (columns/indexes create_all can't add to existing tables)"""
+    from alembic import command
+    from alembic.config import Config
+    
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    command.upgrade(config, "head")
+
 def init_database():
     print("Initializing database...")
     
@@ -18,6 +33,15 @@ def init_database():
         print(f"⚠ Warning: Could not create tables: {e}")
         print("  This is normal if the database already exists or if using SQLite")
     
+    try:
+        print("Upgrading schema (alembic upgrade head)...")
+        upgrade_schema()
+        print("✓ Schema up to date")
+    except Exception as e:
+        print(f"❌ Schema upgrade failed: {e}")
+        print("  Run 'alembic upgrade head' from backend/ before starting the server")
+        sys.exit(1)
+    
     # Create default user
     db = SessionLocal()
     try:
@@ -35,6 +59,13 @@ def init_database():
             db.commit()
             print(f"✓ Created default user: {user.email}")
         
+        # user_topic_stats is kept up to date incrementally (and backfilled at app
+        # startup when empty); a full rebuild only on request
+        if "--rebuild-stats" in sys.argv:
+            stats_rows = ProgressService().rebuild(db)
+            db.commit()
+            print(f"✓ Rebuilt user_topic_stats: {stats_rows} rows")
+        
         # Count existing data
         user_count = db.query(User).count()
         print(f"\n✓ Database initialized successfully")
@@ -45,13 +45,14 @@ else
     echo -e "${YELLOW}⚠ Backend dependency installation had warnings${NC}"
 fi
 
-# Initialize Database
+# Initialize Database (creates tables, then runs alembic upgrade head)
 echo -e "\n${BLUE}🗄️  Initializing Database...${NC}"
 python init_db.py
 if [ $? -eq 0 ]; then
     echo -e "${GREEN}✓ Database initialized${NC}"
 else
-    echo -e "${YELLOW}⚠ Database may already exist${NC}"
+    echo -e "${YELLOW}⚠ Database schema upgrade failed - fix it and run 'alembic upgrade head' in backend/${NC}"
+    exit 1
 fi
 
 # Start Backend Server